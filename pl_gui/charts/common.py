@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# charts/common.py
+
+# Chart building blocks shared by the views and the headless report
+# generator. Nothing in the charts package imports Qt: the views draw on a
+# Qt canvas, report.py on an Agg one.
+
+class ChartError(Exception):
+    """
+    A chart can't be drawn for the selection (no data, invalid choice).
+    title is a short heading for the message.
+    """
+    def __init__(self, title, message):
+        super().__init__(message)
+        self.title = title
+
+def new_figure(width=11, height=6, dpi=100):
+    """
+    Return a (figure, canvas) pair rendered with Agg, for drawing off screen.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figure = Figure(figsize=(width, height), dpi=dpi)
+    return figure, FigureCanvasAgg(figure)
+
+def mark_season_boundaries(ax, x_values, season_names):
+    """
+    Draw a dashed vertical line between consecutive points that belong to
+    different seasons and label each season at the top of the axes.
+    Return the artists drawn.
+    """
+    if not x_values:
+        return []
+
+    starts = [0] + [i for i in range(1, len(season_names)) if season_names[i] != season_names[i - 1]]
+    transform = ax.get_xaxis_transform()
+    artists = []
+
+    for i in starts:
+        if i > 0:
+            prev, curr = x_values[i - 1], x_values[i]
+            artists.append(ax.axvline(prev + (curr - prev) / 2, color="gray", linestyle="--", linewidth=0.8, alpha=0.6))
+        artists.append(ax.text(x_values[i], 0.99, season_names[i], transform=transform,
+                               rotation=90, ha="left", va="top", fontsize=7, color="gray"))
+    return artists
+
+class ChartArtists:
+    """
+    Keeps the axes and the line / bar artists of a chart between redraws.
+    A chart is drawn for a layout key (e.g. the chart type): while the key
+    stays the same the artists are updated in place (set_data, set_height)
+    and the canvas is repainted without clearing the figure or running
+    tight_layout. A new key (or None, for charts that can't be updated in
+    place) clears the figure and lays it out again.
+    """
+    def __init__(self, figure, canvas):
+        self.figure = figure
+        self.canvas = canvas
+        self.layout = None
+        self.ax = None
+        self.relayout = True
+        self.artists = {}   # key -> artist, kept while the layout stays
+        self.bar_positions = {}
+        self.used = set()   # keys drawn in the current pass
+        self.extras = []    # texts and markers rebuilt on every draw
+        self.cursor = None
+        self.cursor_artists = None
+        self.cursor_callback = None
+
+    def axes(self, layout):
+        """
+        Start drawing a chart with the given layout key and return its axes.
+        """
+        if layout is None or layout != self.layout or self.ax is None:
+            self.remove_cursor()
+            self.figure.clear()
+            self.ax = self.figure.add_subplot(111)
+            self.artists = {}
+            self.bar_positions = {}
+            self.relayout = True
+        else:
+            for artist in self.extras:
+                artist.remove()
+        self.layout = layout
+        self.extras = []
+        self.used = set()
+        return self.ax
+
+    def clear(self):
+        """
+        Clear the figure for a chart drawn directly on it (several axes);
+        the next chart is laid out again.
+        """
+        self.remove_cursor()
+        self.figure.clear()
+        self.layout = None
+        self.ax = None
+        self.artists = {}
+        self.bar_positions = {}
+        self.extras = []
+        self.relayout = True
+
+    def line(self, key, x, y, **style):
+        """
+        Plot (or update) the line called key.
+        """
+        line = self.artists.get(key)
+        if line is None:
+            line, = self.ax.plot(x, y, **style)
+            self.artists[key] = line
+        else:
+            line.set_data(x, y)
+            if "label" in style:
+                line.set_label(style["label"])
+        self.used.add(key)
+        return line
+
+    def hline(self, key, y, **style):
+        """
+        Draw (or move) the horizontal reference line called key.
+        """
+        line = self.artists.get(key)
+        if line is None:
+            line = self.ax.axhline(y, **style)
+            self.artists[key] = line
+        else:
+            line.set_ydata([y, y])
+        self.used.add(key)
+        return line
+
+    def bars(self, key, x, heights, **style):
+        """
+        Draw (or update) the bar group called key. Bars are updated in place
+        when they stand at the same positions, otherwise drawn again.
+        """
+        container = self.artists.get(key)
+        positions = list(x)
+        if container is not None and self.bar_positions.get(key) == positions:
+            for bar, height in zip(container.patches, heights):
+                bar.set_height(height)
+            if "label" in style:
+                container.set_label(style["label"])
+        else:
+            if container is not None:
+                container.remove()
+            container = self.ax.bar(positions, heights, **style)
+            self.artists[key] = container
+            self.bar_positions[key] = positions
+        self.used.add(key)
+        return container
+
+    def extra(self, *artists):
+        """
+        Register artists drawn directly on the axes for this pass only.
+        """
+        self.extras.extend(artists)
+
+    def draw(self, legend=True):
+        """
+        Finish the chart: drop the artists not drawn in this pass, rescale,
+        and repaint (laying the figure out again only for a new layout).
+        """
+        for key in [key for key in self.artists if key not in self.used]:
+            self.artists.pop(key).remove()
+            self.bar_positions.pop(key, None)
+
+        if self.ax is not None:
+            # New axes were scaled as the artists were added (relim ignores
+            # collections such as scatter plots)
+            if not self.relayout:
+                self.ax.relim()
+                self.ax.autoscale_view()
+            if legend:
+                self.ax.legend()
+
+        if self.relayout:
+            self.figure.tight_layout()
+            self.canvas.draw()
+            self.relayout = False
+        else:
+            self.canvas.draw_idle()
+
+    def hover(self, artists, callback):
+        """
+        Show callback's text when hovering over artists. The chart has a
+        single mplcursors cursor: it is kept while the artists are the same
+        and only its callback is swapped.
+        """
+        import mplcursors
+
+        artists = list(artists)
+        if not artists:
+            self.remove_cursor()
+            return
+
+        if self.cursor is None or self.cursor_artists != artists:
+            self.remove_cursor()
+            self.cursor = mplcursors.cursor(artists, hover=True)
+            self.cursor_artists = artists
+        else:
+            for sel in list(self.cursor.selections):
+                self.cursor.remove_selection(sel)
+            if self.cursor_callback is not None:
+                self.cursor.disconnect("add", self.cursor_callback)
+
+        self.cursor.connect("add", callback)
+        self.cursor_callback = callback
+
+    def remove_cursor(self):
+        if self.cursor is not None:
+            self.cursor.remove()
+        self.cursor = None
+        self.cursor_artists = None
+        self.cursor_callback = None
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# charts/league.py
+
+# Team Insights charts: the teams of a season compared on the league table,
+# and the half-time / full-time and scoreline matrices.
+
+from models.halftime_model import combine_groups, MAX_GOALS
+from charts.common import ChartError
+import numpy as np
+
+LEAGUE_CHARTS = [
+    "Points per Team",
+    "Goal Difference per Team",
+    "Goals Conceded per Team",
+    "Goals Scored per Team",
+    "Points vs Goal Difference",
+    "Points Efficiency (Points per Match)",
+    "Top 5 Attack vs Defense",
+    "Win Ratio per Team",
+    "Wins / Draws / Losses per Team",
+    "Half-Time / Full-Time Matrix",
+]
+
+MATRIX_CHART = "Half-Time / Full-Time Matrix"
+
+SORT_KEYS = {
+    "Team Name": lambda x: x["Team"],
+    "Points": lambda x: x["Points"],
+    "Goals For": lambda x: x["GF"],
+    "Goals Against": lambda x: x["GA"],
+    "Goal Difference": lambda x: x["GoalDifference"],
+    "Wins": lambda x: x["Won"],
+}
+
+def draw_league_chart(chart, chart_type, data, sort_key, selected_teams):
+    """
+    Draw a Team Insights chart on chart (a ChartArtists) from the league
+    table rows of a season, sorted by sort_key (a SORT_KEYS name) and
+    limited to selected_teams.
+    """
+    ax = chart.axes(None)
+
+    reverse_sort = sort_key != "Team Name"
+    data = sorted(data, key=SORT_KEYS[sort_key], reverse=reverse_sort)
+
+    # Filter selected teams
+    data = [row for row in data if row["Team"] in selected_teams]
+    teams = [row["Team"] for row in data]
+
+    if chart_type == "Points per Team":
+        points = [row["Points"] for row in data]
+        ax.bar(teams, points)
+        ax.set_ylabel("Points")
+        ax.set_title("Points per Team")
+
+    elif chart_type == "Goal Difference per Team":
+        gd = [row["GoalDifference"] for row in data]
+        ax.bar(teams, gd)
+        ax.set_ylabel("Goal Difference")
+        ax.set_title("Goal Difference per Team")
+
+    elif chart_type == "Goals Scored per Team":
+        goals = [row["GF"] for row in data]
+        ax.bar(teams, goals)
+        ax.set_ylabel("Goals For")
+        ax.set_title("Goals Scored per Team")
+
+    elif chart_type == "Goals Conceded per Team":
+        goals = [row["GA"] for row in data]
+        ax.bar(teams, goals)
+        ax.set_ylabel("Goals Against")
+        ax.set_title("Goals Conceded per Team")
+
+    elif chart_type == "Wins / Draws / Losses per Team":
+        wins = [row["Won"] for row in data]
+        draws = [row["Drawn"] for row in data]
+        losses = [row["Lost"] for row in data]
+
+        ax.bar(teams, wins, label="Wins")
+        ax.bar(teams, draws, bottom=wins, label="Draws")
+        bottoms = [w + d for w, d in zip(wins, draws)]
+        ax.bar(teams, losses, bottom=bottoms, label="Losses")
+
+        ax.set_ylabel("Match Results")
+        ax.set_title("Wins / Draws / Losses per Team")
+        ax.legend()
+
+    elif chart_type == "Points vs Goal Difference":
+        points = [row["Points"] for row in data]
+        gd = [row["GoalDifference"] for row in data]
+        ax.scatter(gd, points)
+
+        for i, team in enumerate(teams):
+            ax.annotate(team, (gd[i], points[i]), fontsize=8, alpha=0.7)
+
+        ax.set_xlabel("Goal Difference")
+        ax.set_ylabel("Points")
+        ax.set_title("Points vs Goal Difference")
+
+    elif chart_type == "Win Ratio per Team":
+        played = [row["Played"] for row in data]
+        won = [row["Won"] for row in data]
+        win_ratio = [round(w / p * 100, 1) if p > 0 else 0 for w, p in zip(won, played)]
+        ax.bar(teams, win_ratio)
+        ax.set_ylabel("Win Ratio (%)")
+        ax.set_title("Win Ratio per Team")
+
+    elif chart_type == "Top 5 Attack vs Defense":
+        # Sort data by Points descending
+        top5 = sorted(data, key=lambda x: x["Points"], reverse=True)[:5]
+        top5_teams = [row["Team"] for row in top5]
+        gf = [row["GF"] for row in top5]
+        ga = [row["GA"] for row in top5]
+
+        x = range(len(top5_teams))
+        bar_width = 0.35
+
+        ax.bar([i - bar_width / 2 for i in x], gf, width=bar_width, label="Goals For", color='green')
+        ax.bar([i + bar_width / 2 for i in x], ga, width=bar_width, label="Goals Against", color='red')
+
+        ax.set_xticks(x)
+        ax.set_xticklabels(top5_teams)
+        ax.set_ylabel("Goals")
+        ax.set_title("Top 5 Teams: Attack vs Defense")
+        ax.legend()
+
+    elif chart_type == "Points Efficiency (Points per Match)":
+        efficiency = [round(row["Points"] / row["Played"], 2) if row["Played"] else 0 for row in data]
+        ax.bar(teams, efficiency, color='purple')
+        ax.set_ylabel("Points per Match")
+        ax.set_title("Points Efficiency per Team")
+
+    ax.tick_params(axis='x', rotation=45)
+    chart.draw(legend=False)
+
+def draw_result_matrices(chart, season, matrices, teams):
+    """
+    Draw the half-time -> full-time and scoreline matrices of teams (summed)
+    on chart, from get_result_matrices("team", [season]). Raise ChartError
+    if the teams have no half-time data.
+    """
+    transitions, scorelines = combine_groups(matrices, teams)
+    if not transitions.sum():
+        raise ChartError("No Data", "No half-time data found for the selected teams.")
+
+    labels = matrices["labels"]
+    who = teams[0] if len(teams) == 1 else f"{len(teams)} teams"
+    chart.clear()
+    figure = chart.figure
+
+    # HT -> FT: share of each half-time result that ended in each full-time result
+    ax = figure.add_subplot(121)
+    row_totals = transitions.sum(axis=1, keepdims=True)
+    shares = np.divide(transitions, row_totals, out=np.zeros(transitions.shape), where=row_totals > 0) * 100
+    ax.imshow(shares, cmap="Blues", vmin=0, vmax=100)
+    for i in range(3):
+        for j in range(3):
+            color = "white" if shares[i, j] > 60 else "black"
+            ax.text(j, i, f"{shares[i, j]:.0f}%\n({transitions[i, j]})", ha="center", va="center",
+                    fontsize=8, color=color)
+    ax.set_xticks(range(3))
+    ax.set_xticklabels(labels)
+    ax.set_yticks(range(3))
+    ax.set_yticklabels([f"{label} ({row_totals[i, 0]})" for i, label in enumerate(labels)])
+    ax.set_xlabel("Full-Time Result")
+    ax.set_ylabel("Half-Time Result")
+    ax.set_title(f"Half-Time → Full-Time ({who}, {season})", fontsize=10)
+
+    # Full-time scorelines (goals for x goals against)
+    ax2 = figure.add_subplot(122)
+    total = scorelines.sum()
+    freq = scorelines / total * 100
+    ax2.imshow(freq, cmap="Oranges", vmin=0, vmax=max(freq.max(), 1))
+    for i in range(MAX_GOALS + 1):
+        for j in range(MAX_GOALS + 1):
+            if scorelines[i, j]:
+                color = "white" if freq[i, j] > freq.max() * 0.6 else "black"
+                ax2.text(j, i, f"{freq[i, j]:.0f}", ha="center", va="center", fontsize=7, color=color)
+    goal_labels = [str(g) for g in range(MAX_GOALS)] + [f"{MAX_GOALS}+"]
+    ax2.set_xticks(range(MAX_GOALS + 1))
+    ax2.set_xticklabels(goal_labels)
+    ax2.set_yticks(range(MAX_GOALS + 1))
+    ax2.set_yticklabels(goal_labels)
+    ax2.set_xlabel("Goals Against")
+    ax2.set_ylabel("Goals For")
+    ax2.set_title(f"Scorelines (% of {total} results)", fontsize=10)
+
+    chart.draw(legend=False)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# charts/odds.py
+
+# Odds Analysis charts: a bookmaker's implied probabilities, margins and
+# calibration in a season, and the goal model against the bookmaker.
+
+from models.odds_model import get_odds_arrays, get_over_under_arrays, select_rows
+from models.odds_model import valid_odds_mask, implied_probabilities, outcome_rates
+from models.odds_model import calibration_bins, brier_score, log_loss, summarize_by_bookmaker
+from models.odds_model import OUTCOMES_1X2
+from models.goal_model import get_model_predictions
+from charts.common import ChartError
+import numpy as np
+
+ODDS_CHARTS = [
+    "Implied Probability vs Result",
+    "Bookmaker Margin",
+    "Margin Distribution",
+    "Compare Bookmaker Margins",
+    "Over / Under 2.5 - Implied vs Actual",
+    "Goal Model vs Bookmaker",
+]
+
+# Charts of all the bookmakers of a season (the bookmaker selection is ignored)
+SEASON_CHARTS = ["Compare Bookmaker Margins"]
+
+# Name of each chart in exported file names
+EXPORT_NAMES = {
+    "Implied Probability vs Result": "Probability_vs_result",
+    "Bookmaker Margin": "Bookmaker_margin",
+    "Margin Distribution": "Margin_distrib",
+    "Compare Bookmaker Margins": "Compare_margins",
+    "Over / Under 2.5 - Implied vs Actual": "Over_Under_2.5_Implied_vs_Actual",
+    "Goal Model vs Bookmaker": "Goal_model_vs_bookmaker",
+}
+
+def load_odds_chart(chart_mode, season, bookmaker):
+    """
+    Query the data of an Odds Analysis chart: the bookmaker's 1X2 odds of
+    the season, plus the per-bookmaker summary, the Over / Under odds or
+    the goal model predictions for those charts. A bookmaker of None means
+    all of them. Raise ChartError if there is no data.
+    """
+    bookmakers = [bookmaker] if bookmaker else None
+    loaded = {"odds": get_odds_arrays([season], bookmakers)}
+    if not len(loaded["odds"]["MatchID"]):
+        raise ChartError("No Data", "No odds data found for this bookmaker and season.")
+
+    if chart_mode == "Compare Bookmaker Margins":
+        # All bookmakers of the season in one query and one grouped pass
+        loaded["summary"] = summarize_by_bookmaker(get_odds_arrays([season]))
+        if not loaded["summary"]:
+            raise ChartError("No Data", "No margin data found for this season.")
+
+    elif chart_mode == "Over / Under 2.5 - Implied vs Actual":
+        loaded["over_under"] = get_over_under_arrays([season], bookmakers)
+        if not len(loaded["over_under"]["MatchID"]):
+            raise ChartError("No Data", "No Over / Under data found for this bookmaker and season.")
+
+    elif chart_mode == "Goal Model vs Bookmaker":
+        loaded["model"] = get_model_predictions([season])
+
+    return loaded
+
+def draw_odds_chart(chart, chart_mode, season, bookmaker, loaded, ou_target="Over"):
+    """
+    Draw an Odds Analysis chart on chart (a ChartArtists) from
+    load_odds_chart's result. Return the odds rows the chart shows (for
+    data export). Raise ChartError if the rows left after validation can't
+    make the chart.
+    """
+    # Skip invalid odds once for all 1X2 charts
+    data = select_rows(loaded["odds"], valid_odds_mask(loaded["odds"]["odds"]))
+    probs, overround = implied_probabilities(data["odds"])
+    margins = (overround - 1.0) * 100
+
+    if chart_mode in ("Implied Probability vs Result", "Bookmaker Margin", "Margin Distribution") and not len(margins):
+        raise ChartError("No Valid Odds", "No valid odds data available.")
+
+    # Fixed bar groups and the margin line are updated in place when only
+    # the season or the bookmaker change; the others are redrawn
+    reusable = ("Implied Probability vs Result", "Bookmaker Margin", "Over / Under 2.5 - Implied vs Actual")
+    if chart_mode != "Goal Model vs Bookmaker":
+        ax = chart.axes(chart_mode if chart_mode in reusable else None)
+
+    if chart_mode == "Implied Probability vs Result":
+        avg_implied, actual_freq = outcome_rates(probs, data["result"])
+
+        x = np.arange(len(OUTCOMES_1X2))
+        width = 0.35
+
+        chart.bars("implied", x - width/2, avg_implied, width=width, label='Implied %', color='gray')
+        chart.bars("actual", x + width/2, actual_freq, width=width, label='Actual %', color='blue')
+
+        ax.set_xticks(x)
+        ax.set_xticklabels(['Home Win', 'Draw', 'Away Win'])
+        ax.set_ylabel("Percentage")
+        ax.set_title(f"{bookmaker} — Implied vs Actual Outcome Rates ({season})")
+
+        subtitle = (f"Matches: {len(margins)}   "
+                    f"Brier: {brier_score(probs, data['result']):.3f}   "
+                    f"Log-loss: {log_loss(probs, data['result']):.3f}")
+        chart.extra(ax.text(0.00, 1.02, subtitle, transform=ax.transAxes, ha='left', fontsize=10, color='gray'))
+        ax.legend()
+
+    elif chart_mode == "Bookmaker Margin":
+        x = np.arange(1, len(margins) + 1)
+        chart.line("margin", x, margins, label="Bookmaker Margin", color="purple", marker='o')
+        chart.hline("average", margins.mean(), color="gray", linestyle="--", label="Average Margin")
+
+        ax.set_title(f"{bookmaker} — Bookmaker Margin per Match ({season})")
+        ax.set_ylabel("Bookmaker Margin (%)")
+        ax.set_xlabel("Match Index")
+        ax.legend()
+
+    elif chart_mode == "Margin Distribution":
+        ax.hist(margins, bins=15, color="purple", edgecolor="black", alpha=0.7)
+        ax.axvline(margins.mean(), color="red", linestyle="--", label="Mean Margin")
+
+        ax.set_title(f"{bookmaker} — Margin Distribution ({season})")
+        ax.set_xlabel("Margin (%)")
+        ax.set_ylabel("Match Count")
+        ax.legend()
+
+    elif chart_mode == "Compare Bookmaker Margins":
+        summary = loaded["summary"]
+        names = [row['BookmakerName'] for row in summary]
+        values = [row['AvgMargin'] for row in summary]
+        errors = [row['StdMargin'] for row in summary]
+
+        x = np.arange(len(names))
+
+        ax.bar(x, values, yerr=errors, capsize=5, color='skyblue', alpha=0.9)
+        ax.set_xticks(x)
+        ax.set_xticklabels(names, rotation=45, ha='right')
+
+        ax.set_title(f"Average Bookmaker Margin by Bookmaker ({season})")
+        ax.set_ylabel("Average Margin (%)")
+        ax.set_xlabel("Bookmaker")
+        ax.grid(axis='y', linestyle='--', linewidth=0.5)
+
+    elif chart_mode == "Over / Under 2.5 - Implied vs Actual":
+        ou_data = select_rows(loaded["over_under"], valid_odds_mask(loaded["over_under"]["odds"]))
+        if not len(ou_data["MatchID"]):
+            raise ChartError("No Valid Data", "No valid odds rows available.")
+
+        # Normalized implied probs: column 0 is Over, column 1 is Under
+        ou_probs, _ = implied_probabilities(ou_data["odds"])
+        column = 0 if ou_target == "Over" else 1
+        implied = ou_probs[:, column]
+        actual = (ou_data["result"] == column).astype(float)
+
+        # Bin implied probabilities (e.g., 0.40-0.45, 0.45-0.50, etc.)
+        bins = np.arange(0.35, 0.81, 0.05)
+        calibration = calibration_bins(implied, actual, bins)
+        bin_centers = calibration["centers"]
+        binned_implied = calibration["mean_prob"] * 100
+        binned_actual = calibration["observed"] * 100
+
+        width = 0.035
+
+        chart.bars("implied", bin_centers - width, binned_implied, width=0.035, label="Implied Over %", color='gray')
+        chart.bars("actual", bin_centers + width, binned_actual, width=0.035, label="Actual Over %", color='blue')
+
+        ax.set_xticks(bin_centers)
+        ax.set_xticklabels([f"{int(p*100)}%" for p in bin_centers])
+        ax.set_title(f"{bookmaker} — {ou_target} 2.5: Implied vs Actual ({season})")
+        ax.set_ylabel("Percentage")
+        ax.set_xlabel(f"Implied {ou_target} Probability Bin")
+        ax.legend()
+
+    elif chart_mode == "Goal Model vs Bookmaker":
+        model = loaded["model"]
+        matched = np.isin(data["MatchID"], model["MatchID"])
+        if not matched.any():
+            raise ChartError("No Model", "No goal model predictions for this season. Run the ETL first.")
+
+        data = select_rows(data, matched)
+        probs = probs[matched]
+        model_probs = model["probs"][np.searchsorted(model["MatchID"], data["MatchID"])]
+        data["model_probs"] = model_probs
+        result = data["result"]
+
+        chart.clear()
+        figure = chart.figure
+        ax = figure.add_subplot(121)
+        colors = ['blue', 'gray', 'red']
+        for k, label in enumerate(['Home Win', 'Draw', 'Away Win']):
+            ax.scatter(probs[:, k] * 100, model_probs[:, k] * 100, s=10, alpha=0.5,
+                       color=colors[k], label=label)
+        ax.plot([0, 100], [0, 100], color='black', linestyle='--', linewidth=0.8)
+        ax.set_xlabel(f"{bookmaker} Implied Probability (%)")
+        ax.set_ylabel("Goal Model Probability (%)")
+        ax.set_title(f"Goal Model vs {bookmaker} ({season})")
+        ax.legend()
+
+        # In-sample scores: the model was fitted on the same season
+        ax2 = figure.add_subplot(122)
+        scores = [brier_score(probs, result), brier_score(model_probs, result),
+                  log_loss(probs, result), log_loss(model_probs, result)]
+        x = np.arange(2)
+        width = 0.35
+        ax2.bar(x - width/2, scores[0::2], width, label=bookmaker, color='gray')
+        ax2.bar(x + width/2, scores[1::2], width, label='Goal Model', color='blue')
+        ax2.set_xticks(x)
+        ax2.set_xticklabels(['Brier Score', 'Log-loss'])
+        ax2.set_title(f"Scores over {len(result)} matches (lower is better)")
+        ax2.legend()
+
+    chart.draw(legend=False)
+    return data
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# charts/team_trend.py
+
+# Team Trend charts: a team's points, goals, results, league position or
+# Elo rating match by match, over one or more seasons.
+
+from models.form_model import get_team_rolling_form
+from models.standings_model import get_team_position_history
+from models.rating_model import get_team_rating_history
+from charts.common import ChartError, mark_season_boundaries
+
+TEAM_TREND_MODES = [
+    "Cumulative Points",
+    "Goal Difference",
+    "Goals For / Against",
+    "Match Results (W / D / L)",
+    "League Position",
+    "Elo Rating",
+]
+
+# Name of each chart in exported file names
+EXPORT_NAMES = {
+    "Cumulative Points": "Points",
+    "Goal Difference": "Goal-Diff",
+    "Goals For / Against": "Goals-For-Against",
+    "Match Results (W / D / L)": "Match-Results",
+    "League Position": "League-Position",
+    "Elo Rating": "Elo-Rating",
+}
+
+def load_team_trend(mode, team, seasons, window, team2=None):
+    """
+    Query the data of a Team Trend chart: the team's rolling form (raw
+    values and averages over window matches), team2's for a comparison,
+    and the position or rating history for those modes. seasons is a list
+    of season names (None means all). Raise ChartError if there is no data.
+    """
+    trend = {"data": get_team_rolling_form(team, window, seasons), "data2": None, "history": None}
+    if not trend["data"]:
+        raise ChartError("No Data", "No data available for this team and season.")
+
+    if team2:
+        trend["data2"] = get_team_rolling_form(team2, window, seasons)
+        if not trend["data2"]:
+            raise ChartError("No Data", f"No data for {team2}")
+
+    if mode == "League Position":
+        trend["history"] = get_team_position_history(team, seasons)
+        if not trend["history"]:
+            raise ChartError("No Data", "No league standings available for this team and season.")
+
+    elif mode == "Elo Rating":
+        trend["history"] = get_team_rating_history(team, seasons)
+        if not trend["history"]:
+            raise ChartError("No Data", "No ratings available for this team and season.")
+
+    return trend
+
+def draw_team_trend(chart, mode, team, trend, season, multi_season, smooth, team2=None):
+    """
+    Draw a Team Trend chart on chart (a ChartArtists) from load_team_trend's
+    result. season is the label of the selected seasons. Return the rows
+    the chart shows (for hover text and data export).
+    """
+    data = trend["data"]
+    matchdays = list(range(1, len(data) + 1))
+
+    # Line charts keep their axes and lines while only the team or the
+    # seasons change; the results scatter is drawn from scratch
+    layout = None if mode == "Match Results (W / D / L)" else (mode, bool(team2), multi_season)
+    ax = chart.axes(layout)
+    shown = data
+
+    if mode == "Cumulative Points":
+        column = "AvgCumPoints" if smooth else "CumPoints"
+        if team2:
+            series1 = [float(row[column]) for row in data]
+            series2 = [float(row[column]) for row in trend["data2"]]
+
+            md1 = list(range(1, len(series1) + 1))
+            md2 = list(range(1, len(series2) + 1))
+
+            chart.line("team", md1, series1, marker='o', label=team, color='blue')
+            chart.line("team2", md2, series2, marker='o', label=team2, color='green')
+
+        else:  # Single team view
+            series = [float(row[column]) for row in data]
+            chart.line("team", matchdays, series, marker='o', label="Cumulative Points")
+
+        ax.set_ylabel("Points")
+        ax.set_title(f"{team} — {mode} ({season})")
+
+    elif mode == "Goal Difference":
+        if smooth:
+            gd = [float(row["AvgGD"]) for row in data]
+        else:
+            gd = [row["GF"] - row["GA"] for row in data]
+
+        chart.line("team", matchdays, gd, marker='o', label="Goal Difference")
+        ax.set_ylabel("Goal Diff")
+        ax.set_title(f"{team} — {mode} ({season})")
+
+    elif mode == "Goals For / Against":
+        if smooth:
+            gf = [float(row["AvgGF"]) for row in data]
+            ga = [float(row["AvgGA"]) for row in data]
+        else:
+            gf = [row["GF"] for row in data]
+            ga = [row["GA"] for row in data]
+
+        chart.line("for", matchdays, gf, marker='o', label="Goals For", color='green')
+        chart.line("against", matchdays, ga, marker='o', label="Goals Against", color='red')
+        ax.set_ylabel("Goals")
+        ax.set_title(f"{team} — {mode} ({season})")
+
+    elif mode == "Match Results (W / D / L)":
+        points = [row["Points"] for row in data]
+        colors = []
+        result_labels = []
+
+        for p in points:
+            if p == 3:
+                colors.append("green")
+                result_labels.append("W")
+            elif p == 1:
+                colors.append("orange")
+                result_labels.append("D")
+            else:
+                colors.append("red")
+                result_labels.append("L")
+
+        ax.scatter(matchdays, points, color=colors, label="Match Result", zorder=3)
+
+        # Annotate W/D/L above each point
+        for x, y, label in zip(matchdays, points, result_labels):
+            ax.text(x, y + 0.2, label, ha="center", va="bottom", fontsize=8)
+
+        ax.set_ylabel("Result (W=3, D=1, L=0)")
+        ax.set_title(f"{team} — {mode} ({season})", pad=20)
+
+    elif mode == "League Position":
+        history = shown = trend["history"]
+        league_matchdays = list(range(1, len(history) + 1))
+        positions = [row["Position"] for row in history]
+
+        chart.line("team", league_matchdays, positions, marker='o', label="League Position", color='navy')
+        if not ax.yaxis_inverted():
+            ax.invert_yaxis()
+        ax.set_ylabel("Position")
+        ax.set_title(f"{team} — {mode} ({season})")
+
+        if multi_season:
+            chart.extra(*mark_season_boundaries(ax, league_matchdays, [row["SeasonName"] for row in history]))
+
+    elif mode == "Elo Rating":
+        history = shown = trend["history"]
+        rated_matches = list(range(1, len(history) + 1))
+        ratings = [float(row["PostRating"]) for row in history]
+
+        chart.line("team", rated_matches, ratings, marker='o', markersize=3, label="Elo Rating", color='purple')
+        ax.set_ylabel("Rating")
+        ax.set_title(f"{team} — {mode} ({season})")
+
+        if multi_season:
+            chart.extra(*mark_season_boundaries(ax, rated_matches, [row["SeasonName"] for row in history]))
+
+    if multi_season and mode not in ("League Position", "Elo Rating"):
+        chart.extra(*mark_season_boundaries(ax, matchdays, [row["SeasonName"] for row in data]))
+
+    ax.set_xlabel("Match (across seasons)" if multi_season else "Matchday")
+    chart.draw()
+    return shown
@@ -3,6 +3,8 @@
 #--------------------------------#
 
 import os
+import sys
+import sqlite3
 import warnings
 import pandas as pd
 from configparser import ConfigParser
@@ -20,35 +22,18 @@ BOLD = "\033[1m"
 UNDERLINE = "\033[4m"
 RESET = "\033[0m"
 
-def __read_config(config_file = 'config.ini', section = 'mysql'):
+def __app_config():
     """
-    Private function to read the configuration file config_file 
-    with the given section. If successful, return the configuration 
-    as a dictionary, else raise an exception.
+    Private function to import the app's configuration module
+    (pl_gui/db/config.py), so the notebooks read the backend, the profiles
+    and the file= references of an ini file the same way as the app.
     """
-    parser = ConfigParser()
-    
-    # Does the configuration file exist?
-    if os.path.isfile(config_file):
-        parser.read(config_file)
-    else:
-        raise Exception(f"Configuration file '{config_file}' "
-                        "doesn't exist.")
-    
-    config = {}
-    
-    if parser.has_section(section):
-        # Parse the configuration file.
-        items = parser.items(section)
-        
-        # Construct the parameter dictionary.
-        for item in items:
-            config[item[0]] = item[1]
-            
-    else:
-        raise Exception(f'Section [{section}] missing ' + \
-                        f'in config file {config_file}')
-    
+    here = os.path.dirname(os.path.abspath(__file__))
+    for folder in (here, os.path.join(here, 'pl_gui')):
+        if os.path.isfile(os.path.join(folder, 'db', 'config.py')) and folder not in sys.path:
+            sys.path.insert(0, folder)
+    from db import config
+
     return config
 
 def db_connection(config_file = 'config.ini', section = 'mysql'):
@@ -56,15 +41,27 @@ def db_connection(config_file = 'config.ini', section = 'mysql'):
     Public function to make a database connection using the 
     configuration file config_file with the given section. 
     If successful, return the connection, else raise an exception.
+    A [database] section with backend = sqlite opens the embedded
+    database of its [sqlite] section instead.
     """
+    config = __app_config()
+    try:
+        settings = config.database_settings(config_file, section)
+    except config.ConfigError as e:
+        raise Exception(str(e))
+
     try:
-        db_config = __read_config(config_file, section)
-        conn = MySQLConnection(**db_config)
+        if settings['backend'] == 'sqlite':
+            # The app's SQLite backend, so the MySQL queries run unchanged
+            from db.sqlite_backend import connect
+            return connect(settings['sqlite_path'])
+
+        conn = MySQLConnection(**settings['mysql'])
 
         if conn.is_connected():
             return conn
 
-    except Error as e:
+    except (Error, sqlite3.Error) as e:
         raise Exception(f'Connection failed: {e}')
 
 def df_query(conn, sql):
@@ -77,7 +74,7 @@ def df_query(conn, sql):
     
     try:
         return pd.read_sql_query(sql, conn)
-    except Error as e:
+    except (Error, sqlite3.Error) as e:
         raise Exception(f'Query failed: {e}')
 
 # Copyright (c) 2025 by Ronald Mak
\ No newline at end of file
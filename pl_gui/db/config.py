@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# db/config.py
+
+# Connection configuration (connection.ini).
+# The file is located and parsed once and validated as a whole; later calls
+# return the cached settings. The file is watched: at most every
+# WATCH_INTERVAL seconds its modification time is checked, and a changed
+# file is reloaded and the registered listeners are told.
+#
+# Profiles select which server settings are used:
+#   [database] profile = remote      (or the PL_DB_PROFILE environment variable)
+#   [mysql:remote]                   inline host/port/user/password/database, or
+#   file = ../premier_league_analytics_remote.ini   (its [mysql] section, or
+#   section = ...)                                  another one)
+# Without a profile the [mysql] section is used.
+
+import configparser
+import os
+import sys
+import time
+
+CONNECTION_FILE = "connection.ini"
+BACKENDS = ("mysql", "sqlite")
+PROFILE_ENV = "PL_DB_PROFILE"
+WATCH_INTERVAL = 1.0
+DEFAULT_PORT = 3306
+
+MYSQL_KEYS = ("host", "user", "password", "database")
+
+_cache = {"path": None, "stamp": None, "checked": 0.0, "config": None}
+_listeners = []
+
+class ConfigError(RuntimeError):
+    pass
+
+def config_path():
+    """
+    Path of connection.ini: next to main.py if it is there, otherwise in the
+    current working directory. Resolved once per process.
+    """
+    if _cache["path"] is None:
+        try_main_path = os.path.join(os.path.dirname(os.path.realpath(sys.argv[0])), CONNECTION_FILE)
+        try_cwd_path = os.path.join(os.getcwd(), CONNECTION_FILE)
+        _cache["path"] = try_main_path if os.path.exists(try_main_path) else try_cwd_path
+    return _cache["path"]
+
+def add_config_listener(callback):
+    """
+    Call callback(config) whenever connection.ini is reloaded after a change.
+    """
+    _listeners.append(callback)
+
+def _stamp(path):
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (info.st_mtime_ns, info.st_size)
+
+def _relative_path(base_file, path):
+    return os.path.join(os.path.dirname(base_file), os.path.expanduser(path))
+
+# Parsed ini files: real path -> ((mtime, size), parser). A file is parsed
+# again only when it changes (the notebooks connect once per query cell)
+_parsers = {}
+
+def _read_parser(ini_path):
+    name = os.path.basename(ini_path)
+    path = os.path.realpath(ini_path)
+    stamp = _stamp(path)
+    if stamp is None:
+        raise ConfigError(f"Configuration file {name} was not found.")
+
+    cached = _parsers.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    parser = configparser.ConfigParser()
+    try:
+        parser.read(path)
+    except configparser.Error as e:
+        raise ConfigError(f"Configuration file {name} is not valid: {e}")
+    _parsers[path] = (stamp, parser)
+    return parser
+
+def _profile(parser):
+    """
+    The selected profile, or None. PL_DB_PROFILE only applies to files with
+    a [database] section or that profile's section, so other ini files (the
+    notebooks' ones) keep using their [mysql] section.
+    """
+    profile = os.environ.get(PROFILE_ENV) or parser.get("database", "profile", fallback="").strip() or None
+    if profile and "database" not in parser and f"mysql:{profile}" not in parser:
+        return None
+    return profile
+
+def _mysql_settings(parser, ini_path, section):
+    """
+    Server settings of a [mysql] or [mysql:<profile>] section.
+    """
+    name = os.path.basename(ini_path)
+    if section not in parser:
+        raise ConfigError(f"Section [{section}] not found in {name}")
+    values = dict(parser[section])
+
+    # A profile may point to another ini file (e.g. the notebooks' ones)
+    if "file" in values:
+        other_path = _relative_path(ini_path, values.pop("file"))
+        other_section = values.pop("section", "mysql")
+        if _stamp(other_path) is None:
+            raise ConfigError(f"[{section}]: file {other_path} was not found.")
+        other = _read_parser(other_path)
+        if other_section not in other:
+            raise ConfigError(f"[{section}]: section [{other_section}] not found in {other_path}")
+        values = {**dict(other[other_section]), **values}
+
+    for key in MYSQL_KEYS:
+        if key not in values:
+            raise ConfigError(f"Missing '{key}' in [{section}] section of {name}")
+    try:
+        values["port"] = int(values.get("port", DEFAULT_PORT))
+    except ValueError:
+        raise ConfigError(f"Invalid port '{values['port']}' in [{section}] section of {name}")
+    return {key: values[key] for key in ("host", "port", "user", "password", "database")}
+
+def database_settings(ini_path, section="mysql"):
+    """
+    Read the database settings of an ini file (connection.ini or the
+    notebooks' ones). Return a dict with backend, profile, mysql (the
+    server settings of section, or of the selected profile for the default
+    [mysql] section; None for the sqlite backend) and sqlite_path.
+    """
+    parser = _read_parser(ini_path)
+    backend = parser.get("database", "backend", fallback="mysql").strip().lower()
+    if backend not in BACKENDS:
+        raise ConfigError(f"Unknown backend '{backend}' in [database] section of {os.path.basename(ini_path)}")
+
+    profile = _profile(parser) if section == "mysql" else None
+    if profile:
+        section = f"mysql:{profile}"
+
+    return {
+        "backend": backend,
+        "profile": profile,
+        "mysql": _mysql_settings(parser, ini_path, section) if backend == "mysql" else None,
+        "sqlite_path": _relative_path(ini_path, parser.get("sqlite", "path", fallback="premier_league_analytics.db")),
+    }
+
+def parse_config(ini_path):
+    """
+    Read and validate connection.ini. Return a dict with path, backend,
+    profile, mysql (server settings, None for the sqlite backend),
+    sqlite_path and replica (enabled, path, check_interval).
+    """
+    settings = database_settings(ini_path)
+    parser = _read_parser(ini_path)
+
+    try:
+        replica = {
+            "enabled": settings["backend"] == "mysql" and parser.getboolean("replica", "enabled", fallback=False),
+            "path": _relative_path(ini_path, parser.get("replica", "path", fallback="premier_league_replica.db")),
+            "check_interval": parser.getfloat("replica", "check_interval", fallback=60),
+        }
+    except ValueError as e:
+        raise ConfigError(f"Invalid value in [replica] section of {CONNECTION_FILE}: {e}")
+
+    return {"path": ini_path, **settings, "replica": replica}
+
+def load_config():
+    """
+    Return the parsed connection.ini, reloading it if the file changed
+    (checked at most every WATCH_INTERVAL seconds).
+    """
+    now = time.monotonic()
+    if _cache["config"] is not None and now - _cache["checked"] < WATCH_INTERVAL:
+        return _cache["config"]
+
+    path = config_path()
+    stamp = _stamp(path)
+    _cache["checked"] = now
+    if _cache["config"] is not None and stamp == _cache["stamp"]:
+        return _cache["config"]
+
+    if stamp is None:
+        raise ConfigError(f"Configuration file {CONNECTION_FILE} was not found.")
+
+    changed = _cache["config"] is not None
+    _cache["config"] = parse_config(path)
+    _cache["stamp"] = stamp
+    if changed:
+        for callback in _listeners:
+            callback(_cache["config"])
+    return _cache["config"]
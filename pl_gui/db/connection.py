@@ -7,73 +7,79 @@
 
 # db/connection.py
 
-from PyQt5.QtWidgets import QMessageBox, QApplication
-import os
+from db.config import load_config, ConfigError
 import sys
-import mysql.connector
-import configparser
 
-CONNECTION_FILE = "connection.ini"
+def _load_config():
+    try:
+        return load_config()
+    except ConfigError as e:
+        fatal_message(str(e))
 
 def get_connection():
-    config = configparser.ConfigParser()
- 
-    # First: try to load connection.ini from same directory as main.py
-    # Second: fall back to current working directory
-    try_main_path = os.path.join(os.path.dirname(os.path.realpath(sys.argv[0])), CONNECTION_FILE)
-    try_cwd_path = os.path.join(os.getcwd(), CONNECTION_FILE)
-    ini_path = try_main_path if os.path.exists(try_main_path) else try_cwd_path
-
-    # print(f"Connection configuration file: {ini_path}")
+    config = _load_config()
 
-    if not os.path.exists(ini_path):
-        fatal_message(f"Configuration file {CONNECTION_FILE} was not found.")
+    if config["backend"] == "sqlite":
+        from db.sqlite_backend import connect
+        return connect(config["sqlite_path"])
 
-    config.read(ini_path)
+    import mysql.connector
+    return mysql.connector.connect(**config["mysql"])
 
-    if "mysql" not in config:
-        fatal_message(f"Section [mysql] not found in {CONNECTION_FILE}")
+def get_read_connection():
+    """
+    Connection for read-only queries. When [replica] enabled = yes (MySQL
+    backend only) this is the local replica file, synced from the server
+    when it has new data (checked at most every check_interval seconds);
+    otherwise it is the same as get_connection().
+    """
+    config = _load_config()
 
-    db_cfg = config["mysql"]
-    required = ["host", "port", "user", "password", "database"]
+    if not config["replica"]["enabled"]:
+        return get_connection()
 
-    for key in required:
-        if key not in db_cfg:
-            fatal_message(f"Missing '{key}' in [mysql] section of {CONNECTION_FILE}")
-
-    return mysql.connector.connect(
-        host=db_cfg["host"],
-        port=int(db_cfg["port"]),
-        user=db_cfg["user"],
-        password=db_cfg["password"],
-        database=db_cfg["database"],
-    )
+    from db.replica import replica_connection
+    return replica_connection(config["replica"]["path"], config["replica"]["check_interval"])
 
 def get_db_config():
-    config = configparser.ConfigParser()
-    
-    try_main_path = os.path.join(os.path.dirname(os.path.realpath(sys.argv[0])), CONNECTION_FILE)
-    try_cwd_path = os.path.join(os.getcwd(), CONNECTION_FILE)
-    ini_path = try_main_path if os.path.exists(try_main_path) else try_cwd_path
-
-    config.read(ini_path)
+    """
+    Return the connection settings. For the sqlite backend "database" is
+    the path of the database file and the server fields are empty.
+    """
+    config = _load_config()
+
+    if config["backend"] == "sqlite":
+        return {
+            "backend": "sqlite",
+            "host": "",
+            "port": "",
+            "user": "",
+            "password": "",
+            "database": config["sqlite_path"],
+        }
+
+    mysql = config["mysql"]
     return {
-        "host": config["mysql"]["host"],
-        "port": config["mysql"]["port"],
-        "user": config["mysql"]["user"],
-        "password": config["mysql"]["password"],
-        "database": config["mysql"]["database"],
+        "backend": "mysql",
+        "host": mysql["host"],
+        "port": str(mysql["port"]),
+        "user": mysql["user"],
+        "password": mysql["password"],
+        "database": mysql["database"],
     }
 
+# Called with the message of a fatal configuration error before the program
+# exits: the GUI shows it in a dialog, the default prints it to stderr
+_fatal = {"handler": None}
+
+def set_fatal_handler(handler):
+    _fatal["handler"] = handler
+
 def fatal_message(message):
-    app = QApplication.instance() or QApplication(sys.argv)    
-    box = QMessageBox()
-    box.setIcon(QMessageBox.Critical)
-    box.setWindowTitle("Startup Error")
-    box.setText(message)
-    box.setStandardButtons(QMessageBox.Ok)
-    box.button(QMessageBox.Ok).setText("Quit")
-    box.exec_()
+    if _fatal["handler"]:
+        _fatal["handler"](message)
+    else:
+        print(f"Startup Error: {message}", file=sys.stderr)
     sys.exit(1)
 
  
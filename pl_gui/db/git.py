@@ -7,14 +7,35 @@
 
 # db/git.py
 
+# The version is the number of commits in the repository. It is computed
+# once per process: from the VERSION file next to main.py when a build wrote
+# one (git rev-list --all --count > VERSION), otherwise by asking git.
+
+import os
 import subprocess
 
+VERSION_FILE = "VERSION"
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_version = None
+
 def get_git_version():
-    version = None
+    global _version
+    if _version is None:
+        _version = _read_version_file() or _ask_git()
+    return _version
+
+def _read_version_file():
+    try:
+        with open(os.path.join(_APP_DIR, VERSION_FILE)) as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+def _ask_git():
     try:
-        version = subprocess.check_output(["git", "rev-list", "--all", "--count"], stderr=subprocess.DEVNULL)
-        version = version.decode().strip()
+        version = subprocess.check_output(["git", "rev-list", "--all", "--count"],
+                                          cwd=_APP_DIR, stderr=subprocess.DEVNULL)
+        return version.decode().strip()
     except Exception:
-        version = ""
-    # print(f"Git version: {version}")
-    return version
+        return ""
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# db/query.py
+
+def in_filter(column, values):
+    """
+    Build an " AND column IN (...)" filter and its parameters.
+    An empty or None list of values means no filter.
+    """
+    if not values:
+        return "", ()
+    placeholders = ", ".join(["%s"] * len(values))
+    return f" AND {column} IN ({placeholders})", tuple(values)
+
+def latest_etl_batch(cursor):
+    """
+    Return the LogID of the last completed ETL run (0 if none).
+    Used as a version number by caches of data derived from the ETL.
+    """
+    cursor.execute("SELECT COALESCE(MAX(LogID), 0) AS Batch FROM ETLLog WHERE Status = 'Completed'")
+    row = cursor.fetchone()
+    return row["Batch"] if isinstance(row, dict) else row[0]
+
+def data_version(cursor):
+    """
+    Return a fingerprint of the loaded data: last completed ETL run, match,
+    season and bookmaker counts and the MatchID high-water mark. It changes
+    after an ETL run, a clean, a restore or a bookmaker cleanup.
+    """
+    cursor.execute("""
+        SELECT (SELECT COALESCE(MAX(LogID), 0) FROM ETLLog WHERE Status = 'Completed') AS Batch,
+               (SELECT COUNT(*) FROM Matches) AS MatchCount,
+               (SELECT COALESCE(MAX(MatchID), 0) FROM Matches) AS MaxMatchID,
+               (SELECT COUNT(*) FROM Seasons) AS SeasonCount,
+               (SELECT COUNT(*) FROM Bookmakers) AS BookmakerCount
+    """)
+    row = cursor.fetchone()
+    values = row.values() if isinstance(row, dict) else row
+    return tuple(int(value) for value in values)
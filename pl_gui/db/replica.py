@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# db/replica.py
+
+# Local read replica of the MySQL database.
+# Read-only queries (dropdowns, charts, tables) run against an embedded
+# SQLite copy of the operational and application tables, so they don't pay
+# the network round trip to a remote server. Writes, the ETL and the user
+# accounts stay on the primary. The replica is brought up to date when the
+# primary has a newer ETL run (ETLLog completion time) or a different set of
+# matches: append-only tables copy only the rows above the MatchID
+# high-water mark, the derived tables are re-copied from the first new match
+# date (the ETL rewrites them from there), small tables are copied whole.
+# A final row count check reloads any table that still differs.
+
+from db.connection import get_connection, get_db_config
+from db.config import add_config_listener
+from db.schema import APP_TABLES, ensure_tables
+from db.sqlite_backend import connect
+import time
+
+# Rows copied per round trip
+COPY_BATCH = 5000
+
+# How each table is brought up to date: "full" (copied whole), "match"
+# (rows whose column is above the MatchID high-water mark) or "date" (rows
+# whose column is on or after the first new match date)
+REPLICA_TABLES = [
+    ("Teams", "full", None),
+    ("Seasons", "full", None),
+    ("Referees", "full", None),
+    ("Divisions", "full", None),
+    ("Bookmakers", "full", None),
+    ("Markets", "full", None),
+    ("ETLLog", "full", None),
+    ("Matches", "match", "MatchID"),
+    ("MatchStatistics", "match", "MatchID"),
+    ("BettingOdds", "match", "MatchID"),
+    ("LeagueStandings", "date", "AsOfDate"),
+    ("TeamRatings", "date", "MatchDate"),
+    ("HeadToHead", "date", "MatchDate"),
+    ("GoalModelFits", "full", None),
+    ("GoalModelTeams", "full", None),
+    ("GoalModelPredictions", "full", None),
+]
+
+SYNC_TABLE = """
+    CREATE TABLE IF NOT EXISTS ReplicaSync (
+        Id INTEGER PRIMARY KEY,
+        Source TEXT,
+        LastLogID INTEGER,
+        LastEndTime TEXT,
+        LogCount INTEGER,
+        MaxMatchID INTEGER,
+        MatchCount INTEGER,
+        SyncedAt TEXT
+    )
+"""
+
+# Time of the last freshness check of each replica file, and whether the
+# next sync must reload every table
+_checked = {}
+_reload = {"full": False}
+
+def mark_replica_stale(full=False):
+    """
+    Make the next read check the primary again (after an ETL run or a
+    clean). With full=True the next sync reloads every table, for changes
+    the ETLLog / Matches state doesn't show (e.g. bookmaker cleanup).
+    """
+    _checked.clear()
+    if full:
+        _reload["full"] = True
+
+# A changed connection.ini (e.g. another profile) is checked on the next read
+add_config_listener(lambda config: mark_replica_stale())
+
+def _source_name():
+    config = get_db_config()
+    return f"{config['host']}:{config['port']}/{config['database']}"
+
+def _source_state(cursor):
+    """
+    State of the primary in one round trip: last completed ETL run and its
+    end time, number of ETLLog rows, MatchID high-water mark and match count.
+    """
+    cursor.execute("""
+        SELECT (SELECT COALESCE(MAX(LogID), 0) FROM ETLLog WHERE Status = 'Completed'),
+               (SELECT MAX(EndTime) FROM ETLLog WHERE Status = 'Completed'),
+               (SELECT COUNT(*) FROM ETLLog),
+               (SELECT COALESCE(MAX(MatchID), 0) FROM Matches),
+               (SELECT COUNT(*) FROM Matches)
+    """)
+    return _state_key(cursor.fetchone())
+
+def _state_key(row):
+    last_log_id, last_end, log_count, max_match_id, match_count = row
+    return (int(last_log_id), str(last_end) if last_end else None, int(log_count),
+            int(max_match_id), int(match_count))
+
+def _copy_rows(source, target, table, where="", params=()):
+    """
+    Copy the rows of table matching where from source to target, in batches,
+    using the columns both sides have. Return the number of rows copied.
+    """
+    target.execute(f"SHOW COLUMNS FROM {table}")
+    target_columns = {row[0] for row in target.fetchall()}
+
+    source.execute(f"SELECT * FROM {table} WHERE 1 = 0")
+    source.fetchall()
+    columns = [c for c in source.column_names if c in target_columns]
+    column_list = ", ".join(f"`{c}`" for c in columns)
+
+    source.execute(f"SELECT {column_list} FROM {table}{where}", params)
+    insert_sql = f"REPLACE INTO {table} ({column_list}) VALUES ({', '.join(['%s'] * len(columns))})"
+
+    copied = 0
+    while True:
+        rows = source.fetchmany(COPY_BATCH)
+        if not rows:
+            break
+        target.executemany(insert_sql, rows)
+        copied += len(rows)
+    return copied
+
+def _table_counts(cursor):
+    sql = ", ".join(f"(SELECT COUNT(*) FROM {table})" for table, _, _ in REPLICA_TABLES)
+    cursor.execute(f"SELECT {sql}")
+    return dict(zip((table for table, _, _ in REPLICA_TABLES), (int(n) for n in cursor.fetchone())))
+
+def sync_replica(path, full=False):
+    """
+    Bring the replica at path up to date with the primary. Return the number
+    of rows copied per table ({} if the replica was already current). The
+    whole sync is one transaction, so readers never see a partial copy.
+    """
+    primary = get_connection()
+    replica = connect(path)
+    source = primary.cursor(buffered=True)
+    target = replica.cursor()
+    try:
+        ensure_tables(source, *APP_TABLES)
+        for ddl in APP_TABLES.values():
+            target.execute(ddl)
+        target.execute(SYNC_TABLE)
+
+        state = _source_state(source)
+        source_name = _source_name()
+        target.execute("""
+            SELECT Source, LastLogID, LastEndTime, LogCount, MaxMatchID, MatchCount
+            FROM ReplicaSync WHERE Id = 1
+        """)
+        synced = target.fetchone()
+        if synced and synced[0] != source_name:
+            full = True   # replica of another server or database
+        elif not full and synced and _state_key(synced[1:]) == state:
+            return {}
+
+        # Foreign keys are off while tables are copied in pieces
+        target.execute("SET FOREIGN_KEY_CHECKS = 0")
+
+        target.execute("SELECT COALESCE(MAX(MatchID), 0) FROM Matches")
+        high_water = target.fetchone()[0]
+        if full or state[3] < high_water:
+            high_water = 0   # primary was cleaned and reloaded: copy everything
+        source.execute("SELECT MIN(MatchDate) FROM Matches WHERE MatchID > %s", (high_water,))
+        first_new_date = source.fetchone()[0]
+
+        copied = {}
+        for table, mode, column in REPLICA_TABLES:
+            if mode == "full" or high_water == 0:
+                target.execute(f"DELETE FROM {table}")
+                copied[table] = _copy_rows(source, target, table)
+            elif mode == "match":
+                copied[table] = _copy_rows(source, target, table, f" WHERE {column} > %s", (high_water,))
+            elif first_new_date is not None:
+                target.execute(f"DELETE FROM {table} WHERE {column} >= %s", (first_new_date,))
+                copied[table] = _copy_rows(source, target, table, f" WHERE {column} >= %s", (first_new_date,))
+
+        # Anything the incremental pass missed (e.g. rows deleted by a clean) is reloaded
+        source_counts = _table_counts(source)
+        target_counts = _table_counts(target)
+        for table, count in source_counts.items():
+            if target_counts[table] != count:
+                target.execute(f"DELETE FROM {table}")
+                copied[table] = _copy_rows(source, target, table)
+
+        target.execute("""
+            REPLACE INTO ReplicaSync (Id, Source, LastLogID, LastEndTime, LogCount, MaxMatchID, MatchCount, SyncedAt)
+            VALUES (1, %s, %s, %s, %s, %s, %s, NOW())
+        """, (source_name,) + state)
+        replica.commit()
+        return copied
+
+    except Exception:
+        replica.rollback()
+        raise
+
+    finally:
+        target.execute("SET FOREIGN_KEY_CHECKS = 1")
+        source.close()
+        target.close()
+        primary.close()
+        replica.close()
+
+def replica_connection(path, check_interval):
+    """
+    Return a connection to the replica at path. The primary is checked for
+    changes at most every check_interval seconds; if it can't be reached,
+    the replica keeps serving the last synced data.
+    """
+    now = time.monotonic()
+    last = _checked.get(path)
+    if last is None or now - last >= check_interval:
+        full = _reload["full"]
+        try:
+            sync_replica(path, full=full)
+            _reload["full"] = False
+        except Exception as e:
+            if last is None and not _has_data(path):
+                raise RuntimeError(f"Replica sync failed: {e}")
+            print(f"Replica sync failed, using the local copy: {e}")
+        _checked[path] = now
+
+    return connect(path)
+
+def _has_data(path):
+    conn = connect(path)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'ReplicaSync'")
+        if not cursor.fetchone()[0]:
+            return False
+        cursor.execute("SELECT COUNT(*) FROM ReplicaSync")
+        return cursor.fetchone()[0] > 0
+    finally:
+        cursor.close()
+        conn.close()
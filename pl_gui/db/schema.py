@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# db/schema.py
+
+# Tables maintained by the application itself (derived from the operational
+# tables after each ETL). They are created on first use.
+APP_TABLES = {
+    "LeagueStandings": """
+        CREATE TABLE IF NOT EXISTS `LeagueStandings` (
+            `SeasonID` INT NOT NULL,
+            `Matchday` INT NOT NULL,
+            `AsOfDate` DATE NOT NULL,
+            `TeamID` INT NOT NULL,
+            `Position` INT NOT NULL,
+            `Played` INT NOT NULL,
+            `Won` INT NOT NULL,
+            `Drawn` INT NOT NULL,
+            `Lost` INT NOT NULL,
+            `GF` INT NOT NULL,
+            `GA` INT NOT NULL,
+            `GD` INT NOT NULL,
+            `Points` INT NOT NULL,
+            `LastMatchID` INT NOT NULL,
+            `CreatedDate` DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (`SeasonID`, `Matchday`, `TeamID`),
+            INDEX `idx_standings_date` (`SeasonID`, `AsOfDate`),
+            INDEX `idx_standings_team` (`TeamID`, `SeasonID`, `Matchday`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "TeamRatings": """
+        CREATE TABLE IF NOT EXISTS `TeamRatings` (
+            `MatchID` INT NOT NULL,
+            `TeamID` INT NOT NULL,
+            `SeasonID` INT NOT NULL,
+            `MatchDate` DATE NOT NULL,
+            `IsHome` TINYINT(1) NOT NULL,
+            `PreRating` DECIMAL(7,2) NOT NULL,
+            `PostRating` DECIMAL(7,2) NOT NULL,
+            `CreatedDate` DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (`MatchID`, `TeamID`),
+            INDEX `idx_ratings_team` (`TeamID`, `MatchDate`, `MatchID`),
+            INDEX `idx_ratings_date` (`MatchDate`, `MatchID`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "GoalModelFits": """
+        CREATE TABLE IF NOT EXISTS `GoalModelFits` (
+            `SeasonID` INT NOT NULL,
+            `ETLBatchID` INT NOT NULL,
+            `Matches` INT NOT NULL,
+            `LastMatchID` INT NOT NULL,
+            `HomeAdvantage` DOUBLE NOT NULL,
+            `Rho` DOUBLE NOT NULL,
+            `LogLikelihood` DOUBLE NOT NULL,
+            `Iterations` INT NOT NULL,
+            `FittedDate` DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (`SeasonID`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "GoalModelTeams": """
+        CREATE TABLE IF NOT EXISTS `GoalModelTeams` (
+            `SeasonID` INT NOT NULL,
+            `TeamID` INT NOT NULL,
+            `Attack` DOUBLE NOT NULL,
+            `Defence` DOUBLE NOT NULL,
+            PRIMARY KEY (`SeasonID`, `TeamID`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "GoalModelPredictions": """
+        CREATE TABLE IF NOT EXISTS `GoalModelPredictions` (
+            `MatchID` INT NOT NULL,
+            `SeasonID` INT NOT NULL,
+            `ExpHomeGoals` DOUBLE NOT NULL,
+            `ExpAwayGoals` DOUBLE NOT NULL,
+            `ProbHome` DOUBLE NOT NULL,
+            `ProbDraw` DOUBLE NOT NULL,
+            `ProbAway` DOUBLE NOT NULL,
+            PRIMARY KEY (`MatchID`),
+            INDEX `idx_predictions_season` (`SeasonID`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "HeadToHead": """
+        CREATE TABLE IF NOT EXISTS `HeadToHead` (
+            `TeamLowID` INT NOT NULL,
+            `TeamHighID` INT NOT NULL,
+            `MatchDate` DATE NOT NULL,
+            `MatchID` INT NOT NULL,
+            `SeasonID` INT NOT NULL,
+            `HomeTeamID` INT NOT NULL,
+            `LowGoals` INT NOT NULL,
+            `HighGoals` INT NOT NULL,
+            PRIMARY KEY (`TeamLowID`, `TeamHighID`, `MatchDate`, `MatchID`),
+            UNIQUE KEY `uq_h2h_match` (`MatchID`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "ETLLogSteps": """
+        CREATE TABLE IF NOT EXISTS `ETLLogSteps` (
+            `LogID` INT NOT NULL,
+            `StepNo` INT NOT NULL,
+            `TableName` VARCHAR(100) NOT NULL,
+            `RowsAffected` INT NOT NULL,
+            `Seconds` DOUBLE NOT NULL,
+            PRIMARY KEY (`LogID`, `StepNo`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    # ETL jobs requested by every client, run one at a time in QueueID order
+    "ETLQueue": """
+        CREATE TABLE IF NOT EXISTS `ETLQueue` (
+            `QueueID` INT AUTO_INCREMENT PRIMARY KEY,
+            `FileHash` VARCHAR(64) NOT NULL,
+            `RequestedBy` VARCHAR(100) NOT NULL,
+            `QueuedTime` DATETIME NOT NULL,
+            `StartTime` DATETIME,
+            `EndTime` DATETIME,
+            `Status` VARCHAR(20) NOT NULL,
+            `StepsDone` INT NOT NULL DEFAULT 0,
+            `CurrentStep` VARCHAR(255),
+            `LogID` INT,
+            `Message` TEXT,
+            INDEX `idx_etlqueue_status` (`Status`, `QueueID`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    # Analytical star schema, as defined by the analytical database setup
+    # notebook (so the tables it created are reused as they are)
+    "dim_Time": """
+        CREATE TABLE IF NOT EXISTS `dim_Time` (
+            `TimeID` INT AUTO_INCREMENT PRIMARY KEY,
+            `Date` DATE NOT NULL,
+            `DayOfWeek` INT,
+            `DayName` VARCHAR(10),
+            `DayOfMonth` INT,
+            `DayOfYear` INT,
+            `WeekOfYear` INT,
+            `Month` INT,
+            `MonthName` VARCHAR(10),
+            `Quarter` INT,
+            `Year` INT,
+            `Season` VARCHAR(10),
+            `Matchday` INT,
+            `IsWeekend` BOOLEAN,
+            `IsHoliday` BOOLEAN,
+            INDEX `idx_time_date` (`Date`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "fact_MatchResult": """
+        CREATE TABLE IF NOT EXISTS `fact_MatchResult` (
+            `MatchResultID` INT AUTO_INCREMENT PRIMARY KEY,
+            `MatchID` INT NOT NULL,
+            `TimeID` INT NOT NULL,
+            `HomeTeamID` INT NOT NULL,
+            `AwayTeamID` INT NOT NULL,
+            `RefereeID` INT,
+            `SeasonID` INT NOT NULL,
+            `DivisionID` INT NOT NULL,
+            `HomeGoals` INT NOT NULL,
+            `AwayGoals` INT NOT NULL,
+            `Result` CHAR(1) NOT NULL,
+            `HalfTimeHomeGoals` INT,
+            `HalfTimeAwayGoals` INT,
+            `HalfTimeResult` CHAR(1),
+            `HomePoints` INT GENERATED ALWAYS AS (CASE WHEN Result = 'H' THEN 3 WHEN Result = 'D' THEN 1 ELSE 0 END) STORED,
+            `AwayPoints` INT GENERATED ALWAYS AS (CASE WHEN Result = 'A' THEN 3 WHEN Result = 'D' THEN 1 ELSE 0 END) STORED,
+            `ETLBatchID` INT DEFAULT 1,
+            `LoadTimestamp` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (`TimeID`) REFERENCES `dim_Time`(`TimeID`),
+            INDEX `idx_match_time` (`TimeID`),
+            INDEX `idx_match_season` (`SeasonID`),
+            INDEX `idx_match_teams` (`HomeTeamID`, `AwayTeamID`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "fact_TeamMatchStats": """
+        CREATE TABLE IF NOT EXISTS `fact_TeamMatchStats` (
+            `TeamStatsID` INT AUTO_INCREMENT PRIMARY KEY,
+            `MatchID` INT NOT NULL,
+            `TeamID` INT NOT NULL,
+            `TimeID` INT NOT NULL,
+            `SeasonID` INT NOT NULL,
+            `IsHomeTeam` BOOLEAN NOT NULL,
+            `OpponentID` INT NOT NULL,
+            `Goals` INT NOT NULL,
+            `GoalsConceded` INT NOT NULL,
+            `Shots` INT,
+            `ShotsOnTarget` INT,
+            `Corners` INT,
+            `Fouls` INT,
+            `YellowCards` INT,
+            `RedCards` INT,
+            `Result` CHAR(1),
+            `Points` INT,
+            `ETLBatchID` INT DEFAULT 1,
+            `LoadTimestamp` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (`TimeID`) REFERENCES `dim_Time`(`TimeID`),
+            INDEX `idx_teamstats_team` (`TeamID`),
+            INDEX `idx_teamstats_match` (`MatchID`),
+            INDEX `idx_teamstats_time` (`TimeID`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "fact_LeagueSnapshot": """
+        CREATE TABLE IF NOT EXISTS `fact_LeagueSnapshot` (
+            `SnapshotID` INT AUTO_INCREMENT PRIMARY KEY,
+            `SeasonID` INT NOT NULL,
+            `DivisionID` INT NOT NULL,
+            `TimeID` INT NOT NULL,
+            `TeamID` INT NOT NULL,
+            `Position` INT NOT NULL,
+            `MatchesPlayed` INT NOT NULL,
+            `Won` INT NOT NULL,
+            `Drawn` INT NOT NULL,
+            `Lost` INT NOT NULL,
+            `GoalsFor` INT NOT NULL,
+            `GoalsAgainst` INT NOT NULL,
+            `GoalDifference` INT GENERATED ALWAYS AS (GoalsFor - GoalsAgainst) STORED,
+            `Points` INT NOT NULL,
+            `Form` VARCHAR(10),
+            `LastMatchID` INT,
+            `ETLBatchID` INT DEFAULT 1,
+            `LoadTimestamp` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (`TimeID`) REFERENCES `dim_Time`(`TimeID`),
+            INDEX `idx_snapshot_season` (`SeasonID`, `DivisionID`),
+            INDEX `idx_snapshot_team` (`TeamID`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+}
+
+_ensured = set()
+
+def ensure_tables(cursor, *names):
+    """
+    Create the given application tables if they don't exist yet.
+    Each table is checked only once per process and backend.
+    """
+    backend = type(cursor).__module__
+    for name in names:
+        if (backend, name) in _ensured:
+            continue
+        if name not in APP_TABLES:
+            raise RuntimeError(f"Unknown application table '{name}'.")
+        cursor.execute(APP_TABLES[name])
+        _ensured.add((backend, name))
+
+# Operational tables, staging table and views (the schema the setup notebook
+# creates on the MySQL server), in creation order. Used to create a new
+# embedded database; written in the MySQL dialect like the tables above.
+CORE_TABLES = {
+    "Users": """
+        CREATE TABLE IF NOT EXISTS `Users` (
+            `UserID` INT AUTO_INCREMENT PRIMARY KEY,
+            `Username` VARCHAR(50) NOT NULL UNIQUE,
+            `PasswordHash` VARCHAR(255) NOT NULL,
+            `Role` ENUM('admin', 'manager', 'user') NOT NULL,
+            `CreatedDate` DATETIME DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "Teams": """
+        CREATE TABLE IF NOT EXISTS `Teams` (
+            `TeamID` INT AUTO_INCREMENT PRIMARY KEY,
+            `TeamName` VARCHAR(100) NOT NULL UNIQUE,
+            `ShortName` VARCHAR(50) NOT NULL,
+            `Stadium` VARCHAR(100),
+            `City` VARCHAR(50),
+            `YearFounded` INT,
+            `CreatedDate` DATETIME DEFAULT CURRENT_TIMESTAMP,
+            `ModifiedDate` DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "Seasons": """
+        CREATE TABLE IF NOT EXISTS `Seasons` (
+            `SeasonID` INT AUTO_INCREMENT PRIMARY KEY,
+            `SeasonName` VARCHAR(20) NOT NULL UNIQUE,
+            `StartDate` DATE NOT NULL,
+            `EndDate` DATE NOT NULL,
+            `CreatedDate` DATETIME DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "Referees": """
+        CREATE TABLE IF NOT EXISTS `Referees` (
+            `RefereeID` INT AUTO_INCREMENT PRIMARY KEY,
+            `RefereeName` VARCHAR(100) NOT NULL UNIQUE,
+            `YearsExperience` INT,
+            `Nationality` VARCHAR(50),
+            `CreatedDate` DATETIME DEFAULT CURRENT_TIMESTAMP,
+            `ModifiedDate` DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "Divisions": """
+        CREATE TABLE IF NOT EXISTS `Divisions` (
+            `DivisionID` INT AUTO_INCREMENT PRIMARY KEY,
+            `DivisionCode` VARCHAR(10) NOT NULL UNIQUE,
+            `LeagueName` VARCHAR(100),
+            `Country` VARCHAR(50),
+            `Tier` INT,
+            `CreatedDate` DATETIME DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "Matches": """
+        CREATE TABLE IF NOT EXISTS `Matches` (
+            `MatchID` INT AUTO_INCREMENT PRIMARY KEY,
+            `SeasonID` INT NOT NULL,
+            `DivisionID` INT NOT NULL,
+            `MatchDate` DATE NOT NULL,
+            `MatchTime` TIME,
+            `HomeTeamID` INT NOT NULL,
+            `AwayTeamID` INT NOT NULL,
+            `FTHG` INT NOT NULL,
+            `FTAG` INT NOT NULL,
+            `FTR` CHAR(1) NOT NULL,
+            `HTHG` INT,
+            `HTAG` INT,
+            `HTR` CHAR(1),
+            `RefereeID` INT,
+            `CreatedDate` DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (`SeasonID`) REFERENCES `Seasons`(`SeasonID`),
+            FOREIGN KEY (`DivisionID`) REFERENCES `Divisions`(`DivisionID`),
+            FOREIGN KEY (`HomeTeamID`) REFERENCES `Teams`(`TeamID`),
+            FOREIGN KEY (`AwayTeamID`) REFERENCES `Teams`(`TeamID`),
+            FOREIGN KEY (`RefereeID`) REFERENCES `Referees`(`RefereeID`),
+            UNIQUE (`HomeTeamID`, `AwayTeamID`, `MatchDate`, `MatchTime`),
+            CHECK (`HomeTeamID` <> `AwayTeamID`),
+            CHECK (`FTR` IN ('H', 'D', 'A')),
+            CHECK (`HTR` IN ('H', 'D', 'A')),
+            INDEX `idx_matches_season` (`SeasonID`),
+            INDEX `idx_matches_division` (`DivisionID`),
+            INDEX `idx_matches_date` (`MatchDate`),
+            INDEX `idx_matches_teams` (`HomeTeamID`, `AwayTeamID`),
+            INDEX `idx_matches_referee` (`RefereeID`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "MatchStatistics": """
+        CREATE TABLE IF NOT EXISTS `MatchStatistics` (
+            `StatID` INT AUTO_INCREMENT PRIMARY KEY,
+            `MatchID` INT NOT NULL UNIQUE,
+            `HomeShots` INT CHECK (`HomeShots` >= 0),
+            `AwayShots` INT CHECK (`AwayShots` >= 0),
+            `HomeShotsTarget` INT CHECK (`HomeShotsTarget` >= 0),
+            `AwayShotsTarget` INT CHECK (`AwayShotsTarget` >= 0),
+            `HomeCorners` INT CHECK (`HomeCorners` >= 0),
+            `AwayCorners` INT CHECK (`AwayCorners` >= 0),
+            `HomeFouls` INT CHECK (`HomeFouls` >= 0),
+            `AwayFouls` INT CHECK (`AwayFouls` >= 0),
+            `HomeYellowCards` INT CHECK (`HomeYellowCards` >= 0),
+            `AwayYellowCards` INT CHECK (`AwayYellowCards` >= 0),
+            `HomeRedCards` INT CHECK (`HomeRedCards` >= 0),
+            `AwayRedCards` INT CHECK (`AwayRedCards` >= 0),
+            `CreatedDate` DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (`MatchID`) REFERENCES `Matches`(`MatchID`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "Bookmakers": """
+        CREATE TABLE IF NOT EXISTS `Bookmakers` (
+            `BookmakerID` INT AUTO_INCREMENT PRIMARY KEY,
+            `BookmakerCode` VARCHAR(10) UNIQUE,
+            `BookmakerName` VARCHAR(100) NOT NULL,
+            `Website` VARCHAR(100),
+            `CreatedDate` DATETIME DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "Markets": """
+        CREATE TABLE IF NOT EXISTS `Markets` (
+            `MarketID` INT AUTO_INCREMENT PRIMARY KEY,
+            `MarketType` VARCHAR(50) NOT NULL,
+            `MarketSubtype` VARCHAR(50),
+            `Parameter` VARCHAR(20),
+            `Description` VARCHAR(255),
+            `CreatedDate` DATETIME DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (`MarketType`, `MarketSubtype`, `Parameter`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "BettingOdds": """
+        CREATE TABLE IF NOT EXISTS `BettingOdds` (
+            `OddsID` INT AUTO_INCREMENT PRIMARY KEY,
+            `MatchID` INT NOT NULL,
+            `BookmakerID` INT NOT NULL,
+            `MarketID` INT NOT NULL,
+            `OutcomeCode` VARCHAR(10) NOT NULL,
+            `OddsValue` FLOAT NOT NULL CHECK (`OddsValue` > 1.0),
+            `CreatedDate` DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (`MatchID`) REFERENCES `Matches`(`MatchID`),
+            FOREIGN KEY (`BookmakerID`) REFERENCES `Bookmakers`(`BookmakerID`),
+            FOREIGN KEY (`MarketID`) REFERENCES `Markets`(`MarketID`),
+            CONSTRAINT `uq_odds_unique` UNIQUE (`MatchID`, `BookmakerID`, `MarketID`, `OutcomeCode`),
+            INDEX `idx_betting_bookmaker` (`BookmakerID`),
+            INDEX `idx_betting_market` (`MarketID`),
+            INDEX `idx_betting_match_market` (`MatchID`, `MarketID`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "ETLLog": """
+        CREATE TABLE IF NOT EXISTS `ETLLog` (
+            `LogID` INT AUTO_INCREMENT PRIMARY KEY,
+            `ProcessName` VARCHAR(100) NOT NULL,
+            `StartTime` DATETIME NOT NULL,
+            `EndTime` DATETIME,
+            `RecordsProcessed` INT DEFAULT 0,
+            `RecordsFailed` INT DEFAULT 0,
+            `Status` VARCHAR(20),
+            `ErrorMessage` TEXT,
+            `CreatedDate` DATETIME DEFAULT CURRENT_TIMESTAMP,
+            `FileHash` VARCHAR(64)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "ETLDeadLetter": """
+        CREATE TABLE IF NOT EXISTS `ETLDeadLetter` (
+            `Id` INT AUTO_INCREMENT PRIMARY KEY,
+            `SourceTable` VARCHAR(100) NOT NULL,
+            `SourceId` INT,
+            `ErrorMessage` TEXT,
+            `RawData` TEXT,
+            `ErrorTimestamp` DATETIME DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "stg_premier_league_raw": """
+        CREATE TABLE IF NOT EXISTS `stg_premier_league_raw` (
+            `Id` INT AUTO_INCREMENT PRIMARY KEY,
+            `Div` VARCHAR(10), `Date` DATE, `Time` TIME,
+            `HomeTeam` VARCHAR(100), `AwayTeam` VARCHAR(100),
+            `FTHG` INT, `FTAG` INT, `FTR` CHAR(1),
+            `HTHG` INT, `HTAG` INT, `HTR` CHAR(1),
+            `Referee` VARCHAR(100),
+            `HS` INT, `AS` INT, `HST` INT, `AST` INT, `HF` INT, `AF` INT,
+            `HC` INT, `AC` INT, `HY` INT, `AY` INT, `HR` INT, `AR` INT,
+            `B365H` FLOAT, `B365D` FLOAT, `B365A` FLOAT,
+            `BWH` FLOAT, `BWD` FLOAT, `BWA` FLOAT,
+            `IWH` FLOAT, `IWD` FLOAT, `IWA` FLOAT,
+            `PSH` FLOAT, `PSD` FLOAT, `PSA` FLOAT,
+            `WHH` FLOAT, `WHD` FLOAT, `WHA` FLOAT,
+            `VCH` FLOAT, `VCD` FLOAT, `VCA` FLOAT,
+            `B365_2_5O` FLOAT, `B365_2_5U` FLOAT, `P_2_5O` FLOAT, `P_2_5U` FLOAT,
+            `MaxH` FLOAT, `MaxD` FLOAT, `MaxA` FLOAT,
+            `AvgH` FLOAT, `AvgD` FLOAT, `AvgA` FLOAT,
+            `B365CH` FLOAT, `B365CD` FLOAT, `B365CA` FLOAT,
+            `BWCH` FLOAT, `BWCD` FLOAT, `BWCA` FLOAT,
+            `IWCH` FLOAT, `IWCD` FLOAT, `IWCA` FLOAT,
+            `PSCH` FLOAT, `PSCD` FLOAT, `PSCA` FLOAT,
+            `WHCH` FLOAT, `WHCD` FLOAT, `WHCA` FLOAT,
+            `VCCH` FLOAT, `VCCD` FLOAT, `VCCA` FLOAT,
+            `MaxCH` FLOAT, `MaxCD` FLOAT, `MaxCA` FLOAT,
+            `AvgCH` FLOAT, `AvgCD` FLOAT, `AvgCA` FLOAT,
+            `AHh` FLOAT, `B365AHH` FLOAT, `B365AHA` FLOAT, `PAHH` FLOAT, `PAHA` FLOAT,
+            `MaxAHH` FLOAT, `MaxAHA` FLOAT, `AvgAHH` FLOAT, `AvgAHA` FLOAT,
+            `SourceFile` VARCHAR(255),
+            `LoadTimestamp` DATETIME NOT NULL,
+            `ProcessedFlag` TINYINT DEFAULT 0,
+            `FileHash` VARCHAR(64),
+            INDEX `idx_processed` (`ProcessedFlag`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    "vw_LeagueTable": """
+        CREATE OR REPLACE VIEW `vw_LeagueTable` AS
+        WITH TeamMatches AS (
+            SELECT m.`SeasonID`, s.`SeasonName`, m.`DivisionID`, d.`DivisionCode`, d.`LeagueName`,
+                   m.`HomeTeamID` AS TeamID, t.`TeamName`,
+                   COUNT(*) AS Played,
+                   SUM(CASE WHEN m.`FTR` = 'H' THEN 1 ELSE 0 END) AS Won,
+                   SUM(CASE WHEN m.`FTR` = 'D' THEN 1 ELSE 0 END) AS Drawn,
+                   SUM(CASE WHEN m.`FTR` = 'A' THEN 1 ELSE 0 END) AS Lost,
+                   SUM(m.`FTHG`) AS GoalsFor,
+                   SUM(m.`FTAG`) AS GoalsAgainst,
+                   SUM(CASE WHEN m.`FTR` = 'H' THEN 3 WHEN m.`FTR` = 'D' THEN 1 ELSE 0 END) AS Points
+            FROM `Matches` m
+            JOIN `Teams` t ON m.`HomeTeamID` = t.`TeamID`
+            JOIN `Seasons` s ON m.`SeasonID` = s.`SeasonID`
+            JOIN `Divisions` d ON m.`DivisionID` = d.`DivisionID`
+            GROUP BY m.`SeasonID`, s.`SeasonName`, m.`DivisionID`, d.`DivisionCode`, d.`LeagueName`, m.`HomeTeamID`, t.`TeamName`
+            UNION ALL
+            SELECT m.`SeasonID`, s.`SeasonName`, m.`DivisionID`, d.`DivisionCode`, d.`LeagueName`,
+                   m.`AwayTeamID` AS TeamID, t.`TeamName`,
+                   COUNT(*) AS Played,
+                   SUM(CASE WHEN m.`FTR` = 'A' THEN 1 ELSE 0 END) AS Won,
+                   SUM(CASE WHEN m.`FTR` = 'D' THEN 1 ELSE 0 END) AS Drawn,
+                   SUM(CASE WHEN m.`FTR` = 'H' THEN 1 ELSE 0 END) AS Lost,
+                   SUM(m.`FTAG`) AS GoalsFor,
+                   SUM(m.`FTHG`) AS GoalsAgainst,
+                   SUM(CASE WHEN m.`FTR` = 'A' THEN 3 WHEN m.`FTR` = 'D' THEN 1 ELSE 0 END) AS Points
+            FROM `Matches` m
+            JOIN `Teams` t ON m.`AwayTeamID` = t.`TeamID`
+            JOIN `Seasons` s ON m.`SeasonID` = s.`SeasonID`
+            JOIN `Divisions` d ON m.`DivisionID` = d.`DivisionID`
+            GROUP BY m.`SeasonID`, s.`SeasonName`, m.`DivisionID`, d.`DivisionCode`, d.`LeagueName`, m.`AwayTeamID`, t.`TeamName`
+        )
+        SELECT `SeasonID`, `SeasonName`, `DivisionID`, `DivisionCode`, `LeagueName`, `TeamID`, `TeamName`,
+               SUM(`Played`) AS Played,
+               SUM(`Won`) AS Won,
+               SUM(`Drawn`) AS Drawn,
+               SUM(`Lost`) AS Lost,
+               SUM(`GoalsFor`) AS GF,
+               SUM(`GoalsAgainst`) AS GA,
+               SUM(`GoalsFor`) - SUM(`GoalsAgainst`) AS GD,
+               SUM(`Points`) AS Points
+        FROM TeamMatches
+        GROUP BY `SeasonID`, `SeasonName`, `DivisionID`, `DivisionCode`, `LeagueName`, `TeamID`, `TeamName`
+        ORDER BY `SeasonID`, `DivisionID`, `Points` DESC, GD DESC, GF DESC
+    """,
+}
+
+def create_core_schema(cursor):
+    """
+    Create the operational tables, the staging table, the views and the
+    first admin user (username Admin, password admin) if they don't exist.
+    """
+    for ddl in CORE_TABLES.values():
+        cursor.execute(ddl)
+    cursor.execute("""
+        INSERT IGNORE INTO Users (Username, PasswordHash, Role)
+        VALUES ('Admin', SHA2('admin', 256), 'admin')
+    """)
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# db/sqlite_backend.py
+
+# Embedded database backend.
+# Wraps a SQLite file in the small part of the mysql.connector API the app
+# uses (cursor(dictionary=..., buffered=...), execute, executemany, fetch*,
+# rowcount, lastrowid, commit, rollback) and translates the MySQL dialect of
+# the app's queries on the fly: %s placeholders, backticks, INSERT IGNORE,
+# FROM DUAL, DATE_SUB, decimal division, TRUNCATE, SHOW COLUMNS,
+# SET FOREIGN_KEY_CHECKS and the CREATE TABLE options and inline indexes.
+# LEAST, GREATEST, NOW, SHA2 and STDDEV_POP are registered as functions,
+# and GET_LOCK / RELEASE_LOCK as named locks on files next to the database.
+# Translations are cached, so each distinct query is rewritten only once.
+
+from db.schema import create_core_schema
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from functools import lru_cache
+from time import monotonic, sleep
+import hashlib
+import math
+import os
+import re
+import sqlite3
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Databases whose core schema was checked by this process
+_initialized = set()
+
+# ---------------------------------------------------------------------------
+# SQL translation
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_COMMENT = re.compile(r"--[^\n]*")
+
+_CREATE_TABLE = re.compile(r"^\s*CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?\"?(\w+)\"?\s*\(", re.I)
+_INLINE_INDEX = re.compile(r"^(?:INDEX|KEY)\s+\"?(\w+)\"?\s*(\(.*\))$", re.I | re.S)
+_INLINE_UNIQUE = re.compile(r"^UNIQUE\s+(?:KEY|INDEX)\s+\"?(\w+)\"?\s*(\(.*\))$", re.I | re.S)
+
+_REWRITES = [
+    (re.compile(r"\bINSERT\s+IGNORE\b", re.I), "INSERT OR IGNORE"),
+    (re.compile(r"\bFROM\s+DUAL\b", re.I), ""),
+    (re.compile(r"\bCREATE\s+OR\s+REPLACE\s+VIEW\b", re.I), "CREATE VIEW IF NOT EXISTS"),
+    (re.compile(r"\bDATE_SUB\(\s*(.+?)\s*,\s*INTERVAL\s+(.+?)\s+DAY\s*\)", re.I),
+     r"date(\1, '-' || (\2) || ' days')"),
+    (re.compile(r"\bDATE_ADD\(\s*(.+?)\s*,\s*INTERVAL\s+(.+?)\s+DAY\s*\)", re.I),
+     r"date(\1, '+' || (\2) || ' days')"),
+    (re.compile(r"\bALTER\s+TABLE\s+(\S+)\s+ADD\s+CONSTRAINT\s+(\w+)\s+UNIQUE\s*(\(.*\))", re.I | re.S),
+     r"CREATE UNIQUE INDEX \2 ON \1 \3"),
+    # MySQL '/' always returns a decimal; SQLite divides integers as integers
+    (re.compile(r"(?<![*/])/(?![*/])"), "* 1.0 /"),
+]
+
+_COLUMN_REWRITES = [
+    (re.compile(r"\bINT(?:EGER)?\s+(?:NOT\s+NULL\s+)?AUTO_INCREMENT\s+PRIMARY\s+KEY\b", re.I),
+     "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    (re.compile(r"\bAUTO_INCREMENT\b", re.I), ""),
+    (re.compile(r"\bON\s+UPDATE\s+CURRENT_TIMESTAMP\b", re.I), ""),
+    (re.compile(r"\bENUM\s*\([^)]*\)", re.I), "TEXT"),
+    (re.compile(r"\bUNSIGNED\b", re.I), ""),
+]
+
+def _mask(sql):
+    """
+    Replace string literals and comments with numbered markers, so the
+    rewrites below never touch them. Return the masked SQL and the literals.
+    """
+    literals = []
+
+    def keep(match):
+        literals.append(match.group(0))
+        return f"\x00{len(literals) - 1}\x00"
+
+    masked = _STRING.sub(keep, sql)
+    masked = _COMMENT.sub("", masked)
+    return masked, literals
+
+def _unmask(sql, literals):
+    return re.sub(r"\x00(\d+)\x00", lambda m: literals[int(m.group(1))], sql)
+
+def _split_top_level(body):
+    """
+    Split the body of a CREATE TABLE on the commas outside parentheses.
+    """
+    items, depth, start = [], 0, 0
+    for i, ch in enumerate(body):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            items.append(body[start:i].strip())
+            start = i + 1
+    items.append(body[start:].strip())
+    return [item for item in items if item]
+
+def _translate_create_table(sql, match):
+    """
+    Rewrite a MySQL CREATE TABLE: column options, inline UNIQUE KEYs and
+    INDEXes (as separate CREATE INDEX statements) and table options.
+    """
+    table = match.group(2)
+    if_not_exists = "IF NOT EXISTS " if match.group(1) else ""
+    body_start = match.end()
+    depth, body_end = 1, body_start
+    while depth:
+        depth += {"(": 1, ")": -1}.get(sql[body_end], 0)
+        body_end += 1
+    body = sql[body_start:body_end - 1]
+
+    columns, statements = [], []
+    for item in _split_top_level(body):
+        index = _INLINE_INDEX.match(item)
+        unique = _INLINE_UNIQUE.match(item)
+        if index:
+            statements.append(f'CREATE INDEX IF NOT EXISTS "{table}_{index.group(1)}" ON "{table}" {index.group(2)}')
+        elif unique:
+            columns.append(f'CONSTRAINT "{unique.group(1)}" UNIQUE {unique.group(2)}')
+        else:
+            for pattern, replacement in _COLUMN_REWRITES:
+                item = pattern.sub(replacement, item)
+            columns.append(item)
+
+    create = f'CREATE TABLE {if_not_exists}"{table}" (\n    ' + ",\n    ".join(columns) + "\n)"
+    return [create] + statements
+
+@lru_cache(maxsize=1024)
+def translate(sql):
+    """
+    Translate a MySQL statement to one or more SQLite statements.
+    """
+    masked, literals = _mask(sql)
+    masked = masked.replace("`", '"').replace("%%", "\x01").replace("%s", "?").replace("\x01", "%")
+    masked = masked.strip().rstrip(";")
+
+    create = _CREATE_TABLE.match(masked)
+    if create:
+        statements = _translate_create_table(masked, create)
+    else:
+        for pattern, replacement in _REWRITES:
+            masked = pattern.sub(replacement, masked)
+        statements = [masked]
+    return tuple(_unmask(statement, literals) for statement in statements)
+
+# ---------------------------------------------------------------------------
+# Values
+
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_DATETIME = re.compile(r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(\.\d+)?$")
+
+def _adapt(value):
+    """
+    Convert a query parameter to a SQLite value. Dates are stored as ISO
+    text; like MySQL DATE columns, midnight datetimes are stored as dates
+    so that they compare equal to them.
+    """
+    kind = type(value)
+    if value is None or kind in (str, int, float, bytes, bool):
+        return value
+    if hasattr(value, "item") and not isinstance(value, (date, time, timedelta)):
+        return value.item()   # numpy scalars
+    if isinstance(value, datetime):
+        if value != value:    # NaT
+            return None
+        if (value.hour, value.minute, value.second, value.microsecond) == (0, 0, 0, 0):
+            return value.date().isoformat()
+        return value.isoformat(" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, time):
+        return value.strftime("%H:%M:%S")
+    if isinstance(value, timedelta):
+        seconds = int(value.total_seconds())
+        return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+def _convert(value):
+    """
+    Return ISO date and datetime text as date / datetime objects, as
+    mysql.connector does for DATE and DATETIME values.
+    """
+    if type(value) is str and len(value) >= 10 and value[4:5] == "-":
+        if len(value) == 10 and _DATE.match(value):
+            return date.fromisoformat(value)
+        if _DATETIME.match(value):
+            return datetime.fromisoformat(value)
+    return value
+
+# ---------------------------------------------------------------------------
+# MySQL functions
+
+def _least(*values):
+    return None if any(v is None for v in values) else min(values)
+
+def _greatest(*values):
+    return None if any(v is None for v in values) else max(values)
+
+def _now():
+    return datetime.now().isoformat(" ", "seconds")
+
+def _sha2(text, bits):
+    if text is None:
+        return None
+    algorithm = {224: "sha224", 256: "sha256", 0: "sha256", 384: "sha384", 512: "sha512"}.get(int(bits))
+    if algorithm is None:
+        return None
+    return hashlib.new(algorithm, str(text).encode("utf-8")).hexdigest()
+
+class _StdDevPop:
+    def __init__(self):
+        self.n, self.mean, self.m2 = 0, 0.0, 0.0
+
+    def step(self, value):
+        if value is None:
+            return
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+    def finalize(self):
+        return math.sqrt(self.m2 / self.n) if self.n else None
+
+class _NamedLocks:
+    """
+    GET_LOCK and RELEASE_LOCK of one connection. A lock is an exclusive lock
+    on the file <database>.<name>.lock, so it works across processes, and is
+    held until it is released or the connection is closed, as in MySQL.
+    """
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.files = {}
+
+    def _try_lock(self, f):
+        try:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def get_lock(self, name, timeout):
+        """
+        1 when the lock is taken, 0 after timeout seconds (a negative
+        timeout waits forever).
+        """
+        if name in self.files:
+            return 1
+        file_name = re.sub(r"[^\w.-]", "_", str(name))
+        f = open(f"{self.path}.{file_name}.lock", "a+")
+        deadline = monotonic() + float(timeout)
+        while not self._try_lock(f):
+            if 0 <= float(timeout) and monotonic() >= deadline:
+                f.close()
+                return 0
+            sleep(0.1)
+        self.files[name] = f
+        return 1
+
+    def release_lock(self, name):
+        f = self.files.pop(name, None)
+        if f is None:
+            return None
+        if not fcntl:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        f.close()  # also drops the flock
+        return 1
+
+    def release_all(self):
+        for name in list(self.files):
+            self.release_lock(name)
+
+# ---------------------------------------------------------------------------
+# Connection and cursor
+
+class SQLiteCursor:
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection._conn.cursor()
+        self._dictionary = dictionary
+        self._rows = None
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def column_names(self):
+        return tuple(d[0] for d in self._cursor.description or ())
+
+    def execute(self, operation, params=()):
+        self._rows = None
+        special = self._execute_special(operation)
+        if special:
+            return
+
+        params = tuple(_adapt(p) for p in (params or ()))
+        for statement in translate(operation):
+            self._cursor.execute(statement, params)
+
+    def executemany(self, operation, seq_params):
+        self._rows = None
+        statements = translate(operation)
+        if len(statements) != 1:
+            raise RuntimeError("executemany() needs a single statement.")
+        self._cursor.executemany(statements[0], (tuple(_adapt(p) for p in params) for params in seq_params))
+
+    def _execute_special(self, operation):
+        """
+        Statements that have no SQLite equivalent in the SQL itself.
+        """
+        sql = operation.strip().rstrip(";")
+        match = re.match(r"^SHOW\s+COLUMNS\s+FROM\s+`?(\w+)`?$", sql, re.I)
+        if match:
+            self._cursor.execute(f'PRAGMA table_info("{match.group(1)}")')
+            self._rows = [
+                (name, kind, "NO" if notnull else "YES", "PRI" if pk else "", default, "")
+                for _, name, kind, notnull, default, pk in self._cursor.fetchall()
+            ]
+            return True
+
+        match = re.match(r"^TRUNCATE\s+(?:TABLE\s+)?`?(\w+)`?$", sql, re.I)
+        if match:
+            table = match.group(1)
+            self._cursor.execute(f'DELETE FROM "{table}"')
+            self._cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence'")
+            if self._cursor.fetchone():
+                self._cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+            return True
+
+        match = re.match(r"^SET\s+FOREIGN_KEY_CHECKS\s*=\s*(\d)$", sql, re.I)
+        if match:
+            self._cursor.execute(f"PRAGMA foreign_keys = {'ON' if match.group(1) == '1' else 'OFF'}")
+            return True
+        return False
+
+    def _make_row(self, row):
+        row = tuple(_convert(v) for v in row)
+        if self._dictionary:
+            return dict(zip(self.column_names, row))
+        return row
+
+    def fetchone(self):
+        if self._rows is not None:
+            return self._make_row(self._rows.pop(0)) if self._rows else None
+        row = self._cursor.fetchone()
+        return None if row is None else self._make_row(row)
+
+    def fetchall(self):
+        if self._rows is not None:
+            rows, self._rows = self._rows, []
+        else:
+            rows = self._cursor.fetchall()
+        return [self._make_row(row) for row in rows]
+
+    def fetchmany(self, size=1):
+        return [row for row in (self.fetchone() for _ in range(size)) if row is not None]
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        self._cursor.close()
+
+class SQLiteConnection:
+    def __init__(self, path):
+        self.database = path
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.create_function("LEAST", -1, _least, deterministic=True)
+        self._conn.create_function("GREATEST", -1, _greatest, deterministic=True)
+        self._conn.create_function("NOW", 0, _now)
+        self._conn.create_function("SHA2", 2, _sha2, deterministic=True)
+        self._conn.create_aggregate("STDDEV_POP", 1, _StdDevPop)
+        self._locks = _NamedLocks(path)
+        self._conn.create_function("GET_LOCK", 2, self._locks.get_lock)
+        self._conn.create_function("RELEASE_LOCK", 1, self._locks.release_lock)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+
+    def cursor(self, dictionary=False, buffered=False):
+        return SQLiteCursor(self, dictionary=dictionary)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._locks.release_all()
+        self._conn.close()
+
+    def is_connected(self):
+        try:
+            self._conn.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+def connect(path):
+    """
+    Open (and create, if needed) the embedded database at path. The
+    operational tables, views and the Admin user are created the first
+    time a database is opened.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    conn = SQLiteConnection(path)
+
+    key = os.path.abspath(path)
+    if key not in _initialized:
+        # WAL lets readers work while the ETL or a replica sync writes (stored in the file)
+        conn._conn.execute("PRAGMA journal_mode = WAL")
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'Matches'")
+            if not cursor.fetchone()[0]:
+                create_core_schema(cursor)
+                conn.commit()
+        finally:
+            cursor.close()
+        _initialized.add(key)
+    return conn
+
+def dump_database(path, file_path):
+    """
+    Write the embedded database at path as an SQL script.
+    """
+    conn = sqlite3.connect(path)
+    try:
+        with open(file_path, "w") as f:
+            for line in conn.iterdump():
+                f.write(f"{line}\n")
+    finally:
+        conn.close()
+
+def restore_database(path, file_path):
+    """
+    Replace the embedded database at path with the SQL script file_path
+    (written by dump_database).
+    """
+    with open(file_path, "r") as f:
+        script = f.read()
+
+    temp_path = path + ".restore"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    conn = sqlite3.connect(temp_path)
+    try:
+        conn.executescript(script)
+        conn.commit()
+    finally:
+        conn.close()
+
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    os.replace(temp_path, path)
@@ -15,8 +15,12 @@ from db.git import get_git_version
 import hashlib
 
 class LoginDialog(QDialog):
-    def __init__(self):
+    def __init__(self, conn=None):
         super().__init__()
+
+        # Connection to check the credentials with (left open), or None to
+        # open one per attempt
+        self.conn = conn
         
         version = get_git_version()
         self.setWindowTitle(f"Premier League DB Manager (v. 0.{version})")
@@ -56,12 +60,13 @@ class LoginDialog(QDialog):
             QMessageBox.warning(self, "Missing Info", "Please enter username and password.")
             return
 
-        conn = get_connection()
+        conn = self.conn or get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT PasswordHash, Role FROM Users WHERE Username = %s", (username,))
         row = cursor.fetchone()
         cursor.close()
-        conn.close()
+        if conn is not self.conn:
+            conn.close()
 
         if not row:
             QMessageBox.critical(self, "Login Failed", f"User {username} not found.")
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# etl.py
+
+# Command-line ETL, for servers and cron jobs (no Qt, no display):
+#
+#   python etl.py ingest PL22-23.csv [more.csv ...] [--etl]
+#   python etl.py etl [--hash HASH ...]       ETL of the staged files not done yet
+#   python etl.py status [--limit 5]         queue, recent jobs, and the tables the last one loaded
+#   python etl.py watch FOLDER [--interval 30] [--workers 2] [--once]
+#
+# watch runs as a daemon: every interval it picks up the CSV files dropped
+# in FOLDER, stages and ETLs the new ones and moves each to FOLDER/processed
+# or FOLDER/error. Its counters and recent files are kept in
+# FOLDER/status.json (rewritten after every file).
+#
+# ETL jobs go through the queue shared with the GUI (models/etl_queue_model),
+# so they never run at the same time as another client's.
+#
+# With --json every event is printed as one JSON object per line (event
+# name, elapsed seconds and its fields) instead of text. Exit status:
+# 0 success, 1 a file or ETL job failed, 2 bad arguments, 3 configuration
+# error (connection.ini missing or invalid).
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_CONFIG = 3
+
+_output = {"json": False, "start": time.perf_counter()}
+
+def emit(event, text, **fields):
+    """
+    Print an event: as a JSON line with --json, otherwise as text.
+    """
+    if _output["json"]:
+        record = {"event": event, "elapsed": round(time.perf_counter() - _output["start"], 3), **fields}
+        print(json.dumps(record, default=str), flush=True)
+    else:
+        stream = sys.stderr if event == "error" else sys.stdout
+        print(text, file=stream, flush=True)
+
+def _config_error(message):
+    emit("error", f"Configuration error: {message}", message=message)
+    sys.exit(EXIT_CONFIG)
+
+def run_etl(file_hash):
+    """
+    Queue the ETL job of a staged file and wait for it (the jobs other
+    clients queued before it run first), emitting each step with its time.
+    Return True if it completed.
+    """
+    from models.etl_model import is_file_processed
+    from models.etl_queue_model import run_etl_job, client_name
+
+    if is_file_processed(file_hash):
+        emit("etl_skipped", f"{file_hash[:12]}: already processed.", hash=file_hash)
+        return True
+
+    emit("etl_queued", f"{file_hash[:12]}: ETL queued.", hash=file_hash)
+    start = time.perf_counter()
+    last = {}
+    reported = {}
+
+    # Also called for the jobs of other clients this process runs first
+    def progress(job, message):
+        now = time.perf_counter()
+        if job["QueueID"] not in last:
+            last[job["QueueID"]] = now
+            emit("etl_started", f"{job['FileHash'][:12]}: ETL started (job #{job['QueueID']}, "
+                 f"{job['RequestedBy']}).", hash=job["FileHash"], queue_id=job["QueueID"])
+        seconds = now - last[job["QueueID"]]
+        emit("etl_step", f"  {message} ({seconds:.2f} s)", hash=job["FileHash"], step=message,
+             seconds=round(seconds, 3))
+        last[job["QueueID"]] = time.perf_counter()
+
+    # While another client runs the queue
+    def waiting(job):
+        state = (job["Status"], job["Position"], job["StepsDone"])
+        if reported.get("state") == state:
+            return
+        reported["state"] = state
+        if job["Status"] == "Queued":
+            text = f"{file_hash[:12]}: waiting, position {job['Position']} in the ETL queue."
+        else:
+            text = f"{file_hash[:12]}: running on another client, step {job['Progress']}."
+        emit("etl_waiting", text, hash=file_hash, queue_id=job["QueueID"], status=job["Status"],
+             position=job["Position"], steps_done=job["StepsDone"])
+
+    try:
+        job = run_etl_job(file_hash, f"CLI {client_name()}", "CLI ETL Job", progress, waiting)
+    except Exception as e:
+        emit("error", f"{file_hash[:12]}: {e}", hash=file_hash, message=str(e))
+        return False
+
+    if job["Status"] != "Completed":
+        emit("error", f"{file_hash[:12]}: {job['Message']}", hash=file_hash, message=job["Message"])
+        return False
+
+    seconds = time.perf_counter() - start
+    emit("etl_completed", f"{file_hash[:12]}: ETL completed in {seconds:.2f} s.", hash=file_hash,
+         seconds=round(seconds, 3), log_id=job["LogID"])
+    return True
+
+def command_ingest(args):
+    from models.etl_model import is_file_processed
+    from models.ingest_model import compute_file_hash, stage_csv_file
+
+    ok = True
+    for path in args.files:
+        name = os.path.basename(path)
+        try:
+            if is_file_processed(compute_file_hash(path)):
+                emit("ingest_skipped", f"{name}: already processed.", file=path)
+                continue
+
+            start = time.perf_counter()
+            file_hash, rows = stage_csv_file(path)
+            seconds = time.perf_counter() - start
+            emit("ingest_staged", f"{name}: {rows} rows staged in {seconds:.2f} s ({file_hash[:12]}).",
+                 file=path, hash=file_hash, rows=rows, seconds=round(seconds, 3))
+        except Exception as e:
+            emit("error", f"{name}: {e}", file=path, message=str(e))
+            ok = False
+            continue
+
+        if args.etl:
+            ok = run_etl(file_hash) and ok
+
+    return EXIT_OK if ok else EXIT_FAILED
+
+def command_etl(args):
+    from models.etl_model import get_pending_file_hashes
+
+    hashes = args.hash or get_pending_file_hashes()
+    if not hashes:
+        emit("etl_idle", "No staged files to process.")
+        return EXIT_OK
+
+    ok = True
+    for file_hash in hashes:
+        ok = run_etl(file_hash) and ok
+    return EXIT_OK if ok else EXIT_FAILED
+
+def command_status(args):
+    from db.connection import get_db_config
+    from models.etl_model import get_all_seasons, get_data_version, get_pending_file_hashes, fetch_etl_log
+    from models.etl_model import fetch_etl_steps
+    from models.etl_queue_model import fetch_etl_queue, ACTIVE_STATUSES
+
+    config = get_db_config()
+    where = config["database"] if config["backend"] == "sqlite" else \
+        f"{config['user']}@{config['host']}:{config['port']}/{config['database']}"
+    seasons = get_all_seasons()
+    pending = get_pending_file_hashes()
+    jobs = fetch_etl_log()[:args.limit]
+    steps = fetch_etl_steps(jobs[0]["LogID"]) if jobs else []
+    queue = [job for job in fetch_etl_queue() if job["Status"] in ACTIVE_STATUSES]
+
+    if _output["json"]:
+        emit("status", "", backend=config["backend"], database=where, seasons=seasons,
+             data_version=get_data_version(), pending=pending, queue=queue, jobs=jobs, last_job_steps=steps)
+        return EXIT_OK
+
+    print(f"Database: {config['backend']} {where}")
+    print(f"Seasons:  {', '.join(seasons) if seasons else 'none'}")
+    print(f"Pending:  {len(pending)} staged file(s)")
+    print(f"Queue:    {len(queue)} active job(s)")
+    for job in reversed(queue):
+        where_in_queue = f"position {job['Position']}" if job["Status"] == "Queued" else \
+            f"step {job['Progress']} {job['CurrentStep'] or ''}".rstrip()
+        print(f"  job #{job['QueueID']} {job['Status']}, {where_in_queue} ({job['RequestedBy']}, {job['FileHash'][:12]})")
+    for job in jobs:
+        print(f"  #{job['LogID']} {job['ProcessName']} {job['StartTime']} {job['Status']}"
+              f" ({job['RecordsProcessed'] or 0} records)"
+              + (f": {job['ErrorMessage']}" if job['ErrorMessage'] else ""))
+    if steps:
+        print(f"Steps of job #{jobs[0]['LogID']}:")
+        for row in steps:
+            print(f"  {row['TableName']:<26} {row['RowsAffected']:>8} rows {row['Seconds']:8.3f} s")
+    return EXIT_OK
+
+# Files shown in status.json, most recent first
+WATCH_RECENT = 20
+
+def _prepare_file(path):
+    """
+    Hash and parse a CSV for staging (runs in the watch pool). Return the
+    path, its hash and the DataFrame (None if already processed) or the
+    error message.
+    """
+    from models.etl_model import is_file_processed
+    from models.ingest_model import compute_file_hash, read_match_csv
+
+    try:
+        file_hash = compute_file_hash(path)
+        if is_file_processed(file_hash):
+            return path, file_hash, None, None
+        return path, file_hash, read_match_csv(path, file_hash), None
+    except Exception as e:
+        return path, None, None, str(e)
+
+def _move_file(path, folder):
+    """
+    Move path into folder, adding the time to the name if a file with the
+    same name is already there.
+    """
+    os.makedirs(folder, exist_ok=True)
+    target = os.path.join(folder, os.path.basename(path))
+    if os.path.exists(target):
+        stem, ext = os.path.splitext(os.path.basename(path))
+        target = os.path.join(folder, f"{stem}-{datetime.now():%Y%m%d-%H%M%S}{ext}")
+    shutil.move(path, target)
+    return target
+
+def _write_status(path, status):
+    # Replaced atomically so a reader never sees a partial file
+    temp = path + ".tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump({**status, "updated": datetime.now().isoformat(timespec="seconds")}, f, indent=2, default=str)
+    os.replace(temp, path)
+
+def _ready_files(folder, settle):
+    # CSVs not modified for settle seconds (so files still being copied wait)
+    now = time.time()
+    names = sorted(name for name in os.listdir(folder) if name.lower().endswith(".csv"))
+    paths = [os.path.join(folder, name) for name in names]
+    return [path for path in paths if os.path.isfile(path) and now - os.path.getmtime(path) >= settle]
+
+def command_watch(args):
+    from models.etl_model import load_csv_to_staging, is_file_processed
+
+    folder = os.path.abspath(args.folder)
+    if not os.path.isdir(folder):
+        emit("error", f"{folder} is not a folder.", folder=folder)
+        return EXIT_FAILED
+
+    processed_dir = os.path.join(folder, "processed")
+    error_dir = os.path.join(folder, "error")
+    status_path = args.status or os.path.join(folder, "status.json")
+    status = {
+        "pid": os.getpid(), "folder": folder, "started": datetime.now().isoformat(timespec="seconds"),
+        "state": "starting", "polls": 0, "processed": 0, "skipped": 0, "failed": 0, "rows_staged": 0,
+        "last_etl_seconds": None, "current": None, "recent": [],
+    }
+
+    # SIGTERM / SIGINT stop the daemon after the file in progress
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+
+    def finish(path, result, target, **fields):
+        status[result] += 1
+        entry = {"file": os.path.basename(path), "result": result, "moved_to": target,
+                 "time": datetime.now().isoformat(timespec="seconds"), **fields}
+        status["recent"] = [entry] + status["recent"][:WATCH_RECENT - 1]
+        status["current"] = None
+        _write_status(status_path, status)
+        emit(f"watch_{result}", f"{os.path.basename(path)}: {result}"
+             + (f" ({fields['error']})" if fields.get("error") else ""), file=path, moved_to=target, **fields)
+
+    emit("watch_started", f"Watching {folder} every {args.interval} s.", folder=folder, status=status_path)
+    ok = True
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        while not stop.is_set():
+            status["polls"] += 1
+            status["state"] = "processing"
+            files = _ready_files(folder, args.settle)
+
+            # Parse up to workers files at a time; staging and ETL run one
+            # file at a time since ETL jobs are serialised by the ETL lock
+            # and queue anyway
+            for start in range(0, len(files), args.workers):
+                if stop.is_set():
+                    break
+                for path, file_hash, df, error in pool.map(_prepare_file, files[start:start + args.workers]):
+                    if stop.is_set():
+                        break
+                    status["current"] = os.path.basename(path)
+                    _write_status(status_path, status)
+
+                    if error:
+                        finish(path, "failed", _move_file(path, error_dir), error=error)
+                        ok = False
+                        continue
+                    # An identical file earlier in the batch may have just been processed
+                    if df is None or is_file_processed(file_hash):
+                        finish(path, "skipped", _move_file(path, processed_dir), hash=file_hash)
+                        continue
+
+                    try:
+                        load_csv_to_staging(df)
+                    except Exception as e:
+                        finish(path, "failed", _move_file(path, error_dir), hash=file_hash, error=str(e))
+                        ok = False
+                        continue
+                    status["rows_staged"] += len(df)
+
+                    etl_start = time.perf_counter()
+                    if run_etl(file_hash):
+                        status["last_etl_seconds"] = round(time.perf_counter() - etl_start, 3)
+                        finish(path, "processed", _move_file(path, processed_dir), hash=file_hash, rows=len(df))
+                    else:
+                        finish(path, "failed", _move_file(path, error_dir), hash=file_hash,
+                               error="ETL job failed (see ETLLog).")
+                        ok = False
+
+            status["state"] = "idle"
+            _write_status(status_path, status)
+            if args.once:
+                break
+            stop.wait(args.interval)
+
+    status["state"] = "stopped"
+    _write_status(status_path, status)
+    emit("watch_stopped", "Stopped watching.", folder=folder)
+    return EXIT_OK if ok or not args.once else EXIT_FAILED
+
+def main():
+    parser = argparse.ArgumentParser(description="Premier League ETL without the GUI.")
+    parser.add_argument("--json", action="store_true", help="print events as JSON lines")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="load match CSV files into the staging table")
+    ingest.add_argument("files", nargs="+", help="CSV files")
+    ingest.add_argument("--etl", action="store_true", help="run the ETL job of each file after staging it")
+    ingest.set_defaults(run=command_ingest)
+
+    etl = commands.add_parser("etl", help="run the ETL job of the staged files")
+    etl.add_argument("--hash", action="append", help="file hash to process (default: all pending)")
+    etl.set_defaults(run=command_etl)
+
+    status = commands.add_parser("status", help="show the loaded seasons and the recent ETL jobs")
+    status.add_argument("--limit", type=int, default=5, help="ETL jobs to show (default: 5)")
+    status.set_defaults(run=command_status)
+
+    watch = commands.add_parser("watch", help="stage and ETL the CSV files dropped in a folder")
+    watch.add_argument("folder", help="folder to watch")
+    watch.add_argument("--interval", type=float, default=30, help="seconds between scans (default: 30)")
+    watch.add_argument("--settle", type=float, default=5,
+                       help="seconds a file must be unchanged before it is picked up (default: 5)")
+    watch.add_argument("--workers", type=int, default=2, help="files hashed and parsed at once (default: 2)")
+    watch.add_argument("--status", help="status file (default: FOLDER/status.json)")
+    watch.add_argument("--once", action="store_true", help="process the files present and exit")
+    watch.set_defaults(run=command_watch)
+
+    args = parser.parse_args()
+    if args.command == "watch" and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    _output["json"] = args.json
+
+    from db.connection import set_fatal_handler
+    set_fatal_handler(_config_error)
+
+    try:
+        return args.run(args)
+    except Exception as e:
+        emit("error", f"Error: {e}", message=str(e))
+        return EXIT_FAILED
+
+if __name__ == "__main__":
+    sys.exit(main())
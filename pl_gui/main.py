@@ -7,24 +7,41 @@
 
 # main.py
 
+import startup
 import sys
 import signal
-from PyQt5.QtWidgets import QApplication
+from PyQt5.QtWidgets import QApplication, QMessageBox
 from PyQt5.QtCore import QTimer
+from db.connection import set_fatal_handler
 from views.main_window import MainWindow
-from views.league_table_view import LeagueTableView
-from data201 import BOLD, RESET
-from db.connection import get_connection
+
+# Terminal attributes (same as data201's, which would pull in pandas and mysql)
+BOLD = "\033[1m"
+RESET = "\033[0m"
+
+startup.mark("imports")
 
 def handle_interrupt():
     print(f"{BOLD}\nProgram interrupted.{RESET}")
     # QApplication.quit()
     sys.exit(1)
 
+def show_fatal_message(message):
+    app = QApplication.instance() or QApplication(sys.argv)
+    box = QMessageBox()
+    box.setIcon(QMessageBox.Critical)
+    box.setWindowTitle("Startup Error")
+    box.setText(message)
+    box.setStandardButtons(QMessageBox.Ok)
+    box.button(QMessageBox.Ok).setText("Quit")
+    box.exec_()
+
 def main():
     signal.signal(signal.SIGINT, signal.SIG_IGN)
+    set_fatal_handler(show_fatal_message)
     app = QApplication(sys.argv)
     app.setApplicationName("Premier League DB Manager")  # 👈 correct name
+    startup.mark("QApplication")
     signal.signal(signal.SIGINT, lambda sig, frame: handle_interrupt())
 
     timer = QTimer()
@@ -33,6 +50,8 @@ def main():
 
     window = MainWindow()
     window.show()
+    startup.mark("window shown")
+    startup.report()
 
     status = app.exec_()
     print(f"{BOLD}Program quit.{RESET}")
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# models/backtest_model.py
+
+# Vectorized backtesting of simple 1X2 betting strategies.
+# Odds are loaded once as a (match, bookmaker, outcome) array; every
+# combination of strategy, edge threshold, odds range and staking rule is
+# then evaluated with array operations over all matches at once.
+
+from models.odds_model import get_odds_arrays, valid_odds_mask, implied_probabilities
+from models.odds_model import OUTCOMES_1X2
+import itertools
+import numpy as np
+
+STRATEGIES = ["Favourite", "Underdog", "Home", "Draw", "Away", "Value"]
+STAKING_RULES = ["Flat", "Percent", "Kelly"]
+
+# Strategies that ignore the edge threshold
+_NO_EDGE_STRATEGIES = {"Favourite", "Underdog", "Home", "Draw", "Away"}
+
+# Number of parameter combinations evaluated per chunk (bounds memory use)
+_CHUNK_SIZE = 256
+
+def load_backtest_data(season_names=None, bookmaker_names=None):
+    """
+    Load 1X2 odds and results for the given seasons and bookmakers (None means
+    all) and pivot them to one row per match, ordered by date.
+    Return a dict with MatchID, MatchDate, Season, result (0/1/2),
+    bookmakers (names) and odds with shape (matches, bookmakers, 3);
+    missing or invalid prices are NaN.
+    """
+    data = get_odds_arrays(season_names, bookmaker_names)
+    keep = data["result"] >= 0
+
+    # Matches are already sorted by date: keep the order of first appearance
+    match_ids, first, inverse = np.unique(data["MatchID"][keep], return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    position = np.empty(len(order), dtype=np.int64)
+    position[order] = np.arange(len(order))
+    match_pos = position[inverse]
+
+    bookmakers, book_idx = np.unique(data["Bookmaker"][keep], return_inverse=True)
+
+    odds = data["odds"][keep]
+    odds[~valid_odds_mask(odds)] = np.nan
+    cube = np.full((len(match_ids), len(bookmakers), len(OUTCOMES_1X2)), np.nan)
+    cube[match_pos, book_idx] = odds
+
+    rows = np.flatnonzero(keep)[first[order]]
+    return {
+        "MatchID": match_ids[order],
+        "MatchDate": data["MatchDate"][rows],
+        "Season": data["Season"][rows],
+        "result": data["result"][rows],
+        "bookmakers": [str(name) for name in bookmakers],
+        "odds": cube,
+    }
+
+def bet_prices(data, bookmaker=None):
+    """
+    Price available for each outcome: the given bookmaker's odds, or the best
+    price among all loaded bookmakers when bookmaker is None.
+    """
+    if bookmaker is None:
+        with np.errstate(invalid="ignore"):
+            prices = np.nanmax(np.where(np.isnan(data["odds"]), -np.inf, data["odds"]), axis=1)
+        prices[np.isinf(prices)] = np.nan
+        return prices
+    if bookmaker not in data["bookmakers"]:
+        raise RuntimeError(f"Bookmaker '{bookmaker}' not loaded for the backtest.")
+    return data["odds"][:, data["bookmakers"].index(bookmaker), :]
+
+def market_probabilities(data):
+    """
+    Consensus probabilities: the margin-free implied probabilities of every
+    bookmaker, averaged per match (NaN where no bookmaker has a full market).
+    """
+    n_matches, n_books, n_outcomes = data["odds"].shape
+    flat = data["odds"].reshape(-1, n_outcomes)
+    complete = np.all(np.isfinite(flat), axis=1)
+
+    probs = np.full(flat.shape, np.nan)
+    if complete.any():
+        probs[complete], _ = implied_probabilities(flat[complete])
+    probs = probs.reshape(n_matches, n_books, n_outcomes)
+
+    counts = np.isfinite(probs[:, :, 0]).sum(axis=1)
+    totals = np.nansum(probs, axis=1)
+    return np.divide(totals, counts[:, None], out=np.full(totals.shape, np.nan), where=counts[:, None] > 0)
+
+def build_parameter_grid(strategies, edges, odds_ranges, stakings):
+    """
+    Every combination of strategy, minimum edge, (min, max) odds range and
+    (staking rule, size). The edge is ignored (set to None) for strategies
+    that don't use it, so those combinations are not repeated.
+    """
+    grid = []
+    seen = set()
+    for strategy, edge, (min_odds, max_odds), (rule, size) in itertools.product(strategies, edges, odds_ranges, stakings):
+        if strategy not in STRATEGIES:
+            raise RuntimeError(f"Unknown strategy '{strategy}'.")
+        if rule not in STAKING_RULES:
+            raise RuntimeError(f"Unknown staking rule '{rule}'.")
+        if strategy in _NO_EDGE_STRATEGIES:
+            edge = None
+        key = (strategy, edge, min_odds, max_odds, rule, size)
+        if key in seen:
+            continue
+        seen.add(key)
+        grid.append({
+            "Strategy": strategy,
+            "MinEdge": edge,
+            "MinOdds": min_odds,
+            "MaxOdds": max_odds,
+            "Staking": rule,
+            "StakeSize": size,
+        })
+    return grid
+
+def _selections(prices, probs):
+    """
+    Outcome picked by each strategy for every match (-1 means no bet possible),
+    with its price and consensus probability.
+    """
+    n_matches = len(prices)
+    usable = np.all(np.isfinite(prices), axis=1) & np.all(np.isfinite(probs), axis=1)
+    safe_probs = np.where(usable[:, None], probs, 0.0)
+    edges = np.where(usable[:, None], prices * probs - 1.0, -np.inf)
+
+    picks = {
+        "Favourite": np.argmax(safe_probs, axis=1),
+        "Underdog": np.argmin(np.where(usable[:, None], probs, np.inf), axis=1),
+        "Home": np.zeros(n_matches, dtype=np.int64),
+        "Draw": np.ones(n_matches, dtype=np.int64),
+        "Away": np.full(n_matches, 2, dtype=np.int64),
+        "Value": np.argmax(edges, axis=1),
+    }
+
+    rows = np.arange(n_matches)
+    selections = {}
+    for strategy, pick in picks.items():
+        pick = np.where(usable, pick, -1)
+        price = np.where(usable, prices[rows, np.maximum(pick, 0)], np.nan)
+        prob = np.where(usable, probs[rows, np.maximum(pick, 0)], np.nan)
+        selections[strategy] = (pick, price, prob)
+    return selections
+
+def _simulate(params, selections, result):
+    """
+    Run a list of parameter dicts; each becomes one row of the
+    (combinations, matches) arrays. Return the bet and win masks, the
+    amount staked per match and the bankroll after every match.
+    """
+    picks = np.stack([selections[p["Strategy"]][0] for p in params])
+    price = np.stack([selections[p["Strategy"]][1] for p in params])
+    prob = np.stack([selections[p["Strategy"]][2] for p in params])
+
+    min_edge = np.array([-np.inf if p["MinEdge"] is None else p["MinEdge"] for p in params])[:, None]
+    min_odds = np.array([p["MinOdds"] for p in params], dtype=float)[:, None]
+    max_odds = np.array([p["MaxOdds"] for p in params], dtype=float)[:, None]
+    size = np.array([p["StakeSize"] for p in params], dtype=float)[:, None]
+    rule = np.array([p["Staking"] for p in params], dtype=object)[:, None]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        edge = price * prob - 1.0
+        bet = (picks >= 0) & (edge >= min_edge) & (price >= min_odds) & (price <= max_odds)
+        kelly = np.clip(edge / (price - 1.0), 0.0, 1.0)
+
+    fraction = np.where(rule == "Kelly", size * kelly, size)
+    fraction = np.where(bet, np.minimum(fraction, 1.0), 0.0)
+    bet &= fraction > 0
+
+    won = bet & (picks == result[None, :])
+    unit_return = np.where(won, price - 1.0, -1.0)
+    unit_return = np.where(bet, unit_return, 0.0)
+
+    # Flat stakes are a fixed share of the starting bankroll (1.0);
+    # percent and Kelly stakes are a share of the current bankroll
+    compounding = (rule != "Flat")
+    flat_equity = 1.0 + np.cumsum(fraction * unit_return, axis=1)
+    with np.errstate(divide="ignore"):
+        compound_equity = np.exp(np.cumsum(np.log1p(fraction * unit_return), axis=1))
+    equity = np.where(compounding, compound_equity, flat_equity)
+
+    previous = np.concatenate([np.ones((len(params), 1)), equity[:, :-1]], axis=1)
+    stakes = np.where(compounding, fraction * previous, fraction)
+    return bet, won, stakes, equity
+
+def _max_drawdown(equity):
+    """
+    Largest fall from a running peak, as a fraction of that peak, per row.
+    """
+    start = np.ones((len(equity), 1))
+    peak = np.maximum.accumulate(np.concatenate([start, equity], axis=1), axis=1)[:, 1:]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(peak > 0, (peak - equity) / peak, 0.0).max(axis=1)
+
+def run_backtest(data, params, bookmaker=None):
+    """
+    Evaluate every parameter combination (see build_parameter_grid) over all
+    matches in data, betting at the given bookmaker's prices (None means the
+    best available price). Return one dict per combination with Bets, Hits,
+    HitRate, Staked, Profit, ROI (percent of the amount staked) and
+    MaxDrawdown (percent of the bankroll peak), sorted by ROI, best first.
+    """
+    result = data["result"]
+    if not len(result) or not params:
+        return []
+
+    selections = _selections(bet_prices(data, bookmaker), market_probabilities(data))
+
+    report = []
+    for start in range(0, len(params), _CHUNK_SIZE):
+        chunk = params[start:start + _CHUNK_SIZE]
+        bet, won, stakes, equity = _simulate(chunk, selections, result)
+        bets, hits = bet.sum(axis=1), won.sum(axis=1)
+        staked = stakes.sum(axis=1)
+        profit = equity[:, -1] - 1.0
+        drawdown = _max_drawdown(equity)
+
+        for i, p in enumerate(chunk):
+            row = dict(p)
+            row["Bets"] = int(bets[i])
+            row["Hits"] = int(hits[i])
+            row["HitRate"] = float(hits[i] / bets[i] * 100) if bets[i] else 0.0
+            row["Staked"] = float(staked[i])
+            row["Profit"] = float(profit[i])
+            row["ROI"] = float(profit[i] / staked[i] * 100) if staked[i] > 0 else 0.0
+            row["MaxDrawdown"] = float(drawdown[i] * 100)
+            report.append(row)
+
+    report.sort(key=lambda row: (row["Bets"] > 0, row["ROI"]), reverse=True)
+    return report
+
+def equity_curve(data, params, bookmaker=None):
+    """
+    Bankroll after every match (starting at 1.0) for a single parameter dict.
+    """
+    if not len(data["result"]):
+        return np.zeros(0)
+    selections = _selections(bet_prices(data, bookmaker), market_probabilities(data))
+    _, _, _, equity = _simulate([params], selections, data["result"])
+    return equity[0]
@@ -7,12 +7,22 @@
 
 # models/etl_model.py
 
-from db.connection import get_connection
-import pandas as pd
+from db.connection import get_connection, get_read_connection
+from db.schema import ensure_tables
+from db.query import latest_etl_batch, data_version
+from db.replica import mark_replica_stale
+from models.standings_model import update_league_standings
+from models.rating_model import update_team_ratings
+from models.goal_model import update_goal_models
+from models.h2h_model import update_head_to_head
+from models.similarity_model import update_similarity_index, delete_similarity_index
+from models.star_schema_model import STAR_TABLES, update_time_dimension, update_match_results
+from models.star_schema_model import update_team_match_stats, update_league_snapshots
 from datetime import datetime
 import math
+import time
 
-def load_csv_to_staging(df: pd.DataFrame):
+def load_csv_to_staging(df: "pandas.DataFrame"):
     """
     Load a DataFrame into the stg_premier_league_raw table.
     Only supports rows with matching column names.
@@ -50,14 +60,26 @@ def load_csv_to_staging(df: pd.DataFrame):
 
 def clean_row(row):
     return tuple(None if (isinstance(v, float) and math.isnan(v)) else v for v in row)
+
+# Steps trigger_etl_job reports to progress (for the queue's progress column)
+ETL_STEPS = 18
         
-def trigger_etl_job(file_hash):
+def trigger_etl_job(file_hash, progress=None, process_name="GUI ETL Job"):
+    """
+    Load the staged rows of the file file_hash (the other staged files are
+    left alone) into the operational tables, update the derived tables and
+    the star schema, and publish them all with one commit.
+    progress, if given, is called with the summary line of each step as it
+    finishes. Return the summary of all the steps.
+    """
     if not file_hash:
         raise RuntimeError("Missing file hash for duplicate detection.")
 
     conn = get_connection()
     cursor = conn.cursor(buffered=True)
     log_id = None
+    steps = []
+    published = False
         
     try:
         # Duplicate detection
@@ -75,18 +97,36 @@ def trigger_etl_job(file_hash):
         cursor.execute("""
             INSERT INTO ETLLog (ProcessName, StartTime, Status, FileHash)
             VALUES (%s, %s, %s, %s)
-        """, ("GUI ETL Job", start_time, "Running", file_hash))
+        """, (process_name, start_time, "Running", file_hash))
         log_id = cursor.lastrowid
         conn.commit()
+
+        # Everything below is one transaction, published by the single commit
+        # at the end together with the Completed status: readers keep seeing
+        # the previous batch until then and never block on the load. The
+        # derived tables are created first since DDL would commit early.
+        ensure_tables(cursor, "LeagueStandings", "TeamRatings", "GoalModelFits", "GoalModelTeams",
+                      "GoalModelPredictions", "HeadToHead", "ETLLogSteps", *STAR_TABLES)
     
         summary = []
+        step_start = time.perf_counter()
+
+        # Records the rows and time of each table loaded, for ETLLogSteps
+        def step(table, rows, message):
+            nonlocal step_start
+            now = time.perf_counter()
+            steps.append((table, rows, now - step_start))
+            step_start = now
+            summary.append(message)
+            if progress:
+                progress(message)
 
         # Step 1: Teams
         cursor.execute("""
-            SELECT DISTINCT HomeTeam FROM stg_premier_league_raw
+            SELECT DISTINCT HomeTeam FROM stg_premier_league_raw WHERE FileHash = %s
             UNION
-            SELECT DISTINCT AwayTeam FROM stg_premier_league_raw
-        """)
+            SELECT DISTINCT AwayTeam FROM stg_premier_league_raw WHERE FileHash = %s
+        """, (file_hash, file_hash))
         teams = [row[0] for row in cursor.fetchall()]
         insert_sql = """
             INSERT IGNORE INTO Teams (TeamName, ShortName)
@@ -94,10 +134,10 @@ def trigger_etl_job(file_hash):
         """
         data = [(team, team[:12]) for team in teams]
         cursor.executemany(insert_sql, data)
-        summary.append(f"{len(data)} team records processed.")
+        step("Teams", len(data), f"{len(data)} team records processed.")
 
         # Step 2: Seasons
-        cursor.execute("SELECT MIN(Date), MAX(Date) FROM stg_premier_league_raw")
+        cursor.execute("SELECT MIN(Date), MAX(Date) FROM stg_premier_league_raw WHERE FileHash = %s", (file_hash,))
         min_date, max_date = cursor.fetchone()
         sy, ey = min_date.year % 100, max_date.year % 100
         season_name = f"{sy:02d}-{ey:02d}"
@@ -105,14 +145,14 @@ def trigger_etl_job(file_hash):
             INSERT IGNORE INTO Seasons (SeasonName, StartDate, EndDate)
             VALUES (%s, %s, %s)
         """, (season_name, min_date, max_date))
-        summary.append(f"Season '{season_name}' inserted or already present.")
+        step("Seasons", cursor.rowcount, f"Season '{season_name}' inserted or already present.")
 
         # Step 3: Referees
         cursor.execute("""
             SELECT DISTINCT Referee
             FROM stg_premier_league_raw
-            WHERE Referee IS NOT NULL AND Referee <> ''
-        """)
+            WHERE FileHash = %s AND Referee IS NOT NULL AND Referee <> ''
+        """, (file_hash,))
         referees = [row[0] for row in cursor.fetchall()]
         insert_sql = """
             INSERT IGNORE INTO Referees (RefereeName, YearsExperience, Nationality)
@@ -120,14 +160,14 @@ def trigger_etl_job(file_hash):
         """
         ref_data = [(ref, None, None) for ref in referees]
         cursor.executemany(insert_sql, ref_data)
-        summary.append(f"{len(ref_data)} referees processed.")
+        step("Referees", len(ref_data), f"{len(ref_data)} referees processed.")
 
         # Step 4: Divisions
         cursor.execute("""
             SELECT DISTINCT `Div`
             FROM stg_premier_league_raw
-            WHERE `Div` IS NOT NULL AND `Div` <> ''
-        """)
+            WHERE FileHash = %s AND `Div` IS NOT NULL AND `Div` <> ''
+        """, (file_hash,))
         divisions = [row[0] for row in cursor.fetchall()]
         insert_sql = """
             INSERT IGNORE INTO Divisions (DivisionCode, LeagueName, Country, Tier)
@@ -135,22 +175,23 @@ def trigger_etl_job(file_hash):
         """
         div_data = [(div, "Premier League", "England", 1) for div in divisions]
         cursor.executemany(insert_sql, div_data)
-        summary.append(f"{len(div_data)} divisions processed.")
+        step("Divisions", len(div_data), f"{len(div_data)} divisions processed.")
 
         # Step 5: Matches
         cursor.execute("""
             SELECT Date, Time, `Div`, HomeTeam, AwayTeam, FTHG, FTAG, FTR,
                    HTHG, HTAG, HTR, Referee
             FROM stg_premier_league_raw
+            WHERE FileHash = %s
             ORDER BY Date, Time
-        """)
+        """, (file_hash,))
         rows = cursor.fetchall()
         match_data = []
 
         for row in rows:
             match_date, match_time, div_code, home_name, away_name, fthg, ftag, ftr, hthg, htag, htr, ref_name = row
 
-            cursor.execute("SELECT SeasonID FROM Seasons ORDER BY StartDate DESC LIMIT 1")
+            cursor.execute("SELECT SeasonID FROM Seasons WHERE SeasonName = %s", (season_name,))
             season_id = cursor.fetchone()[0]
 
             cursor.execute("SELECT DivisionID FROM Divisions WHERE DivisionCode = %s", (div_code,))
@@ -190,16 +231,16 @@ def trigger_etl_job(file_hash):
             )
         """
         cursor.executemany(insert_sql, match_data)
-        conn.commit()
-        summary.append(f"{len(match_data)} matches inserted.")
+        step("Matches", len(match_data), f"{len(match_data)} matches inserted.")
 
         # Step 6: MatchStatistics
         cursor.execute("""
             SELECT Date, Time, HomeTeam, AwayTeam,
                    HS, `AS`, HST, AST, HC, AC, HF, AF, HY, AY, HR, AR
             FROM stg_premier_league_raw
+            WHERE FileHash = %s
             ORDER BY Date, Time
-        """)
+        """, (file_hash,))
         stat_rows = cursor.fetchall()
         stat_data = []
 
@@ -237,22 +278,9 @@ def trigger_etl_job(file_hash):
             )
         """
         cursor.executemany(insert_sql, stat_data)
-        conn.commit()
-        summary.append(f"{len(stat_data)} match statistics inserted.")
+        step("MatchStatistics", len(stat_data), f"{len(stat_data)} match statistics inserted.")
 
-        # Step 7: Log ETL success
-        end_time = datetime.now()
-        cursor.execute("""
-            UPDATE ETLLog
-            SET EndTime = %s,
-                RecordsProcessed = %s,
-                Status = %s,
-                ErrorMessage = NULL
-            WHERE LogID = %s
-        """, (end_time, len(match_data), "Completed", log_id))
-        conn.commit()
-
-        # Step 8: insert Market definitions
+        # Step 7: insert Market definitions
         insert_market_sql = """
             INSERT IGNORE INTO Markets (MarketType, MarketSubtype, Parameter, Description)
             VALUES (%s, %s, %s, %s)
@@ -262,8 +290,7 @@ def trigger_etl_job(file_hash):
             ("OverUnder", "FullTime", "2.5", "Over/Under 2.5 total goals")
         ]
         cursor.executemany(insert_market_sql, market_data)
-        conn.commit()
-        summary.append(f"{len(market_data)} market definitions inserted.")
+        step("Markets", len(market_data), f"{len(market_data)} market definitions inserted.")
 
         # Over/Under column mapping (moved up so it’s available)
         ou_map = {
@@ -271,7 +298,7 @@ def trigger_etl_job(file_hash):
             "Pinnacle Sports": ("P_2_5O", "P_2_5U")
         }
                 
-        # Step 9: Insert Bookmakers and fetch IDs
+        # Step 8: Insert Bookmakers and fetch IDs
         bookmaker_map = {
             "Bet365": ("B365H", "B365D", "B365A"),
             "Bet&Win": ("BWH", "BWD", "BWA"),
@@ -291,7 +318,6 @@ def trigger_etl_job(file_hash):
         all_bookmakers = set(bookmaker_map) | set(ou_map)    
         for name in all_bookmakers:
             cursor.execute(insert_bookmaker_sql, (name.strip(), name.strip()))
-        conn.commit()
     
         # Get IDs
         bookmaker_ids = {}
@@ -302,7 +328,7 @@ def trigger_etl_job(file_hash):
                 raise RuntimeError(f"Bookmaker '{name}' not found.")
             bookmaker_ids[name] = row[0]
 
-        # Step 10: Get MarketID for 1X2 FullTime
+        # Step 9: Get MarketID for 1X2 FullTime
         cursor.execute("""
             SELECT MarketID FROM Markets
             WHERE MarketType = %s AND MarketSubtype = %s AND Parameter = %s
@@ -313,7 +339,7 @@ def trigger_etl_job(file_hash):
             raise RuntimeError("Market '1X2 / FullTime' not found in Markets table.")
         market_id = row[0]
 
-        # Step 11: Insert BettingOdds
+        # Step 10: Insert BettingOdds
         cursor.execute("""
             SELECT MatchID, B365H, B365D, B365A, BWH, BWD, BWA, IWH, IWD, IWA, PSH, PSD, PSA
             FROM Matches m
@@ -321,7 +347,8 @@ def trigger_etl_job(file_hash):
               ON m.MatchDate = s.Date AND m.MatchTime = s.Time
              AND m.HomeTeamID = (SELECT TeamID FROM Teams WHERE TeamName = s.HomeTeam)
              AND m.AwayTeamID = (SELECT TeamID FROM Teams WHERE TeamName = s.AwayTeam)
-        """)
+            WHERE s.FileHash = %s
+        """, (file_hash,))
         rows = cursor.fetchall()
 
         odds_data = []
@@ -346,10 +373,9 @@ def trigger_etl_job(file_hash):
             ) VALUES (%s, %s, %s, %s, %s)
         """
         cursor.executemany(insert_odds_sql, odds_data)
-        conn.commit()
-        summary.append(f"{len(odds_data)} 1X2 odds inserted.")
+        step("BettingOdds (1X2)", len(odds_data), f"{len(odds_data)} 1X2 odds inserted.")
 
-        # Step 12: Insert Over/Under 2.5 odds
+        # Step 11: Insert Over/Under 2.5 odds
         # Get MarketID for Over/Under 2.5
         cursor.execute("""
             SELECT MarketID FROM Markets
@@ -365,7 +391,7 @@ def trigger_etl_job(file_hash):
         for pair in ou_map.values():
             all_columns.extend(pair)
 
-        select_clause = ", ".join(set(all_columns))
+        select_clause = ", ".join(dict.fromkeys(all_columns))   # keeps MatchID first
         cursor.execute(f"""
             SELECT {select_clause}
             FROM Matches m
@@ -373,7 +399,8 @@ def trigger_etl_job(file_hash):
               ON m.MatchDate = s.Date AND m.MatchTime = s.Time
              AND m.HomeTeamID = (SELECT TeamID FROM Teams WHERE TeamName = s.HomeTeam)
              AND m.AwayTeamID = (SELECT TeamID FROM Teams WHERE TeamName = s.AwayTeam)
-        """)
+            WHERE s.FileHash = %s
+        """, (file_hash,))
         rows = cursor.fetchall()
 
         ou_odds = []
@@ -397,15 +424,66 @@ def trigger_etl_job(file_hash):
             ) VALUES (%s, %s, %s, %s, %s)
         """
         cursor.executemany(insert_ou_sql, ou_odds)
+        step("BettingOdds (Over/Under)", len(ou_odds), f"{len(ou_odds)} Over/Under 2.5 odds inserted.")
+
+        # Step 12: Per-matchday league standings (only new matchdays are appended)
+        standings_rows = update_league_standings(cursor)
+        step("LeagueStandings", standings_rows, f"{standings_rows} league standing rows added.")
+
+        # Step 13: Elo ratings (only matches newer than the last rated one)
+        rated_matches = update_team_ratings(cursor)
+        step("TeamRatings", rated_matches, f"{rated_matches} matches rated.")
+
+        # Step 14: Goal model refit for the seasons whose matches changed (in parallel)
+        refitted = update_goal_models(cursor, batch=log_id)
+        step("GoalModelFits", refitted, f"{refitted} season goal models fitted.")
+
+        # Step 15: Head-to-head index (only matches newer than the last indexed one)
+        h2h_rows = update_head_to_head(cursor)
+        step("HeadToHead", h2h_rows, f"{h2h_rows} head-to-head rows added.")
+
+        # Step 16: Analytical star schema (only matches above each fact table's high-water mark)
+        dates = update_time_dimension(cursor)
+        step("dim_Time", dates, f"{dates} dates added to dim_Time.")
+        match_facts = update_match_results(cursor, log_id)
+        step("fact_MatchResult", match_facts, f"{match_facts} rows added to fact_MatchResult.")
+        team_facts = update_team_match_stats(cursor, log_id)
+        step("fact_TeamMatchStats", team_facts, f"{team_facts} rows added to fact_TeamMatchStats.")
+        snapshot_rows = update_league_snapshots(cursor, log_id)
+        step("fact_LeagueSnapshot", snapshot_rows, f"{snapshot_rows} rows added to fact_LeagueSnapshot.")
+
+        # Publish the batch
+        cursor.execute("""
+            UPDATE ETLLog
+            SET EndTime = %s,
+                RecordsProcessed = %s,
+                Status = %s,
+                ErrorMessage = NULL
+            WHERE LogID = %s
+        """, (datetime.now(), len(match_data), "Completed", log_id))
+        save_etl_steps(cursor, log_id, steps)
         conn.commit()
-        summary.append(f"{len(ou_odds)} Over/Under 2.5 odds inserted.")
-                
+        published = True
+
+        # Local replica (if enabled) picks up the new data on the next read
+        mark_replica_stale()
+
+        # Step 17: Similar-matches index file, from the published matches (only
+        # matches newer than the last indexed one; the file is replaced atomically)
+        indexed_matches = update_similarity_index(cursor)
+        step("SimilarityIndex", indexed_matches, f"{indexed_matches} matches added to the similarity index.")
+        save_etl_steps(cursor, log_id, steps)
+        conn.commit()
+
         return "\n".join(summary)
 
     except Exception as e:
         conn.rollback()
+        if published:
+            raise RuntimeError(f"ETL data published, but the similarity index update failed: {str(e)}")
         end_time = datetime.now()
         if log_id:
+            save_etl_steps(cursor, log_id, steps)
             cursor.execute("""
                 UPDATE ETLLog
                 SET EndTime = %s,
@@ -457,7 +535,7 @@ def trigger_etl_job(file_hash):
         # ... match statistics ...
         summary.append(f"{len(stat_data)} match statistics inserted.")
 
-        # Step 9: log success
+        # Step 8: log success
         end_time = datetime.now()
         cursor.execute("""
             UPDATE ETLLog
@@ -509,6 +587,80 @@ def fetch_etl_log():
     conn.close()
     return results
 
+def is_file_processed(file_hash):
+    """
+    True if an ETL job already completed for the file with this hash.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT COUNT(*) FROM ETLLog
+            WHERE FileHash = %s AND Status = 'Completed'
+        """, (file_hash,))
+        return cursor.fetchone()[0] > 0
+
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_pending_file_hashes():
+    """
+    Hashes of the staged files no ETL job has completed for yet, in staging
+    order.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT s.FileHash
+            FROM stg_premier_league_raw s
+            WHERE s.FileHash IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM ETLLog l
+                  WHERE l.FileHash = s.FileHash AND l.Status = 'Completed'
+              )
+            GROUP BY s.FileHash
+            ORDER BY MIN(s.LoadTimestamp)
+        """)
+        return [row[0] for row in cursor.fetchall()]
+
+    finally:
+        cursor.close()
+        conn.close()
+
+def save_etl_steps(cursor, log_id, steps):
+    """
+    Record the (table, rows, seconds) of each step of an ETL job.
+    """
+    ensure_tables(cursor, "ETLLogSteps")
+    cursor.execute("DELETE FROM ETLLogSteps WHERE LogID = %s", (log_id,))
+    cursor.executemany("""
+        INSERT INTO ETLLogSteps (LogID, StepNo, TableName, RowsAffected, Seconds)
+        VALUES (%s, %s, %s, %s, %s)
+    """, [(log_id, number, table, rows, round(seconds, 4))
+          for number, (table, rows, seconds) in enumerate(steps, 1)])
+
+def fetch_etl_steps(log_id):
+    """
+    Fetch the tables loaded by an ETL job, with their row counts and times.
+    """
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        ensure_tables(cursor, "ETLLogSteps")
+        cursor.execute("""
+            SELECT StepNo, TableName, RowsAffected, Seconds
+            FROM ETLLogSteps
+            WHERE LogID = %s
+            ORDER BY StepNo
+        """, (log_id,))
+        return cursor.fetchall()
+
+    finally:
+        cursor.close()
+        conn.close()
+
 def fetch_dead_letter():
     """
     Fetch recent dead-letter records from ETLDeadLetter table.
@@ -535,9 +687,21 @@ def clean_all_tables():
     cursor = conn.cursor()
 
     try:
+        ensure_tables(cursor, "LeagueStandings", "TeamRatings",
+                      "GoalModelFits", "GoalModelTeams", "GoalModelPredictions", "HeadToHead", *STAR_TABLES)
         cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
 
         tables = [
+            "fact_LeagueSnapshot",
+            "fact_TeamMatchStats",
+            "fact_MatchResult",
+            "dim_Time",
+            "LeagueStandings",
+            "TeamRatings",
+            "GoalModelFits",
+            "GoalModelTeams",
+            "GoalModelPredictions",
+            "HeadToHead",
             "MatchStatistics",
             "Matches",
             "BettingOdds",
@@ -554,6 +718,8 @@ def clean_all_tables():
 
         cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
         conn.commit()
+        delete_similarity_index()
+        mark_replica_stale()
 
     except Exception as e:
         conn.rollback()
@@ -572,21 +738,31 @@ def get_staging_columns():
     conn.close()
     return cols
 
-def has_season_data():
-    conn = get_connection()
+def has_season_data(conn=None):
+    """
+    True if any season is loaded. A given connection is used and left open.
+    """
+    own = conn is None
+    if own:
+        conn = get_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT COUNT(*) FROM Seasons")
     count = cursor.fetchone()[0]
     cursor.close()
-    conn.close()
+    if own:
+        conn.close()
     return count > 0
 
 def clear_etl_logs():
     conn = get_connection()
     cursor = conn.cursor()
     try:
+        ensure_tables(cursor, "ETLLogSteps", "ETLQueue")
+        cursor.execute("TRUNCATE TABLE ETLLogSteps")
         cursor.execute("TRUNCATE TABLE ETLLog")
+        cursor.execute("DELETE FROM ETLQueue WHERE Status NOT IN ('Queued', 'Running')")
         conn.commit()
+        mark_replica_stale()
 
     except Exception as e:
         conn.rollback()
@@ -597,7 +773,7 @@ def clear_etl_logs():
         conn.close()
 
 def get_all_referees():
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT RefereeName FROM Referees ORDER BY RefereeName")
@@ -607,7 +783,7 @@ def get_all_referees():
         conn.close()
 
 def get_referee_stats(season_name, referee_name):
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor(dictionary=True)
     try:
         cursor.execute("""
@@ -626,119 +802,52 @@ def get_referee_stats(season_name, referee_name):
         cursor.close()
         conn.close()
 
-def get_all_seasons():
-    conn = get_connection()
+def get_latest_etl_batch():
+    """
+    Return the LogID of the last completed ETL run (0 if none).
+    """
+    conn = get_read_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute("SELECT SeasonName FROM Seasons ORDER BY StartDate DESC")
-        return [row[0] for row in cursor.fetchall()]
+        return latest_etl_batch(cursor)
     finally:
         cursor.close()
         conn.close()
 
-def get_referee_trend_stats(season_name, referee_name):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
+def get_data_version():
+    """
+    Return the data version (see db.query.data_version) views are built with.
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor()
     try:
-        cursor.execute("""
-            SELECT m.MatchDate,
-                   ms.HomeYellowCards, ms.AwayYellowCards,
-                   ms.HomeRedCards, ms.AwayRedCards,
-                   ms.HomeFouls, ms.AwayFouls
-            FROM MatchStatistics ms
-            JOIN Matches m ON ms.MatchID = m.MatchID
-            JOIN Referees r ON m.RefereeID = r.RefereeID
-            JOIN Seasons s ON m.SeasonID = s.SeasonID
-            WHERE r.RefereeName = %s AND s.SeasonName = %s
-            ORDER BY m.MatchDate
-        """, (referee_name, season_name))
-        return cursor.fetchall()
+        return data_version(cursor)
     finally:
         cursor.close()
         conn.close()
 
-def get_all_teams():
-    conn = get_connection()
+def get_all_seasons():
+    conn = get_read_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute("SELECT TeamName FROM Teams ORDER BY TeamName")
+        cursor.execute("SELECT SeasonName FROM Seasons ORDER BY StartDate DESC")
         return [row[0] for row in cursor.fetchall()]
     finally:
         cursor.close()
         conn.close()
 
-def get_team_points_by_matchday(season_name, team_name):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    try:
-        cursor.execute("""
-            SELECT m.MatchDate,
-                   CASE
-                       WHEN t.TeamID = m.HomeTeamID THEN
-                           CASE m.FTR WHEN 'H' THEN 3 WHEN 'D' THEN 1 ELSE 0 END
-                       WHEN t.TeamID = m.AwayTeamID THEN
-                           CASE m.FTR WHEN 'A' THEN 3 WHEN 'D' THEN 1 ELSE 0 END
-                       ELSE 0
-                   END AS Points
-            FROM Matches m
-            JOIN Seasons s ON m.SeasonID = s.SeasonID
-            JOIN Teams t ON t.TeamName = %s
-            WHERE s.SeasonName = %s
-              AND (m.HomeTeamID = t.TeamID OR m.AwayTeamID = t.TeamID)
-              AND m.FTR IN ('H', 'D', 'A')
-            ORDER BY m.MatchDate
-        """, (team_name, season_name))
-
-        results = cursor.fetchall()
-        # Add matchday index for plotting
-        for i, row in enumerate(results):
-            row["Matchday"] = i + 1
-        return results
-    finally:
-        cursor.close()
-        conn.close()
-
-def get_team_match_trend_data(season_name, team_name):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
+def get_all_teams():
+    conn = get_read_connection()
+    cursor = conn.cursor()
     try:
-        cursor.execute("""
-            SELECT 
-                m.MatchDate,
-                CASE
-                    WHEN t.TeamID = m.HomeTeamID THEN
-                        CASE m.FTR WHEN 'H' THEN 3 WHEN 'D' THEN 1 ELSE 0 END
-                    WHEN t.TeamID = m.AwayTeamID THEN
-                        CASE m.FTR WHEN 'A' THEN 3 WHEN 'D' THEN 1 ELSE 0 END
-                    ELSE 0
-                END AS Points,
-                CASE WHEN m.HomeTeamID = t.TeamID THEN m.FTHG ELSE m.FTAG END AS GF,
-                CASE WHEN m.HomeTeamID = t.TeamID THEN m.FTAG ELSE m.FTHG END AS GA,
-                CASE 
-                    WHEN m.HomeTeamID = t.TeamID THEN 'Home' 
-                    ELSE 'Away' 
-                END AS HomeOrAway,
-                CASE 
-                    WHEN m.HomeTeamID = t.TeamID THEN at.TeamName
-                    ELSE ht.TeamName
-                END AS Opponent
-            FROM Matches m
-            JOIN Teams t ON t.TeamName = %s
-            JOIN Teams ht ON ht.TeamID = m.HomeTeamID
-            JOIN Teams at ON at.TeamID = m.AwayTeamID
-            JOIN Seasons s ON m.SeasonID = s.SeasonID
-            WHERE s.SeasonName = %s
-              AND (m.HomeTeamID = t.TeamID OR m.AwayTeamID = t.TeamID)
-              AND m.FTR IN ('H', 'D', 'A')
-            ORDER BY m.MatchDate
-        """, (team_name, season_name))
-        return cursor.fetchall()
+        cursor.execute("SELECT TeamName FROM Teams ORDER BY TeamName")
+        return [row[0] for row in cursor.fetchall()]
     finally:
         cursor.close()
         conn.close()
 
 def get_all_bookmakers():
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT BookmakerName FROM Bookmakers ORDER BY BookmakerName")
@@ -747,67 +856,6 @@ def get_all_bookmakers():
         cursor.close()
         conn.close()
 
-def get_implied_probability_data(season_name, bookmaker_name):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    try:
-        cursor.execute("""
-            SELECT 
-                bo.OddsValue AS HomeOdds,
-                bd.OddsValue AS DrawOdds,
-                ba.OddsValue AS AwayOdds,
-                m.FTR
-            FROM BettingOdds bo
-            JOIN Matches m ON m.MatchID = bo.MatchID
-            JOIN Seasons s ON s.SeasonID = m.SeasonID
-            JOIN Bookmakers b ON b.BookmakerID = bo.BookmakerID
-            JOIN Markets mk ON mk.MarketID = bo.MarketID
-            JOIN BettingOdds bd ON bd.MatchID = bo.MatchID AND bd.BookmakerID = bo.BookmakerID
-                                AND bd.MarketID = bo.MarketID AND bd.OutcomeCode = 'D'
-            JOIN BettingOdds ba ON ba.MatchID = bo.MatchID AND ba.BookmakerID = bo.BookmakerID
-                                AND ba.MarketID = bo.MarketID AND ba.OutcomeCode = 'A'
-            WHERE s.SeasonName = %s
-              AND b.BookmakerName = %s
-              AND mk.MarketType = '1X2'
-              AND mk.MarketSubtype = 'FullTime'
-              AND bo.OutcomeCode = 'H'
-              AND m.FTR IN ('H', 'D', 'A')
-        """, (season_name, bookmaker_name))
-        return cursor.fetchall()
-    finally:
-        cursor.close()
-        conn.close()
-
-def get_avg_margins_per_bookmaker(season_name):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    try:
-        cursor.execute("""
-            SELECT b.BookmakerName,
-                   AVG((1 / boh.OddsValue + 1 / bod.OddsValue + 1 / boa.OddsValue) - 1.0) * 100 AS AvgMargin,
-                   STDDEV_POP((1 / boh.OddsValue + 1 / bod.OddsValue + 1 / boa.OddsValue) - 1.0) * 100 AS StdMargin
-            FROM BettingOdds boh
-            JOIN BettingOdds bod ON bod.MatchID = boh.MatchID AND bod.BookmakerID = boh.BookmakerID
-                AND bod.MarketID = boh.MarketID AND bod.OutcomeCode = 'D'
-            JOIN BettingOdds boa ON boa.MatchID = boh.MatchID AND boa.BookmakerID = boh.BookmakerID
-                AND boa.MarketID = boh.MarketID AND boa.OutcomeCode = 'A'
-            JOIN Matches m ON m.MatchID = boh.MatchID
-            JOIN Seasons s ON s.SeasonID = m.SeasonID
-            JOIN Bookmakers b ON b.BookmakerID = boh.BookmakerID
-            JOIN Markets mk ON mk.MarketID = boh.MarketID
-            WHERE boh.OutcomeCode = 'H'
-              AND mk.MarketType = '1X2'
-              AND mk.MarketSubtype = 'FullTime'
-              AND boh.OddsValue > 1.01 AND bod.OddsValue > 1.01 AND boa.OddsValue > 1.01
-              AND s.SeasonName = %s
-            GROUP BY b.BookmakerName
-            ORDER BY AvgMargin DESC
-        """, (season_name,))
-        return cursor.fetchall()
-    finally:
-        cursor.close()
-        conn.close()
-
 def deduplicate_bookmakers():
     conn = get_connection()
     cursor = conn.cursor()
@@ -824,19 +872,22 @@ def deduplicate_bookmakers():
             return "No duplicate bookmaker names found."
 
         # Step 2: Reassign odds from duplicate IDs to canonical one
+        # (correlated subquery instead of UPDATE ... JOIN, so it runs on every backend)
         cursor.execute("""
-            UPDATE BettingOdds bo
-            JOIN (
-                SELECT b1.BookmakerID AS DuplicateID, b2.MinID AS KeepID
+            UPDATE BettingOdds
+            SET BookmakerID = (
+                SELECT MIN(b2.BookmakerID)
                 FROM Bookmakers b1
-                JOIN (
-                    SELECT BookmakerName, MIN(BookmakerID) AS MinID
+                JOIN Bookmakers b2 ON b2.BookmakerName = b1.BookmakerName
+                WHERE b1.BookmakerID = BettingOdds.BookmakerID
+            )
+            WHERE BookmakerID NOT IN (
+                SELECT * FROM (
+                    SELECT MIN(BookmakerID)
                     FROM Bookmakers
                     GROUP BY BookmakerName
-                ) b2 ON b1.BookmakerName = b2.BookmakerName
-                WHERE b1.BookmakerID != b2.MinID
-            ) map ON bo.BookmakerID = map.DuplicateID
-            SET bo.BookmakerID = map.KeepID
+                ) AS keep_ids
+            )
         """)
 
         # Step 3: Delete redundant rows
@@ -862,6 +913,7 @@ def deduplicate_bookmakers():
                 raise  # Only ignore expected "already exists" errors
 
         conn.commit()
+        mark_replica_stale(full=True)
         return f"{len(duplicates)} duplicate bookmaker name(s) fixed."
 
     except Exception as e:
@@ -871,42 +923,8 @@ def deduplicate_bookmakers():
         cursor.close()
         conn.close()
 
-def get_over_under_probability_data(season_name, bookmaker_name):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    try:
-        cursor.execute("""
-            SELECT 
-                bo.OverOdds,
-                bo.UnderOdds,
-                (m.FTHG + m.FTAG) AS TotalGoals
-            FROM (
-                SELECT 
-                    bo.MatchID,
-                    MAX(CASE WHEN bo.OutcomeCode = 'Over' THEN bo.OddsValue END) AS OverOdds,
-                    MAX(CASE WHEN bo.OutcomeCode = 'Under' THEN bo.OddsValue END) AS UnderOdds
-                FROM BettingOdds bo
-                JOIN Bookmakers b ON b.BookmakerID = bo.BookmakerID
-                JOIN Markets mk ON mk.MarketID = bo.MarketID
-                WHERE b.BookmakerName = %s
-                  AND mk.MarketType = 'OverUnder'
-                  AND mk.MarketSubtype = 'FullTime'
-                  AND mk.Parameter = '2.5'
-                GROUP BY bo.MatchID
-            ) bo
-            JOIN Matches m ON m.MatchID = bo.MatchID
-            JOIN Seasons s ON s.SeasonID = m.SeasonID
-            WHERE s.SeasonName = %s
-              AND bo.OverOdds IS NOT NULL
-              AND bo.UnderOdds IS NOT NULL
-        """, (bookmaker_name, season_name))
-        return cursor.fetchall()
-    finally:
-        cursor.close()
-        conn.close()
-
 def fetch_league_table(season=None):
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor(dictionary=True)
 
     sql = "SELECT * FROM vw_LeagueTable"
@@ -925,7 +943,7 @@ def get_league_table_data(season_name):
     """
     Return a list of team standings (dicts) for the given season.
     """
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor(dictionary=True)
 
     try:
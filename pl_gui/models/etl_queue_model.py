@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# models/etl_queue_model.py
+
+# ETL job queue shared by every client of the database. Jobs are queued in
+# ETLQueue and run by the client that holds the ETL lock (GET_LOCK, which
+# the server releases if that client dies), one at a time in QueueID order
+# until the queue is empty. The other clients leave their jobs queued and
+# follow their position and progress in the table.
+
+from db.connection import get_connection, get_db_config
+from db.schema import ensure_tables
+from models.etl_model import trigger_etl_job, ETL_STEPS
+from datetime import datetime
+import getpass
+import socket
+
+ETL_LOCK = "pl_gui_etl"
+
+# Jobs not finished yet
+ACTIVE_STATUSES = ("Queued", "Running")
+
+def client_name(user=None):
+    """
+    Name of this client in the queue: the user (the logged-in one, or the
+    account running the program) and the computer.
+    """
+    if not user:
+        try:
+            user = getpass.getuser()
+        except Exception:
+            user = "unknown"
+    return f"{user}@{socket.gethostname()}"
+
+def enqueue_etl_job(file_hash, requested_by):
+    """
+    Queue an ETL job for a staged file, unless one for the same file is
+    already queued or running. Return its QueueID.
+    """
+    if not file_hash:
+        raise RuntimeError("Missing file hash for duplicate detection.")
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        ensure_tables(cursor, "ETLQueue")
+        cursor.execute("""
+            SELECT MIN(QueueID) FROM ETLQueue
+            WHERE FileHash = %s AND Status IN ('Queued', 'Running')
+        """, (file_hash,))
+        queue_id = cursor.fetchone()[0]
+        if queue_id:
+            return queue_id
+
+        cursor.execute("""
+            INSERT INTO ETLQueue (FileHash, RequestedBy, QueuedTime, Status)
+            VALUES (%s, %s, %s, %s)
+        """, (file_hash, requested_by[:100], datetime.now(), "Queued"))
+        queue_id = cursor.lastrowid
+        conn.commit()
+        return queue_id
+
+    finally:
+        cursor.close()
+        conn.close()
+
+def _next_job(cursor):
+    cursor.execute("""
+        SELECT QueueID, FileHash, RequestedBy FROM ETLQueue
+        WHERE Status = 'Queued'
+        ORDER BY QueueID
+        LIMIT 1
+    """)
+    row = cursor.fetchone()
+    return dict(zip(("QueueID", "FileHash", "RequestedBy"), row)) if row else None
+
+def _run_job(conn, cursor, job, process_name, progress, live_progress):
+    """
+    Run one queued job and record how it ended.
+    """
+    cursor.execute("""
+        UPDATE ETLQueue
+        SET Status = 'Running', StartTime = %s, StepsDone = 0, CurrentStep = NULL
+        WHERE QueueID = %s
+    """, (datetime.now(), job["QueueID"]))
+    conn.commit()
+
+    steps_done = 0
+
+    def job_progress(message):
+        nonlocal steps_done
+        steps_done += 1
+        if live_progress:
+            cursor.execute("""
+                UPDATE ETLQueue SET StepsDone = %s, CurrentStep = %s WHERE QueueID = %s
+            """, (steps_done, message[:255], job["QueueID"]))
+            conn.commit()
+        if progress:
+            progress(job, message)
+
+    try:
+        message = trigger_etl_job(job["FileHash"], job_progress, process_name)
+        status = "Completed"
+    except Exception as e:
+        message, status = str(e), "Failed"
+
+    # Jobs run one at a time, so the file's latest log is this job's
+    cursor.execute("SELECT MAX(LogID) FROM ETLLog WHERE FileHash = %s", (job["FileHash"],))
+    log_id = cursor.fetchone()[0]
+    cursor.execute("""
+        UPDATE ETLQueue
+        SET Status = %s, EndTime = %s, StepsDone = %s, CurrentStep = NULL, LogID = %s, Message = %s
+        WHERE QueueID = %s
+    """, (status, datetime.now(), steps_done, log_id, message, job["QueueID"]))
+    conn.commit()
+
+def run_etl_queue(process_name="GUI ETL Job", progress=None, wait=0, locked=None):
+    """
+    Take the ETL lock, waiting up to wait seconds (forever if negative),
+    and run the queued jobs in order until the queue is empty. progress, if
+    given, is called with the job and the summary line of each step, and
+    locked, if given, once the lock is first taken.
+    Return False if another client held the lock (it runs the jobs).
+    """
+    conn = get_connection()
+    cursor = conn.cursor(buffered=True)
+
+    # The load is one open transaction and SQLite allows a single writer,
+    # so there the step progress is only stored when the job ends
+    live_progress = get_db_config()["backend"] != "sqlite"
+    ran = False
+
+    try:
+        ensure_tables(cursor, "ETLQueue")
+        while True:
+            cursor.execute("SELECT GET_LOCK(%s, %s)", (ETL_LOCK, wait))
+            if cursor.fetchone()[0] != 1:
+                return ran
+            if locked and not ran:
+                locked()
+            ran = True
+
+            try:
+                # With the lock held, a Running job was left by a client that
+                # stopped: its load was rolled back, so it runs again in turn
+                cursor.execute("""
+                    UPDATE ETLQueue
+                    SET Status = 'Queued', StartTime = NULL, StepsDone = 0, CurrentStep = NULL, Message = %s
+                    WHERE Status = 'Running'
+                """, ("Queued again: the client running it stopped before it ended.",))
+                cursor.execute("""
+                    UPDATE ETLLog
+                    SET EndTime = %s, Status = 'Failed', ErrorMessage = %s
+                    WHERE Status = 'Running'
+                """, (datetime.now(), "The client running the job stopped before it ended."))
+                conn.commit()
+
+                job = _next_job(cursor)
+                while job:
+                    _run_job(conn, cursor, job, process_name, progress, live_progress)
+                    job = _next_job(cursor)
+
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (ETL_LOCK,))
+                cursor.fetchone()
+                conn.commit()
+
+            # A job queued while the lock was being released would wait
+            # for the next client, so try again (without waiting) for it
+            if not _next_job(cursor):
+                return ran
+            wait = 0
+
+    finally:
+        cursor.close()
+        conn.close()
+
+def _queue_row(row, position):
+    row["Position"] = position
+    row["Progress"] = f"{row['StepsDone']}/{ETL_STEPS}"
+    return row
+
+def fetch_etl_queue(limit=20):
+    """
+    The active jobs and the latest finished ones, newest first, with the
+    Position of each queued job (1 runs next) and the steps done.
+    """
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        ensure_tables(cursor, "ETLQueue")
+        cursor.execute("""
+            SELECT QueueID, Status, StepsDone, CurrentStep, RequestedBy, FileHash,
+                   QueuedTime, StartTime, EndTime, LogID, Message
+            FROM ETLQueue
+            WHERE Status IN ('Queued', 'Running')
+               OR QueueID IN (SELECT QueueID FROM (
+                      SELECT QueueID FROM ETLQueue ORDER BY QueueID DESC LIMIT %s) latest)
+            ORDER BY QueueID
+        """, (limit,))
+        rows = cursor.fetchall()
+
+        position = 0
+        for row in rows:
+            if row["Status"] == "Queued":
+                position += 1
+                _queue_row(row, position)
+            else:
+                _queue_row(row, None)
+        return rows[::-1]
+
+    finally:
+        cursor.close()
+        conn.close()
+
+def fetch_etl_job(queue_id):
+    """
+    One job of the queue (as in fetch_etl_queue), or None.
+    """
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        ensure_tables(cursor, "ETLQueue")
+        cursor.execute("""
+            SELECT QueueID, Status, StepsDone, CurrentStep, RequestedBy, FileHash,
+                   QueuedTime, StartTime, EndTime, LogID, Message
+            FROM ETLQueue
+            WHERE QueueID = %s
+        """, (queue_id,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+
+        position = None
+        if row["Status"] == "Queued":
+            cursor.execute("""
+                SELECT COUNT(*) AS Ahead FROM ETLQueue
+                WHERE Status = 'Queued' AND QueueID < %s
+            """, (queue_id,))
+            position = cursor.fetchone()["Ahead"] + 1
+        return _queue_row(row, position)
+
+    finally:
+        cursor.close()
+        conn.close()
+
+def run_etl_job(file_hash, requested_by, process_name, progress=None, waiting=None, poll=2):
+    """
+    Queue an ETL job and wait until it ends: the queue is run here when the
+    lock is free, otherwise by the client holding it. waiting, if given, is
+    called with the job every poll seconds while it waits. Return the job.
+    """
+    queue_id = enqueue_etl_job(file_hash, requested_by)
+    while True:
+        run_etl_queue(process_name, progress, wait=poll)
+        job = fetch_etl_job(queue_id)
+        if job is None or job["Status"] not in ACTIVE_STATUSES:
+            return job
+        if waiting:
+            waiting(job)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# models/form_model.py
+
+# Rolling-window (last-N matches) form metrics computed by the database
+# with window functions, so views only plot the returned columns.
+
+from db.connection import get_read_connection
+from db.query import in_filter
+
+def _window_frame(window, per_season):
+    """
+    Return the PARTITION/ORDER/ROWS frame of a trailing window of N matches.
+    """
+    window = int(window)
+    if window < 1:
+        raise ValueError("Window size must be at least 1 match.")
+    partition = "PARTITION BY SeasonID " if per_season else ""
+    return f"{partition}ORDER BY MatchDate, MatchID ROWS BETWEEN {window - 1} PRECEDING AND CURRENT ROW"
+
+def get_team_rolling_form(team_name, window, season_names=None, per_season=True):
+    """
+    Return every match of a team (for the given seasons, None means all) with
+    its raw values and trailing averages over the last `window` matches:
+    points, goals for/against, shots, shots on target and cards.
+    With per_season=True the windows and cumulative sums restart each season.
+    """
+    frame = _window_frame(window, per_season)
+    partition = "PARTITION BY SeasonID " if per_season else ""
+    season_sql, season_params = in_filter("s.SeasonName", season_names)
+
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"""
+            WITH TeamMatches AS (
+                SELECT
+                    m.MatchID,
+                    m.MatchDate,
+                    m.SeasonID,
+                    s.SeasonName,
+                    CASE
+                        WHEN m.HomeTeamID = t.TeamID THEN
+                            CASE m.FTR WHEN 'H' THEN 3 WHEN 'D' THEN 1 ELSE 0 END
+                        ELSE
+                            CASE m.FTR WHEN 'A' THEN 3 WHEN 'D' THEN 1 ELSE 0 END
+                    END AS Points,
+                    CASE WHEN m.HomeTeamID = t.TeamID THEN m.FTHG ELSE m.FTAG END AS GF,
+                    CASE WHEN m.HomeTeamID = t.TeamID THEN m.FTAG ELSE m.FTHG END AS GA,
+                    CASE WHEN m.HomeTeamID = t.TeamID THEN ms.HomeShots ELSE ms.AwayShots END AS Shots,
+                    CASE WHEN m.HomeTeamID = t.TeamID THEN ms.HomeShotsTarget ELSE ms.AwayShotsTarget END AS ShotsTarget,
+                    CASE WHEN m.HomeTeamID = t.TeamID THEN ms.HomeYellowCards ELSE ms.AwayYellowCards END AS YellowCards,
+                    CASE WHEN m.HomeTeamID = t.TeamID THEN ms.HomeRedCards ELSE ms.AwayRedCards END AS RedCards,
+                    CASE WHEN m.HomeTeamID = t.TeamID THEN 'Home' ELSE 'Away' END AS HomeOrAway,
+                    CASE WHEN m.HomeTeamID = t.TeamID THEN at.TeamName ELSE ht.TeamName END AS Opponent
+                FROM Matches m
+                JOIN Teams t ON t.TeamName = %s
+                JOIN Teams ht ON ht.TeamID = m.HomeTeamID
+                JOIN Teams at ON at.TeamID = m.AwayTeamID
+                JOIN Seasons s ON s.SeasonID = m.SeasonID
+                LEFT JOIN MatchStatistics ms ON ms.MatchID = m.MatchID
+                WHERE (m.HomeTeamID = t.TeamID OR m.AwayTeamID = t.TeamID)
+                  AND m.FTR IN ('H', 'D', 'A'){season_sql}
+            ),
+            Cumulative AS (
+                SELECT
+                    tm.*,
+                    ROW_NUMBER() OVER ({partition}ORDER BY MatchDate, MatchID) AS Matchday,
+                    SUM(Points) OVER ({partition}ORDER BY MatchDate, MatchID ROWS UNBOUNDED PRECEDING) AS CumPoints,
+                    SUM(GF - GA) OVER ({partition}ORDER BY MatchDate, MatchID ROWS UNBOUNDED PRECEDING) AS CumGD
+                FROM TeamMatches tm
+            )
+            SELECT
+                c.*,
+                SUM(Points) OVER w AS FormPoints,
+                AVG(Points) OVER w AS AvgPoints,
+                AVG(CumPoints) OVER w AS AvgCumPoints,
+                AVG(GF) OVER w AS AvgGF,
+                AVG(GA) OVER w AS AvgGA,
+                AVG(GF - GA) OVER w AS AvgGD,
+                AVG(Shots) OVER w AS AvgShots,
+                AVG(ShotsTarget) OVER w AS AvgShotsTarget,
+                AVG(YellowCards) OVER w AS AvgYellowCards,
+                AVG(RedCards) OVER w AS AvgRedCards,
+                AVG(YellowCards + RedCards) OVER w AS AvgCards
+            FROM Cumulative c
+            WINDOW w AS ({frame})
+            ORDER BY MatchDate, MatchID
+        """, (team_name,) + season_params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_referee_rolling_stats(referee_name, window, season_names=None, per_season=True):
+    """
+    Return every match of a referee (for the given seasons, None means all)
+    with total cards and fouls and their trailing averages over the last
+    `window` matches.
+    """
+    frame = _window_frame(window, per_season)
+    season_sql, season_params = in_filter("s.SeasonName", season_names)
+
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"""
+            WITH RefereeMatches AS (
+                SELECT
+                    m.MatchID,
+                    m.MatchDate,
+                    m.SeasonID,
+                    s.SeasonName,
+                    ms.HomeYellowCards, ms.AwayYellowCards,
+                    ms.HomeRedCards, ms.AwayRedCards,
+                    ms.HomeFouls, ms.AwayFouls,
+                    ms.HomeYellowCards + ms.AwayYellowCards AS Yellow,
+                    ms.HomeRedCards + ms.AwayRedCards AS Red,
+                    ms.HomeFouls + ms.AwayFouls AS Fouls
+                FROM MatchStatistics ms
+                JOIN Matches m ON ms.MatchID = m.MatchID
+                JOIN Referees r ON m.RefereeID = r.RefereeID
+                JOIN Seasons s ON m.SeasonID = s.SeasonID
+                WHERE r.RefereeName = %s{season_sql}
+            )
+            SELECT
+                rm.*,
+                AVG(Yellow) OVER w AS AvgYellow,
+                AVG(Red) OVER w AS AvgRed,
+                AVG(Fouls) OVER w AS AvgFouls
+            FROM RefereeMatches rm
+            WINDOW w AS ({frame})
+            ORDER BY MatchDate, MatchID
+        """, (referee_name,) + season_params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# models/goal_model.py
+
+# Poisson / Dixon-Coles goal model.
+# Expected goals are multiplicative: home goals = Attack[home] * Defence[away] * HomeAdvantage,
+# away goals = Attack[away] * Defence[home] (a higher Defence means a weaker defence).
+# Attack, Defence and HomeAdvantage are regularised Poisson estimates: each
+# team's ratings start from PRIOR_GOALS goals over PRIOR_GOALS of exposure
+# (a Gamma prior centred on 1, i.e. maximum a posteriori estimates), which
+# shrinks them slightly towards the average and keeps a team with no goals
+# finite. They are found with closed-form fixed-point updates over all
+# matches at once; Rho (the Dixon-Coles low-score correction) is then
+# chosen on a grid.
+# Fits are stored per season with the ETL batch that produced them and only
+# seasons whose matches changed are refitted.
+
+from db.connection import get_read_connection
+from db.query import in_filter, latest_etl_batch, data_version
+from db.schema import ensure_tables
+import numpy as np
+
+MAX_GOALS = 10
+MAX_ITERATIONS = 500
+TOLERANCE = 1e-8
+RHO_GRID = np.linspace(-0.25, 0.25, 201)
+
+# Goals and exposure (matches against average opposition) added to every team
+PRIOR_GOALS = 0.5
+
+# Fits kept in memory; the data version is part of every key, so an ETL run,
+# clean or restore (by any client) invalidates them
+_fit_cache = {}
+
+def _log_factorial(goals):
+    table = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, max(int(goals.max(initial=0)), 1) + 1)))])
+    return table[goals]
+
+def _tau(home_goals, away_goals, lam, mu, rho):
+    """
+    Dixon-Coles correction factor for each match (rho may be an array of
+    candidate values on a leading axis).
+    """
+    rho = np.asarray(rho, dtype=float)[..., None]
+    tau = np.ones(np.broadcast_shapes(rho.shape, lam.shape))
+    tau = np.where((home_goals == 0) & (away_goals == 0), 1 - lam * mu * rho, tau)
+    tau = np.where((home_goals == 0) & (away_goals == 1), 1 + lam * rho, tau)
+    tau = np.where((home_goals == 1) & (away_goals == 0), 1 + mu * rho, tau)
+    tau = np.where((home_goals == 1) & (away_goals == 1), 1 - rho, tau)
+    return tau
+
+def fit_goal_model(home, away, home_goals, away_goals, n_teams, weights=None):
+    """
+    Fit the model to matches given as arrays of team indexes (0..n_teams-1)
+    and goals. weights (e.g. time decay) default to 1.
+    Return a dict with attack, defence (arrays per team), home_advantage,
+    rho, log_likelihood and iterations.
+    """
+    home = np.asarray(home, dtype=np.int64)
+    away = np.asarray(away, dtype=np.int64)
+    home_goals = np.asarray(home_goals, dtype=np.int64)
+    away_goals = np.asarray(away_goals, dtype=np.int64)
+    w = np.ones(len(home)) if weights is None else np.asarray(weights, dtype=float)
+    if not len(home):
+        raise RuntimeError("Cannot fit the goal model without matches.")
+
+    # Weighted goals scored and conceded, plus the prior
+    prior = PRIOR_GOALS
+    scored = np.bincount(home, w * home_goals, n_teams) + np.bincount(away, w * away_goals, n_teams) + prior
+    conceded = np.bincount(home, w * away_goals, n_teams) + np.bincount(away, w * home_goals, n_teams) + prior
+    total_home_goals = np.sum(w * home_goals)
+
+    attack = np.ones(n_teams)
+    defence = np.ones(n_teams)
+    home_adv = 1.0
+    iterations = 0
+
+    for iterations in range(1, MAX_ITERATIONS + 1):
+        exposure = (np.bincount(home, w * defence[away] * home_adv, n_teams)
+                    + np.bincount(away, w * defence[home], n_teams) + prior)
+        new_attack = scored / exposure
+
+        exposure = (np.bincount(home, w * new_attack[away], n_teams)
+                    + np.bincount(away, w * new_attack[home] * home_adv, n_teams) + prior)
+        new_defence = conceded / exposure
+
+        new_home_adv = total_home_goals / np.sum(w * new_attack[home] * new_defence[away])
+
+        # Identify the scale: mean attack is 1
+        scale = new_attack.mean()
+        new_attack /= scale
+        new_defence *= scale
+
+        change = max(np.abs(new_attack - attack).max(), np.abs(new_defence - defence).max(),
+                     abs(new_home_adv - home_adv))
+        attack, defence, home_adv = new_attack, new_defence, new_home_adv
+        if change < TOLERANCE:
+            break
+
+    lam = attack[home] * defence[away] * home_adv
+    mu = attack[away] * defence[home]
+    poisson_ll = (home_goals * np.log(lam) - lam - _log_factorial(home_goals)
+                  + away_goals * np.log(mu) - mu - _log_factorial(away_goals))
+
+    # Rho: every candidate at once, keeping only those with a valid correction
+    tau = _tau(home_goals, away_goals, lam, mu, RHO_GRID)
+    valid = np.all(tau > 0, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ll = np.sum(w * (np.log(tau) + poisson_ll), axis=1)
+    ll[~valid] = -np.inf
+    best = int(np.argmax(ll))
+
+    return {
+        "attack": attack,
+        "defence": defence,
+        "home_advantage": float(home_adv),
+        "rho": float(RHO_GRID[best]),
+        "log_likelihood": float(ll[best]),
+        "iterations": iterations,
+    }
+
+def score_matrix(lam, mu, rho, max_goals=MAX_GOALS):
+    """
+    Probability of every score up to max_goals for each fixture.
+    lam and mu are the expected home and away goals (scalars or arrays);
+    return an array (..., home goals, away goals).
+    """
+    lam = np.asarray(lam, dtype=float)[..., None]
+    mu = np.asarray(mu, dtype=float)[..., None]
+    goals = np.arange(max_goals + 1)
+    log_fact = _log_factorial(goals)
+    home_pmf = np.exp(goals * np.log(lam) - lam - log_fact)
+    away_pmf = np.exp(goals * np.log(mu) - mu - log_fact)
+    matrix = home_pmf[..., :, None] * away_pmf[..., None, :]
+
+    lam, mu = lam[..., 0], mu[..., 0]
+    matrix[..., 0, 0] *= 1 - lam * mu * rho
+    matrix[..., 0, 1] *= 1 + lam * rho
+    matrix[..., 1, 0] *= 1 + mu * rho
+    matrix[..., 1, 1] *= 1 - rho
+    return matrix / matrix.sum(axis=(-2, -1), keepdims=True)
+
+def outcome_probabilities(matrix):
+    """
+    Home win, draw and away win probabilities from score matrices.
+    """
+    home = np.tril(matrix, -1).sum(axis=(-2, -1))
+    draw = np.trace(matrix, axis1=-2, axis2=-1)
+    away = np.triu(matrix, 1).sum(axis=(-2, -1))
+    return np.stack([home, draw, away], axis=-1)
+
+def _season_arrays(rows):
+    """
+    Turn (MatchID, HomeTeamID, AwayTeamID, FTHG, FTAG) rows into team indexes and goal arrays.
+    """
+    team_ids = sorted({r[1] for r in rows} | {r[2] for r in rows})
+    index = {team_id: i for i, team_id in enumerate(team_ids)}
+    home = np.array([index[r[1]] for r in rows], dtype=np.int64)
+    away = np.array([index[r[2]] for r in rows], dtype=np.int64)
+    home_goals = np.array([r[3] for r in rows], dtype=np.int64)
+    away_goals = np.array([r[4] for r in rows], dtype=np.int64)
+    return team_ids, home, away, home_goals, away_goals
+
+def update_goal_models(cursor, batch=None):
+    """
+    Refit the goal model of every season whose matches changed since its
+    stored fit (new matches or a new last MatchID), in this process since a
+    fit takes milliseconds, and store parameters and per-match predictions
+    tagged with batch (the running ETL job; the last completed one if not given).
+    Return the number of seasons refitted.
+    """
+    ensure_tables(cursor, "GoalModelFits", "GoalModelTeams", "GoalModelPredictions")
+    batch = batch or latest_etl_batch(cursor)
+
+    cursor.execute("""
+        SELECT m.SeasonID, COUNT(*), MAX(m.MatchID), f.Matches, f.LastMatchID
+        FROM Matches m
+        LEFT JOIN GoalModelFits f ON f.SeasonID = m.SeasonID
+        WHERE m.FTR IN ('H', 'D', 'A')
+        GROUP BY m.SeasonID, f.Matches, f.LastMatchID
+    """)
+    stale = [row[0] for row in cursor.fetchall() if (row[1], row[2]) != (row[3], row[4])]
+    if not stale:
+        return 0
+
+    season_sql, season_params = in_filter("SeasonID", stale)
+    cursor.execute(f"""
+        SELECT SeasonID, MatchID, HomeTeamID, AwayTeamID, FTHG, FTAG
+        FROM Matches
+        WHERE FTR IN ('H', 'D', 'A'){season_sql}
+        ORDER BY SeasonID, MatchDate, MatchID
+    """, season_params)
+    by_season = {}
+    for row in cursor.fetchall():
+        by_season.setdefault(row[0], []).append(row[1:])
+
+    for season_id, rows in by_season.items():
+        team_ids, home, away, home_goals, away_goals = _season_arrays(rows)
+        fit = fit_goal_model(home, away, home_goals, away_goals, len(team_ids))
+        _store_fit(cursor, season_id, batch, rows, team_ids, home, away, fit)
+
+    _fit_cache.clear()
+    return len(by_season)
+
+def _store_fit(cursor, season_id, batch, rows, team_ids, home, away, fit):
+    attack, defence = fit["attack"], fit["defence"]
+    cursor.execute("""
+        REPLACE INTO GoalModelFits (
+            SeasonID, ETLBatchID, Matches, LastMatchID, HomeAdvantage, Rho, LogLikelihood, Iterations
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """, (season_id, batch, len(rows), max(r[0] for r in rows), fit["home_advantage"],
+          fit["rho"], fit["log_likelihood"], fit["iterations"]))
+
+    cursor.execute("DELETE FROM GoalModelTeams WHERE SeasonID = %s", (season_id,))
+    cursor.executemany("""
+        INSERT INTO GoalModelTeams (SeasonID, TeamID, Attack, Defence)
+        VALUES (%s, %s, %s, %s)
+    """, [(season_id, team_id, float(attack[i]), float(defence[i])) for i, team_id in enumerate(team_ids)])
+
+    lam = attack[home] * defence[away] * fit["home_advantage"]
+    mu = attack[away] * defence[home]
+    probs = outcome_probabilities(score_matrix(lam, mu, fit["rho"]))
+    cursor.execute("DELETE FROM GoalModelPredictions WHERE SeasonID = %s", (season_id,))
+    cursor.executemany("""
+        INSERT INTO GoalModelPredictions (
+            MatchID, SeasonID, ExpHomeGoals, ExpAwayGoals, ProbHome, ProbDraw, ProbAway
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, [
+        (r[0], season_id, float(lam[i]), float(mu[i]), float(probs[i, 0]), float(probs[i, 1]), float(probs[i, 2]))
+        for i, r in enumerate(rows)
+    ])
+
+def get_season_model(season_name):
+    """
+    Return the stored fit of a season: home_advantage, rho, etl_batch and
+    teams {TeamName: (attack, defence)}. Fits are cached in memory until
+    the data changes.
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        ensure_tables(cursor, "GoalModelFits", "GoalModelTeams")
+        key = (season_name, data_version(cursor))
+        if key in _fit_cache:
+            return _fit_cache[key]
+
+        cursor.execute("""
+            SELECT f.HomeAdvantage, f.Rho, f.ETLBatchID, f.Matches, t.TeamName, g.Attack, g.Defence
+            FROM GoalModelFits f
+            JOIN Seasons s ON s.SeasonID = f.SeasonID
+            JOIN GoalModelTeams g ON g.SeasonID = f.SeasonID
+            JOIN Teams t ON t.TeamID = g.TeamID
+            WHERE s.SeasonName = %s
+            ORDER BY t.TeamName
+        """, (season_name,))
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    if not rows:
+        raise RuntimeError(f"No goal model fitted for season '{season_name}'. Run the ETL first.")
+
+    model = {
+        "home_advantage": rows[0]["HomeAdvantage"],
+        "rho": rows[0]["Rho"],
+        "etl_batch": rows[0]["ETLBatchID"],
+        "matches": rows[0]["Matches"],
+        "teams": {row["TeamName"]: (row["Attack"], row["Defence"]) for row in rows},
+    }
+    _fit_cache[key] = model
+    return model
+
+def predict_fixture(season_name, home_team, away_team, max_goals=MAX_GOALS):
+    """
+    Score matrix (home goals x away goals) and H/D/A probabilities of a
+    fixture between two teams of a season.
+    """
+    model = get_season_model(season_name)
+    for team in (home_team, away_team):
+        if team not in model["teams"]:
+            raise RuntimeError(f"Team '{team}' has no goal model parameters for {season_name}.")
+
+    home_attack, home_defence = model["teams"][home_team]
+    away_attack, away_defence = model["teams"][away_team]
+    lam = home_attack * away_defence * model["home_advantage"]
+    mu = away_attack * home_defence
+    matrix = score_matrix(lam, mu, model["rho"], max_goals)
+    return {
+        "matrix": matrix,
+        "probs": outcome_probabilities(matrix),
+        "expected_goals": (lam, mu),
+    }
+
+def time_decay_weights(match_dates, as_of_date, half_life_days):
+    """
+    Weight of each match, halving every half_life_days before as_of_date.
+    """
+    age = np.array([(as_of_date - d).days for d in match_dates], dtype=float)
+    return 0.5 ** (np.maximum(age, 0) / half_life_days)
+
+def fit_rolling_model(as_of_date, window_days=365, half_life_days=None):
+    """
+    Fit the model on the matches of the window_days before as_of_date,
+    across season boundaries, optionally with time-decay weights.
+    Return the fit with teams {TeamName: (attack, defence)} instead of arrays.
+    Fits are cached in memory until the data changes.
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor()
+    try:
+        key = ("rolling", as_of_date, window_days, half_life_days, data_version(cursor))
+        if key in _fit_cache:
+            return _fit_cache[key]
+
+        cursor.execute("""
+            SELECT m.MatchDate, ht.TeamName, at.TeamName, m.FTHG, m.FTAG
+            FROM Matches m
+            JOIN Teams ht ON ht.TeamID = m.HomeTeamID
+            JOIN Teams at ON at.TeamID = m.AwayTeamID
+            WHERE m.FTR IN ('H', 'D', 'A')
+              AND m.MatchDate < %s
+              AND m.MatchDate >= DATE_SUB(%s, INTERVAL %s DAY)
+            ORDER BY m.MatchDate, m.MatchID
+        """, (as_of_date, as_of_date, int(window_days)))
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    if not rows:
+        raise RuntimeError(f"No matches in the {window_days} days before {as_of_date}.")
+
+    teams = sorted({r[1] for r in rows} | {r[2] for r in rows})
+    index = {team: i for i, team in enumerate(teams)}
+    weights = None
+    if half_life_days:
+        weights = time_decay_weights([r[0] for r in rows], as_of_date, half_life_days)
+
+    fit = fit_goal_model([index[r[1]] for r in rows], [index[r[2]] for r in rows],
+                         [r[3] for r in rows], [r[4] for r in rows], len(teams), weights)
+    fit["teams"] = {team: (float(fit["attack"][i]), float(fit["defence"][i])) for i, team in enumerate(teams)}
+    fit["matches"] = len(rows)
+    del fit["attack"], fit["defence"]
+    _fit_cache[key] = fit
+    return fit
+
+def get_model_predictions(season_names=None):
+    """
+    Stored model probabilities per match for the given seasons (None means
+    all), as a dict of arrays: MatchID, probs (N x 3, H/D/A) and expected goals.
+    """
+    season_sql, season_params = in_filter("s.SeasonName", season_names)
+
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        ensure_tables(cursor, "GoalModelPredictions")
+        cursor.execute(f"""
+            SELECT p.MatchID, p.ProbHome, p.ProbDraw, p.ProbAway, p.ExpHomeGoals, p.ExpAwayGoals
+            FROM GoalModelPredictions p
+            JOIN Seasons s ON s.SeasonID = p.SeasonID
+            WHERE 1 = 1{season_sql}
+            ORDER BY p.MatchID
+        """, season_params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    return {
+        "MatchID": np.array([r["MatchID"] for r in rows], dtype=np.int64),
+        "probs": np.array([[r["ProbHome"], r["ProbDraw"], r["ProbAway"]] for r in rows], dtype=float).reshape(-1, 3),
+        "expected_goals": np.array([[r["ExpHomeGoals"], r["ExpAwayGoals"]] for r in rows], dtype=float).reshape(-1, 2),
+    }
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# models/h2h_model.py
+
+# Head-to-head index: one row per match keyed by (lower TeamID, higher TeamID),
+# so every meeting of two teams is a single primary-key range scan,
+# already ordered by date.
+
+from db.connection import get_read_connection
+from db.schema import ensure_tables
+
+def update_head_to_head(cursor):
+    """
+    Add the matches newer than the last indexed MatchID to HeadToHead.
+    Return the number of rows added.
+    """
+    ensure_tables(cursor, "HeadToHead")
+
+    cursor.execute("SELECT COALESCE(MAX(MatchID), 0) FROM HeadToHead")
+    last_match_id = cursor.fetchone()[0]
+
+    cursor.execute("""
+        INSERT IGNORE INTO HeadToHead (
+            TeamLowID, TeamHighID, MatchDate, MatchID, SeasonID, HomeTeamID, LowGoals, HighGoals
+        )
+        SELECT
+            LEAST(m.HomeTeamID, m.AwayTeamID),
+            GREATEST(m.HomeTeamID, m.AwayTeamID),
+            m.MatchDate,
+            m.MatchID,
+            m.SeasonID,
+            m.HomeTeamID,
+            CASE WHEN m.HomeTeamID < m.AwayTeamID THEN m.FTHG ELSE m.FTAG END,
+            CASE WHEN m.HomeTeamID < m.AwayTeamID THEN m.FTAG ELSE m.FTHG END
+        FROM Matches m
+        WHERE m.MatchID > %s AND m.FTR IN ('H', 'D', 'A')
+    """, (last_match_id,))
+    return cursor.rowcount
+
+def get_head_to_head(team_a, team_b):
+    """
+    Return every meeting of two teams, oldest first, with goals seen from
+    team_a (GoalsA) and team_b (GoalsB) and the result for team_a.
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        ensure_tables(cursor, "HeadToHead")
+        # Both team rows are constants (unique names), so the pair is a primary-key range
+        cursor.execute("""
+            SELECT
+                h.MatchDate,
+                s.SeasonName,
+                ht.TeamName AS HomeTeam,
+                CASE WHEN ta.TeamID = h.TeamLowID THEN h.LowGoals ELSE h.HighGoals END AS GoalsA,
+                CASE WHEN ta.TeamID = h.TeamLowID THEN h.HighGoals ELSE h.LowGoals END AS GoalsB
+            FROM Teams ta
+            JOIN Teams tb ON tb.TeamName = %s
+            JOIN HeadToHead h
+              ON h.TeamLowID = LEAST(ta.TeamID, tb.TeamID)
+             AND h.TeamHighID = GREATEST(ta.TeamID, tb.TeamID)
+            JOIN Seasons s ON s.SeasonID = h.SeasonID
+            JOIN Teams ht ON ht.TeamID = h.HomeTeamID
+            WHERE ta.TeamName = %s
+            ORDER BY h.MatchDate, h.MatchID
+        """, (team_b, team_a))
+        meetings = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    for row in meetings:
+        row["Result"] = "W" if row["GoalsA"] > row["GoalsB"] else "D" if row["GoalsA"] == row["GoalsB"] else "L"
+    return meetings
+
+def summarize_head_to_head(meetings):
+    """
+    Wins, draws, losses and goals of team A over a list of meetings.
+    """
+    return {
+        "Played": len(meetings),
+        "WinsA": sum(1 for m in meetings if m["Result"] == "W"),
+        "Draws": sum(1 for m in meetings if m["Result"] == "D"),
+        "WinsB": sum(1 for m in meetings if m["Result"] == "L"),
+        "GoalsA": sum(m["GoalsA"] for m in meetings),
+        "GoalsB": sum(m["GoalsB"] for m in meetings),
+    }
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# models/halftime_model.py
+
+# Half-time -> full-time result transitions and scoreline frequencies.
+# All matches of the selected seasons are read in one query and every
+# group (team, season or referee) is counted in a single bincount over
+# flattened (group, row, column) cells. Results are cached by filter key
+# and ETL batch.
+
+from db.connection import get_read_connection
+from db.query import in_filter, data_version
+import numpy as np
+
+GROUP_BY = ("team", "season", "referee")
+MAX_GOALS = 5   # scorelines above this are counted in the last row/column ("5+")
+
+# Result order: from a team's point of view (team) or the home side's (season, referee)
+TEAM_RESULTS = ["W", "D", "L"]
+MATCH_RESULTS = ["H", "D", "A"]
+
+# Computed matrices, keyed by (data version, group_by, seasons)
+_matrix_cache = {}
+
+def load_match_results(season_names=None):
+    """
+    Return every played match of the given seasons (None means all) with
+    team, season and referee names and half-time / full-time scores.
+    """
+    season_sql, season_params = in_filter("s.SeasonName", season_names)
+
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"""
+            SELECT s.SeasonName,
+                   ht.TeamName AS HomeTeam, at.TeamName AS AwayTeam,
+                   r.RefereeName,
+                   m.HTHG, m.HTAG, m.HTR, m.FTHG, m.FTAG, m.FTR
+            FROM Matches m
+            JOIN Seasons s ON s.SeasonID = m.SeasonID
+            JOIN Teams ht ON ht.TeamID = m.HomeTeamID
+            JOIN Teams at ON at.TeamID = m.AwayTeamID
+            LEFT JOIN Referees r ON r.RefereeID = m.RefereeID
+            WHERE m.FTR IN ('H', 'D', 'A') AND m.HTR IN ('H', 'D', 'A'){season_sql}
+        """, season_params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+def compute_result_matrices(matches, group_by):
+    """
+    Count HT->FT transitions (groups x 3 x 3, rows = half-time result) and
+    scorelines (groups x (MAX_GOALS+1) x (MAX_GOALS+1)) for every group.
+    For teams each match counts once for each side, seen from that side
+    (W/D/L, goals for x goals against); for seasons and referees the
+    results are H/D/A and scorelines home x away.
+    Return a dict with groups, labels, transitions and scorelines.
+    """
+    if group_by not in GROUP_BY:
+        raise RuntimeError(f"Unknown grouping '{group_by}'.")
+
+    code = {"H": 0, "D": 1, "A": 2}
+    ht = np.array([code[m["HTR"]] for m in matches], dtype=np.int64)
+    ft = np.array([code[m["FTR"]] for m in matches], dtype=np.int64)
+    home_goals = np.minimum(np.array([m["FTHG"] for m in matches], dtype=np.int64), MAX_GOALS)
+    away_goals = np.minimum(np.array([m["FTAG"] for m in matches], dtype=np.int64), MAX_GOALS)
+
+    if group_by == "team":
+        # Home side as is, away side mirrored (H<->A becomes W<->L, goals swapped)
+        names = [m["HomeTeam"] for m in matches] + [m["AwayTeam"] for m in matches]
+        ht = np.concatenate([ht, 2 - ht])
+        ft = np.concatenate([ft, 2 - ft])
+        home_goals, away_goals = np.concatenate([home_goals, away_goals]), np.concatenate([away_goals, home_goals])
+        labels = TEAM_RESULTS
+    else:
+        key = "SeasonName" if group_by == "season" else "RefereeName"
+        names = [m[key] or "Unknown" for m in matches]
+        labels = MATCH_RESULTS
+
+    groups, group = np.unique(np.array(names, dtype=str), return_inverse=True)
+    n_groups = len(groups)
+    size = MAX_GOALS + 1
+
+    transitions = np.bincount(group * 9 + ht * 3 + ft, minlength=n_groups * 9).reshape(n_groups, 3, 3)
+    scorelines = np.bincount(group * size * size + home_goals * size + away_goals,
+                             minlength=n_groups * size * size).reshape(n_groups, size, size)
+
+    return {
+        "groups": [str(g) for g in groups],
+        "labels": labels,
+        "transitions": transitions,
+        "scorelines": scorelines,
+    }
+
+def get_result_matrices(group_by, season_names=None):
+    """
+    Return compute_result_matrices for the given grouping and seasons
+    (None means all), cached until the data changes (an ETL run, clean or
+    restore).
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor()
+    try:
+        version = data_version(cursor)
+    finally:
+        cursor.close()
+        conn.close()
+
+    key = (version, group_by, tuple(season_names) if season_names else None)
+    if key not in _matrix_cache:
+        if any(k[0] != version for k in _matrix_cache):
+            _matrix_cache.clear()
+        _matrix_cache[key] = compute_result_matrices(load_match_results(season_names), group_by)
+    return _matrix_cache[key]
+
+def combine_groups(matrices, names):
+    """
+    Sum the transition and scoreline matrices of the named groups.
+    """
+    index = [i for i, g in enumerate(matrices["groups"]) if g in set(names)]
+    return matrices["transitions"][index].sum(axis=0), matrices["scorelines"][index].sum(axis=0)
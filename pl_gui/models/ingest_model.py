@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# models/ingest_model.py
+
+# Match CSV ingest: reads a football-data.co.uk season file, normalizes it
+# the way the notebooks did (column names, staging columns only, ISO dates)
+# and loads it into the staging table, tagged with the file's hash. Used by
+# the ETL panel and the command line (etl.py).
+
+from models.etl_model import load_csv_to_staging, get_staging_columns
+import pandas as pd
+import hashlib
+
+# Columns the ETL job reads from every row
+REQUIRED_COLUMNS = ["Date", "Time", "HomeTeam", "AwayTeam", "FTHG", "FTAG", "FTR"]
+
+def compute_file_hash(file_path):
+    with open(file_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def read_match_csv(file_path, file_hash=None):
+    """
+    Read a match CSV into a DataFrame ready for the staging table, with the
+    FileHash column set (computed if not given).
+    """
+    df = pd.read_csv(file_path, encoding='latin1')  # match notebook behavior
+
+    # Apply exact column renaming as in notebook
+    df.columns = (
+        df.columns
+        .str.replace('>2.5', '_2_5O', regex=False)
+        .str.replace('<2.5', '_2_5U', regex=False)
+        .str.replace('.', '_', regex=False)
+        .str.strip()
+        .str.lstrip('\ufeffï»¿')  # UTF-8 byte order mark (PL24-25.csv) read as latin1
+    )
+
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise RuntimeError(f"Not a match file, missing columns: {', '.join(missing)}")
+
+    # Drop columns not in DB table, just like notebooks did manually
+    valid_cols = get_staging_columns()
+    df = df[[col for col in df.columns if col in valid_cols]]
+
+    # Fix European-style date format to standard ISO
+    df['Date'] = pd.to_datetime(df['Date'], dayfirst=True)
+    df['Time'] = pd.to_datetime(df['Time'], format='%H:%M', errors='coerce').dt.time
+
+    # Use file hash to mark and avoid to stage and ETL the same file again
+    df["FileHash"] = file_hash or compute_file_hash(file_path)
+    return df
+
+def stage_csv_file(file_path):
+    """
+    Load a match CSV into the staging table. Return the file hash (to pass
+    to trigger_etl_job) and the number of rows staged.
+    """
+    file_hash = compute_file_hash(file_path)
+    df = read_match_csv(file_path, file_hash)
+    load_csv_to_staging(df)
+    return file_hash, len(df)
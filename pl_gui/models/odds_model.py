@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# models/odds_model.py
+
+from db.connection import get_read_connection
+from db.query import in_filter
+import numpy as np
+
+# Odds at or below this value are treated as missing/invalid
+MIN_VALID_ODDS = 1.01
+
+# Column order of the 1X2 odds arrays
+OUTCOMES_1X2 = ["H", "D", "A"]
+
+def _to_arrays(rows, odds_columns):
+    """
+    Turn the query rows into a dict of aligned NumPy arrays.
+    """
+    odds = np.array([[row[c] for c in odds_columns] for row in rows], dtype=float).reshape(-1, len(odds_columns))
+    return {
+        "MatchID": np.array([row["MatchID"] for row in rows], dtype=np.int64),
+        "MatchDate": np.array([row["MatchDate"] for row in rows], dtype=object),
+        "Season": np.array([row["SeasonName"] for row in rows], dtype=object),
+        "Bookmaker": np.array([row["BookmakerName"] for row in rows], dtype=object),
+        "FTR": np.array([row["FTR"] for row in rows], dtype=object),
+        "TotalGoals": np.array([row["TotalGoals"] for row in rows], dtype=np.int64),
+        "odds": odds,
+    }
+
+def get_odds_arrays(season_names=None, bookmaker_names=None):
+    """
+    Load full-time 1X2 odds and results for the given seasons and bookmakers
+    (None means all) in a single query. One array row per (match, bookmaker).
+    """
+    season_sql, season_params = in_filter("s.SeasonName", season_names)
+    book_sql, book_params = in_filter("b.BookmakerName", bookmaker_names)
+
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"""
+            SELECT
+                m.MatchID,
+                m.MatchDate,
+                s.SeasonName,
+                b.BookmakerName,
+                m.FTR,
+                (m.FTHG + m.FTAG) AS TotalGoals,
+                MAX(CASE WHEN bo.OutcomeCode = 'H' THEN bo.OddsValue END) AS HomeOdds,
+                MAX(CASE WHEN bo.OutcomeCode = 'D' THEN bo.OddsValue END) AS DrawOdds,
+                MAX(CASE WHEN bo.OutcomeCode = 'A' THEN bo.OddsValue END) AS AwayOdds
+            FROM BettingOdds bo
+            JOIN Matches m ON m.MatchID = bo.MatchID
+            JOIN Seasons s ON s.SeasonID = m.SeasonID
+            JOIN Bookmakers b ON b.BookmakerID = bo.BookmakerID
+            JOIN Markets mk ON mk.MarketID = bo.MarketID
+            WHERE mk.MarketType = '1X2'
+              AND mk.MarketSubtype = 'FullTime'
+              AND m.FTR IN ('H', 'D', 'A'){season_sql}{book_sql}
+            GROUP BY m.MatchID, m.MatchDate, s.SeasonName, b.BookmakerName, m.FTR, m.FTHG, m.FTAG
+            ORDER BY m.MatchDate, m.MatchID, b.BookmakerName
+        """, season_params + book_params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    data = _to_arrays(rows, ["HomeOdds", "DrawOdds", "AwayOdds"])
+    data["result"] = result_index(data["FTR"])
+    return data
+
+def get_over_under_arrays(season_names=None, bookmaker_names=None):
+    """
+    Load Over/Under 2.5 odds and total goals for the given seasons and
+    bookmakers (None means all) in a single query.
+    Column 0 of "odds" is Over, column 1 is Under.
+    """
+    season_sql, season_params = in_filter("s.SeasonName", season_names)
+    book_sql, book_params = in_filter("b.BookmakerName", bookmaker_names)
+
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"""
+            SELECT
+                m.MatchID,
+                m.MatchDate,
+                s.SeasonName,
+                b.BookmakerName,
+                m.FTR,
+                (m.FTHG + m.FTAG) AS TotalGoals,
+                MAX(CASE WHEN bo.OutcomeCode = 'Over' THEN bo.OddsValue END) AS OverOdds,
+                MAX(CASE WHEN bo.OutcomeCode = 'Under' THEN bo.OddsValue END) AS UnderOdds
+            FROM BettingOdds bo
+            JOIN Matches m ON m.MatchID = bo.MatchID
+            JOIN Seasons s ON s.SeasonID = m.SeasonID
+            JOIN Bookmakers b ON b.BookmakerID = bo.BookmakerID
+            JOIN Markets mk ON mk.MarketID = bo.MarketID
+            WHERE mk.MarketType = 'OverUnder'
+              AND mk.MarketSubtype = 'FullTime'
+              AND mk.Parameter = '2.5'{season_sql}{book_sql}
+            GROUP BY m.MatchID, m.MatchDate, s.SeasonName, b.BookmakerName, m.FTR, m.FTHG, m.FTAG
+            ORDER BY m.MatchDate, m.MatchID, b.BookmakerName
+        """, season_params + book_params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    data = _to_arrays(rows, ["OverOdds", "UnderOdds"])
+    data["result"] = np.where(data["TotalGoals"] >= 3, 0, 1)
+    return data
+
+def result_index(ftr):
+    """
+    Map an array of 'H'/'D'/'A' results to column indexes 0/1/2 (-1 if unknown).
+    """
+    ftr = np.asarray(ftr, dtype=object)
+    index = np.full(ftr.shape, -1, dtype=np.int64)
+    for i, code in enumerate(OUTCOMES_1X2):
+        index[ftr == code] = i
+    return index
+
+def select_rows(data, mask):
+    """
+    Return a copy of an odds arrays dict keeping only the rows in mask.
+    """
+    return {key: values[mask] for key, values in data.items()}
+
+def valid_odds_mask(odds):
+    """
+    True for rows where every price is present and above MIN_VALID_ODDS.
+    """
+    odds = np.asarray(odds, dtype=float)
+    with np.errstate(invalid="ignore"):
+        return np.all(np.isfinite(odds) & (odds > MIN_VALID_ODDS), axis=1)
+
+def implied_probabilities(odds):
+    """
+    Normalize decimal odds (one market per row) into implied probabilities.
+    Return (probabilities, overround), where overround is the sum of the raw
+    inverse odds, so the bookmaker margin is overround - 1.
+    """
+    inverse = 1.0 / np.asarray(odds, dtype=float)
+    overround = inverse.sum(axis=1)
+    return inverse / overround[:, None], overround
+
+def bookmaker_margins(odds):
+    """
+    Bookmaker margin (overround) per row, in percent.
+    """
+    _, overround = implied_probabilities(odds)
+    return (overround - 1.0) * 100
+
+def one_hot(result, n_outcomes):
+    """
+    Turn outcome indexes into a 0/1 matrix with one column per outcome.
+    """
+    result = np.asarray(result, dtype=np.int64)
+    matrix = np.zeros((len(result), n_outcomes))
+    matrix[np.arange(len(result)), result] = 1.0
+    return matrix
+
+def outcome_rates(probs, result):
+    """
+    Average implied probability and actual frequency of each outcome, in percent.
+    """
+    n_outcomes = probs.shape[1]
+    if len(result) == 0:
+        return np.zeros(n_outcomes), np.zeros(n_outcomes)
+    implied = probs.mean(axis=0) * 100
+    actual = np.bincount(result, minlength=n_outcomes) / len(result) * 100
+    return implied, actual
+
+def calibration_bins(probs, outcomes, bins):
+    """
+    Bin predicted probabilities and compare them with observed outcomes.
+    probs and outcomes (0/1) are 1-D arrays; bins are the bin edges.
+    Return a dict with the bin centers, match counts, mean predicted
+    probability and observed rate per bin (0 for empty bins).
+    """
+    probs = np.asarray(probs, dtype=float)
+    outcomes = np.asarray(outcomes, dtype=float)
+    bins = np.asarray(bins, dtype=float)
+    n_bins = len(bins) - 1
+
+    index = np.digitize(probs, bins) - 1
+    inside = (index >= 0) & (index < n_bins)
+    index = index[inside]
+
+    counts = np.bincount(index, minlength=n_bins)
+    sum_probs = np.bincount(index, weights=probs[inside], minlength=n_bins)
+    sum_outcomes = np.bincount(index, weights=outcomes[inside], minlength=n_bins)
+
+    filled = counts > 0
+    mean_probs = np.divide(sum_probs, counts, out=np.zeros(n_bins), where=filled)
+    observed = np.divide(sum_outcomes, counts, out=np.zeros(n_bins), where=filled)
+
+    return {
+        "centers": (bins[:-1] + bins[1:]) / 2,
+        "counts": counts,
+        "mean_prob": mean_probs,
+        "observed": observed,
+    }
+
+def brier_score(probs, result):
+    """
+    Multi-outcome Brier score: mean over rows of the squared error summed over outcomes.
+    """
+    if len(result) == 0:
+        return float("nan")
+    return float(np.mean(np.sum((probs - one_hot(result, probs.shape[1])) ** 2, axis=1)))
+
+def log_loss(probs, result, eps=1e-15):
+    """
+    Mean negative log-likelihood of the observed outcomes.
+    """
+    if len(result) == 0:
+        return float("nan")
+    p = np.clip(probs[np.arange(len(result)), result], eps, 1.0)
+    return float(-np.mean(np.log(p)))
+
+def summarize_by_bookmaker(data):
+    """
+    Compute margin and scoring statistics for every bookmaker in one pass.
+    data is a dict returned by get_odds_arrays (any number of seasons/bookmakers).
+    Return a list of dicts sorted by average margin, highest first.
+    """
+    valid = valid_odds_mask(data["odds"]) & (data["result"] >= 0)
+    odds = data["odds"][valid]
+    result = data["result"][valid]
+    if len(result) == 0:
+        return []
+
+    names, group = np.unique(data["Bookmaker"][valid], return_inverse=True)
+    probs, overround = implied_probabilities(odds)
+    margins = (overround - 1.0) * 100
+
+    counts = np.bincount(group)
+    mean_margin = np.bincount(group, weights=margins) / counts
+    mean_sq_margin = np.bincount(group, weights=margins ** 2) / counts
+    std_margin = np.sqrt(np.maximum(mean_sq_margin - mean_margin ** 2, 0.0))
+
+    squared_error = np.sum((probs - one_hot(result, probs.shape[1])) ** 2, axis=1)
+    brier = np.bincount(group, weights=squared_error) / counts
+    nll = -np.log(np.clip(probs[np.arange(len(result)), result], 1e-15, 1.0))
+    logloss = np.bincount(group, weights=nll) / counts
+
+    summary = [
+        {
+            "BookmakerName": str(names[i]),
+            "Matches": int(counts[i]),
+            "AvgMargin": float(mean_margin[i]),
+            "StdMargin": float(std_margin[i]),
+            "Brier": float(brier[i]),
+            "LogLoss": float(logloss[i]),
+        }
+        for i in range(len(names))
+    ]
+    summary.sort(key=lambda row: row["AvgMargin"], reverse=True)
+    return summary
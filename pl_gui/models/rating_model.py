@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# models/rating_model.py
+
+# Elo team strength ratings over all seasons.
+# Every rated match stores the pre- and post-match rating of both teams,
+# so the rating history of a team is a plain indexed query.
+
+from db.connection import get_read_connection
+from db.query import in_filter
+from db.schema import ensure_tables
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 20.0
+HOME_ADVANTAGE = 60.0
+# Share of the distance from the initial rating removed at the start of each season
+SEASON_REGRESSION = 0.2
+
+def update_team_ratings(cursor):
+    """
+    Rate every match not yet in TeamRatings, in (MatchDate, MatchID) order.
+    Normally only matches newer than the last rated MatchID are processed;
+    if a new match is dated before already rated ones, the ratings are
+    replayed from that date so the history stays in date order.
+    Return the number of matches rated.
+    """
+    ensure_tables(cursor, "TeamRatings")
+
+    cursor.execute("SELECT COALESCE(MAX(MatchID), 0) FROM TeamRatings")
+    last_match_id = cursor.fetchone()[0]
+
+    cursor.execute("""
+        SELECT MIN(MatchDate)
+        FROM Matches
+        WHERE MatchID > %s AND FTR IN ('H', 'D', 'A')
+    """, (last_match_id,))
+    first_new_date = cursor.fetchone()[0]
+    if first_new_date is None:
+        return 0
+
+    # Ratings on or after the first new match date are replayed
+    cursor.execute("DELETE FROM TeamRatings WHERE MatchDate >= %s", (first_new_date,))
+
+    # Latest rating (and season) of every team before that date
+    cursor.execute("""
+        SELECT TeamID, PostRating, SeasonID
+        FROM (
+            SELECT TeamID, PostRating, SeasonID,
+                   ROW_NUMBER() OVER (PARTITION BY TeamID ORDER BY MatchDate DESC, MatchID DESC) AS rn
+            FROM TeamRatings
+        ) latest
+        WHERE rn = 1
+    """)
+    state = {team_id: (float(rating), season_id) for team_id, rating, season_id in cursor.fetchall()}
+
+    cursor.execute("""
+        SELECT MatchID, MatchDate, SeasonID, HomeTeamID, AwayTeamID, FTHG, FTAG
+        FROM Matches
+        WHERE MatchDate >= %s AND FTR IN ('H', 'D', 'A')
+        ORDER BY MatchDate, MatchID
+    """, (first_new_date,))
+    matches = cursor.fetchall()
+
+    rows = compute_ratings(matches, state)
+    cursor.executemany("""
+        INSERT INTO TeamRatings (
+            MatchID, TeamID, SeasonID, MatchDate, IsHome, PreRating, PostRating
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, rows)
+    return len(matches)
+
+def expected_score(rating, opponent_rating):
+    """
+    Expected score (win = 1, draw = 0.5) of a team against an opponent.
+    """
+    return 1.0 / (1.0 + 10 ** ((opponent_rating - rating) / 400.0))
+
+def goal_multiplier(goal_diff):
+    """
+    Scale the rating change with the margin of victory.
+    """
+    goal_diff = abs(goal_diff)
+    if goal_diff <= 1:
+        return 1.0
+    if goal_diff == 2:
+        return 1.5
+    return (11.0 + goal_diff) / 8.0
+
+def compute_ratings(matches, state=None):
+    """
+    Replay matches (MatchID, MatchDate, SeasonID, HomeTeamID, AwayTeamID, FTHG, FTAG),
+    ordered by date, starting from state {TeamID: (rating, SeasonID)}, which is
+    updated in place. Return two rows per match:
+    (MatchID, TeamID, SeasonID, MatchDate, IsHome, PreRating, PostRating).
+    """
+    state = {} if state is None else state
+    rows = []
+
+    def current_rating(team_id, season_id):
+        rating, last_season = state.get(team_id, (INITIAL_RATING, season_id))
+        if last_season != season_id:
+            rating -= SEASON_REGRESSION * (rating - INITIAL_RATING)
+        return rating
+
+    for match_id, match_date, season_id, home_id, away_id, fthg, ftag in matches:
+        home_pre = current_rating(home_id, season_id)
+        away_pre = current_rating(away_id, season_id)
+
+        expected_home = expected_score(home_pre + HOME_ADVANTAGE, away_pre)
+        actual_home = 1.0 if fthg > ftag else 0.5 if fthg == ftag else 0.0
+        change = K_FACTOR * goal_multiplier(fthg - ftag) * (actual_home - expected_home)
+
+        home_post = home_pre + change
+        away_post = away_pre - change
+        state[home_id] = (home_post, season_id)
+        state[away_id] = (away_post, season_id)
+
+        rows.append((match_id, home_id, season_id, match_date, 1, round(home_pre, 2), round(home_post, 2)))
+        rows.append((match_id, away_id, season_id, match_date, 0, round(away_pre, 2), round(away_post, 2)))
+    return rows
+
+def get_team_rating_history(team_name, season_names=None):
+    """
+    Return the rating of a team before and after each of its matches in the
+    given seasons (None means all), with the opponent and the score.
+    """
+    season_sql, season_params = in_filter("s.SeasonName", season_names)
+
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        ensure_tables(cursor, "TeamRatings")
+        cursor.execute(f"""
+            SELECT
+                s.SeasonName,
+                ROW_NUMBER() OVER (PARTITION BY tr.SeasonID ORDER BY tr.MatchDate, tr.MatchID) AS Matchday,
+                tr.MatchDate,
+                tr.MatchID,
+                tr.PreRating,
+                tr.PostRating,
+                CASE WHEN tr.IsHome = 1 THEN 'Home' ELSE 'Away' END AS HomeOrAway,
+                CASE WHEN tr.IsHome = 1 THEN at.TeamName ELSE ht.TeamName END AS Opponent,
+                CASE WHEN tr.IsHome = 1 THEN m.FTHG ELSE m.FTAG END AS GF,
+                CASE WHEN tr.IsHome = 1 THEN m.FTAG ELSE m.FTHG END AS GA
+            FROM TeamRatings tr
+            JOIN Teams t ON t.TeamID = tr.TeamID
+            JOIN Matches m ON m.MatchID = tr.MatchID
+            JOIN Teams ht ON ht.TeamID = m.HomeTeamID
+            JOIN Teams at ON at.TeamID = m.AwayTeamID
+            JOIN Seasons s ON s.SeasonID = tr.SeasonID
+            WHERE t.TeamName = %s{season_sql}
+            ORDER BY tr.MatchDate, tr.MatchID
+        """, (team_name,) + season_params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
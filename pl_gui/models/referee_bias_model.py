@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# models/referee_bias_model.py
+
+# Referee home/away bias.
+# Every match is compared with the league average of its season: for cards
+# and fouls the away-minus-home difference, for results the home win /
+# away win indicator. A referee's bias is the mean of these residuals over
+# their matches (positive means the home side did better than usual), so
+# one grouped pass gives every (referee, season) pair and every referee
+# over all seasons. Bootstrap confidence intervals resample matches within
+# each referee; batches of replicates run across a process pool.
+
+from db.connection import get_read_connection
+from db.query import data_version
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+
+ALL_SEASONS = "All Seasons"
+DEFAULT_BOOTSTRAP = 1000
+BOOTSTRAP_BATCH = 100
+CONFIDENCE = 0.95
+MIN_MATCHES = 10
+
+# Bias metrics: name -> (label, description of a positive value)
+BIAS_METRICS = {
+    "Yellow": ("Yellow Cards", "more yellow cards for the away side"),
+    "Red": ("Red Cards", "more red cards for the away side"),
+    "Fouls": ("Fouls", "more fouls given against the away side"),
+    "HomeWin": ("Home Wins", "more home wins"),
+    "AwayWin": ("Away Wins", "fewer away wins"),
+}
+
+# Computed results, keyed by data version and bootstrap settings
+_bias_cache = {}
+
+def load_referee_matches():
+    """
+    Return every match with a referee and statistics: referee, season,
+    result and home/away cards and fouls, in one query.
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT r.RefereeName, s.SeasonName, m.FTR,
+                   ms.HomeYellowCards, ms.AwayYellowCards,
+                   ms.HomeRedCards, ms.AwayRedCards,
+                   ms.HomeFouls, ms.AwayFouls
+            FROM Matches m
+            JOIN MatchStatistics ms ON ms.MatchID = m.MatchID
+            JOIN Referees r ON r.RefereeID = m.RefereeID
+            JOIN Seasons s ON s.SeasonID = m.SeasonID
+            WHERE m.FTR IN ('H', 'D', 'A')
+            ORDER BY s.StartDate, r.RefereeName, m.MatchDate
+        """)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+def _residuals(rows):
+    """
+    Per-match bias residuals (matches x BIAS_METRICS) against the league
+    average of the season, plus the raw values and the season baselines.
+    """
+    def column(name):
+        return np.array([row[name] or 0 for row in rows], dtype=float)
+
+    result = np.array([row["FTR"] for row in rows])
+    raw = {
+        "HomeYellow": column("HomeYellowCards"), "AwayYellow": column("AwayYellowCards"),
+        "HomeRed": column("HomeRedCards"), "AwayRed": column("AwayRedCards"),
+        "HomeFouls": column("HomeFouls"), "AwayFouls": column("AwayFouls"),
+        "HomeWin": (result == "H").astype(float),
+        "Draw": (result == "D").astype(float),
+        "AwayWin": (result == "A").astype(float),
+    }
+    values = np.stack([
+        raw["AwayYellow"] - raw["HomeYellow"],
+        raw["AwayRed"] - raw["HomeRed"],
+        raw["AwayFouls"] - raw["HomeFouls"],
+        raw["HomeWin"],
+        -raw["AwayWin"],
+    ], axis=1)
+
+    seasons, season_index = np.unique([row["SeasonName"] for row in rows], return_inverse=True)
+    counts = np.bincount(season_index)
+    league = np.stack([np.bincount(season_index, values[:, k]) / counts for k in range(values.shape[1])], axis=1)
+
+    baseline = {}
+    for i, season in enumerate(seasons):
+        in_season = season_index == i
+        baseline[season] = {name: float(raw[name][in_season].mean()) for name in raw}
+    baseline[ALL_SEASONS] = {name: float(raw[name].mean()) for name in raw}
+
+    return values - league[season_index], raw, baseline
+
+def _group_means(values, group, n_groups):
+    counts = np.bincount(group, minlength=n_groups)
+    sums = np.stack([np.bincount(group, values[:, k], n_groups) for k in range(values.shape[1])], axis=1)
+    return sums / np.maximum(counts, 1)[:, None]
+
+def _bootstrap_batch(args):
+    """
+    Bootstrap replicates of the group means: each replicate resamples the
+    matches of every group with replacement, all groups at once. Return a
+    (replicates, groups, metrics) array. Runs in a worker process.
+    """
+    seed, n_replicates, values, group, starts, sizes = args
+    rng = np.random.default_rng(seed)
+    n_groups, n_metrics = len(sizes), values.shape[1]
+
+    # Matches are sorted by group, so group g occupies [starts[g], starts[g] + sizes[g])
+    picks = starts[group] + (rng.random((n_replicates, len(group))) * sizes[group]).astype(np.int64)
+    cells = (np.arange(n_replicates)[:, None] * n_groups + group[None, :]).ravel()
+    means = np.empty((n_replicates, n_groups, n_metrics))
+    for k in range(n_metrics):
+        sums = np.bincount(cells, values[picks, k].ravel(), n_replicates * n_groups)
+        means[:, :, k] = sums.reshape(n_replicates, n_groups) / sizes[None, :]
+    return means
+
+def bootstrap_intervals(values, group, n_groups, n_boot=DEFAULT_BOOTSTRAP, seed=0, workers=None,
+                        batch_size=BOOTSTRAP_BATCH):
+    """
+    Percentile confidence intervals of the group means of values, as two
+    (groups, metrics) arrays (low, high). The same seed always gives the
+    same intervals, whatever the number of workers.
+    """
+    order = np.argsort(group, kind="stable")
+    values, group = values[order], group[order]
+    sizes = np.bincount(group, minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    batches = [batch_size] * (n_boot // batch_size)
+    if n_boot % batch_size:
+        batches.append(n_boot % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(batches))
+    jobs = [(s, size, values, group, starts, np.maximum(sizes, 1)) for s, size in zip(seeds, batches)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) == 1:
+        results = [_bootstrap_batch(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = list(pool.map(_bootstrap_batch, jobs))
+
+    replicates = np.concatenate(results)
+    tail = (1 - CONFIDENCE) / 2 * 100
+    low, high = np.percentile(replicates, [tail, 100 - tail], axis=0)
+    return low, high
+
+def compute_referee_bias(rows, n_boot=DEFAULT_BOOTSTRAP, seed=0, workers=None):
+    """
+    Compute the bias of every referee in every season and over all seasons
+    (SeasonName = ALL_SEASONS) from the rows of load_referee_matches.
+    Return a dict with "rows" (one dict per referee and season with the raw
+    home/away averages, result rates, and for each bias metric its value,
+    CI bounds and whether the CI excludes zero) and "baseline" (league
+    averages per season).
+    """
+    if not rows:
+        return {"rows": [], "baseline": {}}
+
+    residuals, raw, baseline = _residuals(rows)
+    referees = np.array([row["RefereeName"] for row in rows])
+    seasons = np.array([row["SeasonName"] for row in rows])
+
+    # Both levels in one grouped pass: every match counts for its season and for All Seasons
+    keys = np.concatenate([
+        np.char.add(np.char.add(referees, "\t"), seasons),
+        np.char.add(referees, "\t" + ALL_SEASONS),
+    ])
+    group_keys, group = np.unique(keys, return_inverse=True)
+    values = np.concatenate([residuals, residuals])
+    raw_values = np.stack([raw[name] for name in raw], axis=1)
+    raw_values = np.concatenate([raw_values, raw_values])
+    n_groups = len(group_keys)
+
+    counts = np.bincount(group, minlength=n_groups)
+    bias = _group_means(values, group, n_groups)
+    raw_means = _group_means(raw_values, group, n_groups)
+    low, high = bootstrap_intervals(values, group, n_groups, n_boot, seed, workers)
+
+    result = []
+    for g, key in enumerate(group_keys):
+        referee, season = str(key).split("\t")
+        row = {"RefereeName": referee, "SeasonName": season, "Matches": int(counts[g])}
+        for k, name in enumerate(raw):
+            row[name] = float(raw_means[g, k])
+        for k, name in enumerate(BIAS_METRICS):
+            row[f"{name}Bias"] = float(bias[g, k])
+            row[f"{name}Low"] = float(low[g, k])
+            row[f"{name}High"] = float(high[g, k])
+            row[f"{name}Significant"] = bool(low[g, k] > 0 or high[g, k] < 0)
+        result.append(row)
+
+    return {"rows": result, "baseline": baseline}
+
+def get_referee_bias(n_boot=DEFAULT_BOOTSTRAP, seed=0, workers=None):
+    """
+    Return compute_referee_bias over the whole database. The result is
+    cached in memory until the data changes (an ETL run, clean or restore).
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor()
+    try:
+        key = (data_version(cursor), n_boot, seed)
+    finally:
+        cursor.close()
+        conn.close()
+
+    if key not in _bias_cache:
+        _bias_cache.clear()
+        _bias_cache[key] = compute_referee_bias(load_referee_matches(), n_boot, seed, workers)
+    return _bias_cache[key]
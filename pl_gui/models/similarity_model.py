@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# models/similarity_model.py
+
+# "Similar matches" search on the 12 MatchStatistics features.
+# The raw feature vectors are kept in a local index file next to
+# connection.ini; the ETL only appends the matches newer than the last
+# indexed MatchID. Features are standardised (z-scores) so shots and red
+# cards weigh the same, and the k nearest matches are found with one
+# vectorised distance computation and a partial sort.
+
+from db.connection import get_connection, get_read_connection, get_db_config
+from db.config import config_path
+import os
+import time
+import numpy as np
+
+INDEX_FILE = "similar_matches.npz"
+DEFAULT_K = 10
+
+FEATURES = [
+    "HomeShots", "AwayShots",
+    "HomeShotsTarget", "AwayShotsTarget",
+    "HomeCorners", "AwayCorners",
+    "HomeFouls", "AwayFouls",
+    "HomeYellowCards", "AwayYellowCards",
+    "HomeRedCards", "AwayRedCards",
+]
+
+# Index loaded in memory, reloaded when the file changes
+_index_cache = {"mtime": None, "index": None}
+
+def index_path():
+    """
+    Return the path of the index file (the folder that holds connection.ini).
+    """
+    return os.path.join(os.path.dirname(config_path()), INDEX_FILE)
+
+def _database_key():
+    config = get_db_config()
+    return f"{config['host']}:{config['port']}/{config['database']}"
+
+def _read_index(path):
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+def _write_index(path, match_ids, features, database):
+    """
+    Write the index with its standardisation parameters. The file is
+    replaced atomically, so readers never see a partial index.
+    """
+    mean = features.mean(axis=0) if len(features) else np.zeros(len(FEATURES))
+    std = features.std(axis=0) if len(features) else np.ones(len(FEATURES))
+    std[std == 0] = 1.0
+
+    temp_path = path + ".tmp.npz"
+    np.savez(temp_path, match_ids=match_ids, features=features,
+             mean=mean, std=std, database=np.array(database))
+    os.replace(temp_path, path)
+
+def update_similarity_index(cursor):
+    """
+    Append the matches newer than the last indexed MatchID to the index
+    file. The index is rebuilt from scratch when it belongs to another
+    database or no longer matches MatchStatistics (e.g. after a clean).
+    Return the number of matches added.
+    """
+    path = index_path()
+    database = _database_key()
+    index = _read_index(path)
+    rebuild = index is None or str(index["database"]) != database
+
+    if not rebuild:
+        match_ids, features = index["match_ids"], index["features"]
+        last_match_id = int(match_ids[-1]) if len(match_ids) else 0
+        cursor.execute("SELECT COUNT(*) FROM MatchStatistics WHERE MatchID <= %s", (last_match_id,))
+        rebuild = cursor.fetchone()[0] != len(match_ids)
+
+    if rebuild:
+        match_ids = np.zeros(0, dtype=np.int64)
+        features = np.zeros((0, len(FEATURES)), dtype=np.float32)
+        last_match_id = 0
+
+    cursor.execute(f"""
+        SELECT MatchID, {", ".join(FEATURES)}
+        FROM MatchStatistics
+        WHERE MatchID > %s
+        ORDER BY MatchID
+    """, (last_match_id,))
+    rows = cursor.fetchall()
+
+    if rows or rebuild:
+        new = np.array([[0 if v is None else v for v in row] for row in rows], dtype=np.float64)
+        new = new.reshape(-1, len(FEATURES) + 1)
+        match_ids = np.concatenate([match_ids, new[:, 0].astype(np.int64)])
+        features = np.concatenate([features, new[:, 1:].astype(np.float32)])
+        _write_index(path, match_ids, features, database)
+
+    return len(rows)
+
+def delete_similarity_index():
+    """
+    Remove the index file (used when all tables are cleaned).
+    """
+    path = index_path()
+    if os.path.exists(path):
+        os.remove(path)
+    _index_cache["mtime"] = None
+    _index_cache["index"] = None
+
+def _index_matches(cursor, match_ids):
+    """
+    True if match_ids still cover MatchStatistics (same count and last
+    MatchID).
+    """
+    cursor.execute("SELECT COUNT(*), MAX(MatchID) FROM MatchStatistics")
+    count, last_match_id = cursor.fetchone()
+    indexed_last = int(match_ids[-1]) if len(match_ids) else 0
+    return count == len(match_ids) and (last_match_id or 0) == indexed_last
+
+def _cached_index(path):
+    """
+    The index file in memory (standardised), reloaded when it changes.
+    """
+    if not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    if _index_cache["mtime"] != mtime:
+        index = _read_index(path)
+        scaled = (index["features"] - index["mean"]) / index["std"]
+        _index_cache["index"] = {"match_ids": index["match_ids"], "scaled": scaled.astype(np.float32),
+                                 "database": str(index["database"])}
+        _index_cache["mtime"] = mtime
+    return _index_cache["index"]
+
+def load_similarity_index():
+    """
+    Return the index (match_ids, standardised features), building or
+    updating it first if it is missing or no longer matches MatchStatistics
+    (matches loaded by another client, a restored snapshot).
+    """
+    path = index_path()
+    index = _cached_index(path)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        if index is None or index["database"] != _database_key() or not _index_matches(cursor, index["match_ids"]):
+            update_similarity_index(cursor)
+            index = _cached_index(path)
+    finally:
+        cursor.close()
+        conn.close()
+    return index
+
+def nearest_matches(scaled, position, k):
+    """
+    Return the positions and Euclidean distances of the k rows of scaled
+    nearest to row position (the row itself excluded), nearest first.
+    """
+    distances = np.sqrt(((scaled - scaled[position]) ** 2).sum(axis=1))
+    distances[position] = np.inf
+    k = min(k, len(distances) - 1)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    nearest = np.argpartition(distances, k - 1)[:k]
+    nearest = nearest[np.argsort(distances[nearest])]
+    return nearest, distances[nearest]
+
+def find_similar_matches(match_id, k=DEFAULT_K):
+    """
+    Return the k matches whose statistics are nearest to those of match_id.
+    The result has the match itself ("match"), the similar matches with
+    their Distance ("similar", nearest first) and the search time in
+    milliseconds ("elapsed_ms").
+    """
+    index = load_similarity_index()
+
+    start = time.perf_counter()
+    match_ids = index["match_ids"]
+    position = np.searchsorted(match_ids, match_id)
+    if position >= len(match_ids) or match_ids[position] != match_id:
+        raise RuntimeError(f"Match {match_id} has no statistics in the similarity index.")
+    nearest, distances = nearest_matches(index["scaled"], position, k)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    ids = [int(match_id)] + [int(i) for i in match_ids[nearest]]
+    placeholders = ", ".join(["%s"] * len(ids))
+
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"""
+            SELECT m.MatchID, m.MatchDate, s.SeasonName,
+                   ht.TeamName AS HomeTeam, at.TeamName AS AwayTeam,
+                   m.FTHG, m.FTAG, r.RefereeName,
+                   {", ".join("ms." + name for name in FEATURES)}
+            FROM Matches m
+            JOIN Seasons s ON s.SeasonID = m.SeasonID
+            JOIN Teams ht ON ht.TeamID = m.HomeTeamID
+            JOIN Teams at ON at.TeamID = m.AwayTeamID
+            LEFT JOIN Referees r ON r.RefereeID = m.RefereeID
+            JOIN MatchStatistics ms ON ms.MatchID = m.MatchID
+            WHERE m.MatchID IN ({placeholders})
+        """, tuple(ids))
+        rows = {row["MatchID"]: row for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+        conn.close()
+
+    similar = []
+    for similar_id, distance in zip(ids[1:], distances):
+        if similar_id in rows:
+            row = rows[similar_id]
+            row["Distance"] = float(distance)
+            similar.append(row)
+
+    return {"match": rows.get(int(match_id)), "similar": similar, "elapsed_ms": elapsed_ms}
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# models/simulation_model.py
+
+# Monte Carlo simulation of the rest of a season.
+# Matches played up to the cut-off date are taken as they are; the outcome
+# of every remaining fixture is drawn from the bookmakers' margin-free
+# implied probabilities. Runs are split in batches that are simulated with
+# array operations across a process pool, each with its own RNG stream.
+
+from db.connection import get_read_connection
+from models.odds_model import get_odds_arrays, valid_odds_mask, implied_probabilities
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+
+DEFAULT_RUNS = 100000
+BATCH_SIZE = 10000
+TOP_PLACES = 4
+RELEGATION_PLACES = 3
+
+def get_season_fixtures(season_name):
+    """
+    Return every match of a season, ordered by date, with team IDs and names.
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT m.MatchID, m.MatchDate, m.HomeTeamID, m.AwayTeamID,
+                   ht.TeamName AS HomeTeam, at.TeamName AS AwayTeam,
+                   m.FTHG, m.FTAG, m.FTR
+            FROM Matches m
+            JOIN Seasons s ON s.SeasonID = m.SeasonID
+            JOIN Teams ht ON ht.TeamID = m.HomeTeamID
+            JOIN Teams at ON at.TeamID = m.AwayTeamID
+            WHERE s.SeasonName = %s
+            ORDER BY m.MatchDate, m.MatchID
+        """, (season_name,))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+def match_probabilities(season_name, match_ids, fallback):
+    """
+    Average margin-free H/D/A probabilities over all bookmakers for each
+    match in match_ids; matches without odds get the fallback probabilities.
+    """
+    probs = np.tile(np.asarray(fallback, dtype=float), (len(match_ids), 1))
+    if not len(match_ids):
+        return probs
+
+    data = get_odds_arrays([season_name])
+    valid = valid_odds_mask(data["odds"])
+    if not valid.any():
+        return probs
+
+    implied, _ = implied_probabilities(data["odds"][valid])
+    ids, group = np.unique(data["MatchID"][valid], return_inverse=True)
+    counts = np.bincount(group)
+    means = np.stack([np.bincount(group, weights=implied[:, k]) / counts for k in range(3)], axis=1)
+
+    position = np.searchsorted(ids, match_ids)
+    position = np.minimum(position, len(ids) - 1)
+    found = ids[position] == np.asarray(match_ids)
+    probs[found] = means[position[found]]
+    return probs
+
+def prepare_simulation(season_name, cutoff_date=None):
+    """
+    Split the season at cutoff_date (None means before the first match) and
+    return everything the simulation needs: team names, the table at the
+    cut-off (points, goal difference, goals for) and the remaining fixtures
+    as team indexes with their H/D/A probabilities.
+    """
+    fixtures = get_season_fixtures(season_name)
+    if not fixtures:
+        raise RuntimeError(f"No matches found for season '{season_name}'.")
+
+    team_ids = sorted({row["HomeTeamID"] for row in fixtures} | {row["AwayTeamID"] for row in fixtures})
+    index = {team_id: i for i, team_id in enumerate(team_ids)}
+    names = {}
+    for row in fixtures:
+        names[row["HomeTeamID"]] = row["HomeTeam"]
+        names[row["AwayTeamID"]] = row["AwayTeam"]
+
+    n_teams = len(team_ids)
+    points = np.zeros(n_teams, dtype=np.int64)
+    goal_diff = np.zeros(n_teams, dtype=np.int64)
+    goals_for = np.zeros(n_teams, dtype=np.int64)
+    results = {"H": 0, "D": 0, "A": 0}
+    remaining = []
+
+    for row in fixtures:
+        played = cutoff_date is not None and row["FTR"] in results and row["MatchDate"] <= cutoff_date
+        if not played:
+            remaining.append(row)
+            continue
+        h, a = index[row["HomeTeamID"]], index[row["AwayTeamID"]]
+        results[row["FTR"]] += 1
+        points[h] += 3 if row["FTR"] == "H" else 1 if row["FTR"] == "D" else 0
+        points[a] += 3 if row["FTR"] == "A" else 1 if row["FTR"] == "D" else 0
+        goal_diff[h] += row["FTHG"] - row["FTAG"]
+        goal_diff[a] += row["FTAG"] - row["FTHG"]
+        goals_for[h] += row["FTHG"]
+        goals_for[a] += row["FTAG"]
+
+    # Fixtures without odds use the results so far (or typical league rates)
+    played_total = sum(results.values())
+    if played_total >= 20:
+        fallback = [results[k] / played_total for k in ("H", "D", "A")]
+    else:
+        fallback = [0.46, 0.25, 0.29]
+
+    match_ids = np.array([row["MatchID"] for row in remaining], dtype=np.int64)
+    return {
+        "season": season_name,
+        "cutoff_date": cutoff_date,
+        "teams": [names[team_id] for team_id in team_ids],
+        "points": points,
+        "goal_diff": goal_diff,
+        "goals_for": goals_for,
+        "home": np.array([index[row["HomeTeamID"]] for row in remaining], dtype=np.int64),
+        "away": np.array([index[row["AwayTeamID"]] for row in remaining], dtype=np.int64),
+        "probs": match_probabilities(season_name, match_ids, fallback),
+    }
+
+def _simulate_batch(args):
+    """
+    Simulate n_runs seasons with one RNG stream and return the count of
+    finishing positions as a (teams, positions) matrix and the sum of final
+    points per team. Runs in a worker process.
+    """
+    seed, n_runs, base_points, tiebreak, home, away, probs = args
+    rng = np.random.default_rng(seed)
+    n_teams = len(base_points)
+
+    # Points won by each team in each fixture, for the three outcomes
+    home_points = np.zeros((len(home), n_teams), dtype=np.float32)
+    away_points = np.zeros((len(home), n_teams), dtype=np.float32)
+    home_points[np.arange(len(home)), home] = 1.0
+    away_points[np.arange(len(away)), away] = 1.0
+
+    draws = rng.random((n_runs, len(home)), dtype=np.float32)
+    home_win = draws < probs[:, 0]
+    draw = (~home_win) & (draws < probs[:, 0] + probs[:, 1])
+    away_win = ~(home_win | draw)
+
+    points = base_points[None, :].astype(np.float32)
+    if len(home):
+        points = points + (3 * home_win + draw).astype(np.float32) @ home_points
+        points = points + (3 * away_win + draw).astype(np.float32) @ away_points
+
+    # Ties on points: goal difference and goals at the cut-off, then random
+    score = points.astype(np.float64) * 1e6 + tiebreak[None, :] + rng.random((n_runs, n_teams))
+    order = np.argsort(-score, axis=1)
+    positions = np.empty_like(order)
+    positions[np.arange(n_runs)[:, None], order] = np.arange(n_teams)[None, :]
+
+    cells = np.arange(n_teams)[None, :] * n_teams + positions
+    counts = np.bincount(cells.ravel(), minlength=n_teams * n_teams).reshape(n_teams, n_teams)
+    return counts, points.sum(axis=0, dtype=np.float64)
+
+def simulate_season(setup, n_runs=DEFAULT_RUNS, seed=None, workers=None, batch_size=BATCH_SIZE):
+    """
+    Run n_runs simulations of the remaining fixtures in setup (see
+    prepare_simulation). The same seed always gives the same result,
+    whatever the number of workers. workers=None uses every CPU core and
+    workers=1 runs in this process.
+    Return a dict with the team names, the position probabilities
+    (teams x positions), expected points, and title / top-4 / relegation
+    probabilities, teams sorted by expected position.
+    """
+    if n_runs < 1:
+        raise RuntimeError("The number of simulations must be at least 1.")
+
+    n_teams = len(setup["teams"])
+    tiebreak = (setup["goal_diff"] * 1000 + setup["goals_for"]).astype(np.float64)
+    batches = [batch_size] * (n_runs // batch_size)
+    if n_runs % batch_size:
+        batches.append(n_runs % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(batches))
+    jobs = [
+        (s, size, setup["points"], tiebreak, setup["home"], setup["away"], setup["probs"].astype(np.float32))
+        for s, size in zip(seeds, batches)
+    ]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) == 1:
+        results = [_simulate_batch(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = list(pool.map(_simulate_batch, jobs))
+
+    counts = sum(r[0] for r in results)
+    total_points = sum(r[1] for r in results)
+
+    probs = counts / n_runs
+    expected_position = probs @ np.arange(1, n_teams + 1)
+    order = np.argsort(expected_position)
+
+    relegation_start = max(n_teams - RELEGATION_PLACES, 0)
+    return {
+        "teams": [setup["teams"][i] for i in order],
+        "position_probs": probs[order],
+        "current_points": setup["points"][order],
+        "expected_points": (total_points / n_runs)[order],
+        "expected_position": expected_position[order],
+        "title": probs[order, 0],
+        "top": probs[order, :TOP_PLACES].sum(axis=1),
+        "relegation": probs[order, relegation_start:].sum(axis=1),
+        "runs": n_runs,
+        "remaining_fixtures": len(setup["home"]),
+    }
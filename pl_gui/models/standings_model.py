@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# models/standings_model.py
+
+# Per-matchday league standings.
+# A matchday is a distinct match date within a season: Matchday 1 is the
+# table after the first date with matches, the last matchday is the final table.
+
+from db.connection import get_read_connection
+from db.query import in_filter
+from db.schema import ensure_tables
+import numpy as np
+
+def update_league_standings(cursor):
+    """
+    Append the standings for every matchday not yet in LeagueStandings.
+    Only seasons with matches newer than the last processed MatchID are
+    touched, and each of them is replayed from its last valid matchday.
+    Return the number of standing rows written.
+    """
+    ensure_tables(cursor, "LeagueStandings")
+
+    cursor.execute("SELECT COALESCE(MAX(LastMatchID), 0) FROM LeagueStandings")
+    last_match_id = cursor.fetchone()[0]
+
+    cursor.execute("""
+        SELECT SeasonID, MIN(MatchDate)
+        FROM Matches
+        WHERE MatchID > %s AND FTR IN ('H', 'D', 'A')
+        GROUP BY SeasonID
+        ORDER BY SeasonID
+    """, (last_match_id,))
+    seasons = cursor.fetchall()
+
+    written = 0
+    for season_id, first_new_date in seasons:
+        written += _update_season_standings(cursor, season_id, first_new_date)
+    return written
+
+def _update_season_standings(cursor, season_id, first_new_date):
+    # Snapshots on or after the first new match date are no longer valid
+    cursor.execute("""
+        DELETE FROM LeagueStandings
+        WHERE SeasonID = %s AND AsOfDate >= %s
+    """, (season_id, first_new_date))
+
+    # Start from the latest snapshot still valid, if any
+    cursor.execute("""
+        SELECT ls.TeamID, ls.Played, ls.Won, ls.Drawn, ls.Lost,
+               ls.GF, ls.GA, ls.Points, ls.LastMatchID, ls.Matchday, ls.AsOfDate
+        FROM LeagueStandings ls
+        WHERE ls.SeasonID = %s
+          AND ls.Matchday = (SELECT MAX(Matchday) FROM LeagueStandings WHERE SeasonID = %s)
+    """, (season_id, season_id))
+    base_rows = cursor.fetchall()
+
+    if base_rows:
+        base_matchday = base_rows[0][9]
+        base_date = base_rows[0][10]
+        base_last_id = max(row[8] for row in base_rows)
+        cursor.execute("""
+            SELECT MatchID, MatchDate, HomeTeamID, AwayTeamID, FTHG, FTAG, FTR
+            FROM Matches
+            WHERE SeasonID = %s AND MatchDate > %s AND FTR IN ('H', 'D', 'A')
+            ORDER BY MatchDate, MatchID
+        """, (season_id, base_date))
+    else:
+        base_matchday = 0
+        base_last_id = 0
+        cursor.execute("""
+            SELECT MatchID, MatchDate, HomeTeamID, AwayTeamID, FTHG, FTAG, FTR
+            FROM Matches
+            WHERE SeasonID = %s AND FTR IN ('H', 'D', 'A')
+            ORDER BY MatchDate, MatchID
+        """, (season_id,))
+    matches = cursor.fetchall()
+    if not matches:
+        return 0
+
+    rows = compute_standings(matches, base_rows, base_matchday, base_last_id)
+    for row in rows:
+        row.insert(0, season_id)
+
+    cursor.executemany("""
+        INSERT INTO LeagueStandings (
+            SeasonID, Matchday, AsOfDate, TeamID, Position,
+            Played, Won, Drawn, Lost, GF, GA, GD, Points, LastMatchID
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, rows)
+    return len(rows)
+
+def compute_standings(matches, base_rows=(), base_matchday=0, base_last_id=0):
+    """
+    Replay matches (MatchID, MatchDate, HomeTeamID, AwayTeamID, FTHG, FTAG, FTR),
+    ordered by date, on top of the base standings and return one row per team
+    per match date:
+    [Matchday, AsOfDate, TeamID, Position, Played, Won, Drawn, Lost, GF, GA, GD, Points, LastMatchID].
+    Ties are broken by goal difference, then goals scored, then TeamID.
+    """
+    match_ids = np.array([m[0] for m in matches], dtype=np.int64)
+    dates = [m[1] for m in matches]
+    home = np.array([m[2] for m in matches], dtype=np.int64)
+    away = np.array([m[3] for m in matches], dtype=np.int64)
+    fthg = np.array([m[4] for m in matches], dtype=np.int64)
+    ftag = np.array([m[5] for m in matches], dtype=np.int64)
+    ftr = np.array([m[6] for m in matches], dtype=object)
+
+    team_ids = np.unique(np.concatenate([home, away, np.array([r[0] for r in base_rows], dtype=np.int64)]))
+    home_idx = np.searchsorted(team_ids, home)
+    away_idx = np.searchsorted(team_ids, away)
+
+    unique_dates = sorted(set(dates))
+    date_pos = {d: i for i, d in enumerate(unique_dates)}
+    date_idx = np.array([date_pos[d] for d in dates], dtype=np.int64)
+    n_dates, n_teams = len(unique_dates), len(team_ids)
+
+    # Columns: Played, Won, Drawn, Lost, GF, GA, Points
+    delta = np.zeros((n_dates, n_teams, 7), dtype=np.int64)
+    home_win = (ftr == "H").astype(np.int64)
+    draw = (ftr == "D").astype(np.int64)
+    away_win = (ftr == "A").astype(np.int64)
+
+    home_stats = np.stack([np.ones_like(fthg), home_win, draw, away_win, fthg, ftag, 3 * home_win + draw], axis=1)
+    away_stats = np.stack([np.ones_like(ftag), away_win, draw, home_win, ftag, fthg, 3 * away_win + draw], axis=1)
+    np.add.at(delta, (date_idx, home_idx), home_stats)
+    np.add.at(delta, (date_idx, away_idx), away_stats)
+
+    base = np.zeros((n_teams, 7), dtype=np.int64)
+    for team_id, played, won, drawn, lost, gf, ga, points, *_ in base_rows:
+        base[np.searchsorted(team_ids, team_id)] = [played, won, drawn, lost, gf, ga, points]
+
+    totals = base[None, :, :] + np.cumsum(delta, axis=0)
+    gf, ga, points = totals[:, :, 4], totals[:, :, 5], totals[:, :, 6]
+    gd = gf - ga
+
+    # Rank every matchday at once: primary key is the date, then points, GD, GF
+    flat_date = np.repeat(np.arange(n_dates), n_teams)
+    flat_team = np.tile(np.arange(n_teams), n_dates)
+    order = np.lexsort((team_ids[flat_team], -gf.ravel(), -gd.ravel(), -points.ravel(), flat_date))
+    positions = np.empty(n_dates * n_teams, dtype=np.int64)
+    positions[order] = np.tile(np.arange(1, n_teams + 1), n_dates)
+    positions = positions.reshape(n_dates, n_teams)
+
+    last_ids = np.full(n_dates, base_last_id, dtype=np.int64)
+    np.maximum.at(last_ids, date_idx, match_ids)
+    last_ids = np.maximum.accumulate(last_ids)
+
+    rows = []
+    for d in range(n_dates):
+        for t in range(n_teams):
+            played, won, drawn, lost, goals_for, goals_against, pts = totals[d, t].tolist()
+            rows.append([
+                base_matchday + d + 1, unique_dates[d], int(team_ids[t]), int(positions[d, t]),
+                played, won, drawn, lost, goals_for, goals_against, int(gd[d, t]), pts,
+                int(last_ids[d])
+            ])
+    return rows
+
+def get_standings_matchdays(season_name):
+    """
+    Return the matchdays available for a season as (Matchday, AsOfDate) dicts.
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        ensure_tables(cursor, "LeagueStandings")
+        cursor.execute("""
+            SELECT DISTINCT ls.Matchday, ls.AsOfDate
+            FROM LeagueStandings ls
+            JOIN Seasons s ON s.SeasonID = ls.SeasonID
+            WHERE s.SeasonName = %s
+            ORDER BY ls.Matchday
+        """, (season_name,))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_league_table_as_of(season_name, as_of_date=None):
+    """
+    Return the league table of a season after the last matchday played
+    on or before as_of_date (None means the latest matchday).
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        ensure_tables(cursor, "LeagueStandings")
+        date_filter = ""
+        params = [season_name]
+        if as_of_date is not None:
+            date_filter = " AND AsOfDate <= %s"
+            params.append(as_of_date)
+
+        cursor.execute(f"""
+            SELECT s.SeasonName,
+                   ls.Matchday,
+                   ls.AsOfDate,
+                   ls.Position,
+                   t.TeamName,
+                   ls.Played,
+                   ls.Won,
+                   ls.Drawn,
+                   ls.Lost,
+                   ls.GF,
+                   ls.GA,
+                   ls.GD,
+                   ls.Points
+            FROM LeagueStandings ls
+            JOIN Seasons s ON s.SeasonID = ls.SeasonID
+            JOIN Teams t ON t.TeamID = ls.TeamID
+            WHERE s.SeasonName = %s
+              AND ls.Matchday = (
+                  SELECT MAX(Matchday) FROM LeagueStandings
+                  WHERE SeasonID = s.SeasonID{date_filter}
+              )
+            ORDER BY ls.Position
+        """, tuple(params))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_team_position_history(team_name, season_names=None):
+    """
+    Return the position, points and goal difference of a team after
+    every matchday of the given seasons (None means all), oldest first.
+    """
+    season_sql, season_params = in_filter("s.SeasonName", season_names)
+
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        ensure_tables(cursor, "LeagueStandings")
+        cursor.execute(f"""
+            SELECT s.SeasonName, ls.Matchday, ls.AsOfDate, ls.Position, ls.Played, ls.Points, ls.GD
+            FROM LeagueStandings ls
+            JOIN Seasons s ON s.SeasonID = ls.SeasonID
+            JOIN Teams t ON t.TeamID = ls.TeamID
+            WHERE t.TeamName = %s{season_sql}
+            ORDER BY s.StartDate, ls.Matchday
+        """, (team_name,) + season_params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# models/star_schema_model.py
+
+# Analytical star schema (dim_Time, fact_MatchResult, fact_TeamMatchStats,
+# fact_LeagueSnapshot), refreshed at the end of every ETL job. The facts
+# only receive the matches above their MatchID high-water mark, tagged with
+# the ETL job's LogID as ETLBatchID, and a league snapshot is added for each
+# season that batch touched.
+
+from db.schema import ensure_tables
+
+STAR_TABLES = ("dim_Time", "fact_MatchResult", "fact_TeamMatchStats", "fact_LeagueSnapshot")
+
+# Results shown in the snapshot Form column (most recent last)
+FORM_MATCHES = 5
+
+def update_time_dimension(cursor):
+    """
+    Add to dim_Time the dates of the matches not yet in fact_MatchResult
+    that it doesn't have. Return the number of dates added.
+    """
+    ensure_tables(cursor, *STAR_TABLES)
+
+    cursor.execute("""
+        SELECT DISTINCT m.MatchDate, s.SeasonName
+        FROM Matches m
+        JOIN Seasons s ON s.SeasonID = m.SeasonID
+        WHERE m.MatchID > (SELECT COALESCE(MAX(MatchID), 0) FROM fact_MatchResult)
+          AND NOT EXISTS (SELECT 1 FROM dim_Time dt WHERE dt.Date = m.MatchDate)
+        ORDER BY m.MatchDate
+    """)
+    dates = {}
+    for match_date, season_name in cursor.fetchall():
+        dates.setdefault(match_date, season_name)
+
+    # Same values as MySQL's DAYOFWEEK, WEEK (mode 0) and QUARTER
+    rows = []
+    for d, season_name in dates.items():
+        day_of_week = d.isoweekday() % 7 + 1
+        rows.append((
+            d, day_of_week, d.strftime("%A"), d.day, d.timetuple().tm_yday,
+            int(d.strftime("%U")), d.month, d.strftime("%B"), (d.month - 1) // 3 + 1,
+            d.year, season_name, day_of_week in (1, 7)
+        ))
+
+    cursor.executemany("""
+        INSERT INTO dim_Time (
+            `Date`, `DayOfWeek`, `DayName`, `DayOfMonth`, `DayOfYear`, `WeekOfYear`,
+            `Month`, `MonthName`, `Quarter`, `Year`, `Season`, `IsWeekend`
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, rows)
+    return len(rows)
+
+def update_match_results(cursor, batch_id):
+    """
+    Add the matches above the fact_MatchResult high-water mark. Return the
+    number of rows added.
+    """
+    ensure_tables(cursor, *STAR_TABLES)
+
+    cursor.execute("""
+        INSERT INTO fact_MatchResult (
+            MatchID, TimeID, HomeTeamID, AwayTeamID, RefereeID,
+            SeasonID, DivisionID, HomeGoals, AwayGoals, Result,
+            HalfTimeHomeGoals, HalfTimeAwayGoals, HalfTimeResult, ETLBatchID
+        )
+        SELECT
+            m.MatchID,
+            (SELECT MIN(dt.TimeID) FROM dim_Time dt WHERE dt.Date = m.MatchDate),
+            m.HomeTeamID, m.AwayTeamID, m.RefereeID,
+            m.SeasonID, m.DivisionID, m.FTHG, m.FTAG, m.FTR,
+            m.HTHG, m.HTAG, m.HTR, %s
+        FROM Matches m
+        WHERE m.MatchID > (SELECT COALESCE(MAX(MatchID), 0) FROM fact_MatchResult)
+          AND m.FTR IN ('H', 'D', 'A')
+        ORDER BY m.MatchID
+    """, (batch_id,))
+    return cursor.rowcount
+
+def update_team_match_stats(cursor, batch_id):
+    """
+    Add a home and an away row for each match above the fact_TeamMatchStats
+    high-water mark (statistics are NULL when the match has none). Return
+    the number of rows added.
+    """
+    ensure_tables(cursor, *STAR_TABLES)
+
+    cursor.execute("SELECT COALESCE(MAX(MatchID), 0) FROM fact_TeamMatchStats")
+    last_match_id = cursor.fetchone()[0]
+
+    added = 0
+    for side, team, opponent, goals, conceded, win in (
+        ("Home", "HomeTeamID", "AwayTeamID", "FTHG", "FTAG", "H"),
+        ("Away", "AwayTeamID", "HomeTeamID", "FTAG", "FTHG", "A"),
+    ):
+        cursor.execute(f"""
+            INSERT INTO fact_TeamMatchStats (
+                MatchID, TeamID, TimeID, SeasonID,
+                IsHomeTeam, OpponentID, Goals, GoalsConceded,
+                Shots, ShotsOnTarget, Corners, Fouls,
+                YellowCards, RedCards, Result, Points, ETLBatchID
+            )
+            SELECT
+                m.MatchID, m.{team},
+                (SELECT MIN(dt.TimeID) FROM dim_Time dt WHERE dt.Date = m.MatchDate),
+                m.SeasonID, {side == "Home"}, m.{opponent}, m.{goals}, m.{conceded},
+                ms.{side}Shots, ms.{side}ShotsTarget, ms.{side}Corners, ms.{side}Fouls,
+                ms.{side}YellowCards, ms.{side}RedCards,
+                CASE WHEN m.FTR = '{win}' THEN 'W' WHEN m.FTR = 'D' THEN 'D' ELSE 'L' END,
+                CASE WHEN m.FTR = '{win}' THEN 3 WHEN m.FTR = 'D' THEN 1 ELSE 0 END,
+                %s
+            FROM Matches m
+            LEFT JOIN MatchStatistics ms ON ms.MatchID = m.MatchID
+            WHERE m.MatchID > %s AND m.FTR IN ('H', 'D', 'A')
+            ORDER BY m.MatchID
+        """, (batch_id, last_match_id))
+        added += cursor.rowcount
+    return added
+
+def update_league_snapshots(cursor, batch_id):
+    """
+    Add a league snapshot (the latest LeagueStandings table, with each
+    team's form) for every season with matches in this batch, unless one
+    already covers the season's last match. Return the number of rows added.
+    """
+    ensure_tables(cursor, *STAR_TABLES, "LeagueStandings")
+
+    cursor.execute("""
+        SELECT SeasonID, MIN(DivisionID)
+        FROM fact_MatchResult
+        WHERE ETLBatchID = %s
+        GROUP BY SeasonID
+        ORDER BY SeasonID
+    """, (batch_id,))
+    seasons = cursor.fetchall()
+
+    added = 0
+    for season_id, division_id in seasons:
+        cursor.execute("SELECT MAX(MatchID) FROM Matches WHERE SeasonID = %s", (season_id,))
+        last_match_id = cursor.fetchone()[0]
+        cursor.execute("""
+            SELECT COUNT(*) FROM fact_LeagueSnapshot
+            WHERE SeasonID = %s AND LastMatchID = %s
+        """, (season_id, last_match_id))
+        if cursor.fetchone()[0]:
+            continue
+
+        cursor.execute("""
+            SELECT ls.TeamID, ls.Position, ls.Played, ls.Won, ls.Drawn, ls.Lost,
+                   ls.GF, ls.GA, ls.Points, ls.AsOfDate
+            FROM LeagueStandings ls
+            WHERE ls.SeasonID = %s
+              AND ls.Matchday = (SELECT MAX(Matchday) FROM LeagueStandings WHERE SeasonID = %s)
+            ORDER BY ls.Position
+        """, (season_id, season_id))
+        table = cursor.fetchall()
+        if not table:
+            continue
+
+        cursor.execute("SELECT MIN(TimeID) FROM dim_Time WHERE Date = %s", (table[0][9],))
+        time_id = cursor.fetchone()[0]
+
+        # Latest results first; each team keeps its first FORM_MATCHES
+        cursor.execute("""
+            SELECT tms.TeamID, tms.Result
+            FROM fact_TeamMatchStats tms
+            JOIN dim_Time dt ON dt.TimeID = tms.TimeID
+            WHERE tms.SeasonID = %s
+            ORDER BY dt.Date DESC, tms.MatchID DESC
+        """, (season_id,))
+        form = {}
+        for team_id, result in cursor.fetchall():
+            results = form.setdefault(team_id, [])
+            if len(results) < FORM_MATCHES:
+                results.append(result)
+
+        rows = [(season_id, division_id, time_id, team_id, position, played, won, drawn, lost, gf, ga, points,
+                 "".join(reversed(form.get(team_id, []))), last_match_id, batch_id)
+                for team_id, position, played, won, drawn, lost, gf, ga, points, _ in table]
+        cursor.executemany("""
+            INSERT INTO fact_LeagueSnapshot (
+                SeasonID, DivisionID, TimeID, TeamID, Position,
+                MatchesPlayed, Won, Drawn, Lost, GoalsFor, GoalsAgainst,
+                Points, Form, LastMatchID, ETLBatchID
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, rows)
+        added += len(rows)
+    return added
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# report.py
+
+# Headless report generator: renders the Team Trend, Odds Analysis and Team
+# Insights charts for every selected season, team and bookmaker with the
+# Agg backend (no display needed), in a process pool, and writes an
+# index.html linking them all.
+#
+#   python report.py --output report                       everything, PNG
+#   python report.py --seasons 22-23 --teams Arsenal --charts team --formats png,svg
+#
+# Each job draws all the charts of one season and team (or bookmaker, or
+# the whole league), so the data is queried once per job.
+
+import argparse
+import html
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+KINDS = ("team", "odds", "league")
+FORMATS = ("png", "pdf", "svg")
+
+# Charts of Team Insights drawn with every team of the season selected
+LEAGUE_SORT = "Points"
+
+def _safe_name(text):
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in str(text))
+
+def _render_team(job, chart, figure):
+    from charts.common import ChartError
+    from charts.team_trend import TEAM_TREND_MODES, EXPORT_NAMES, load_team_trend, draw_team_trend
+
+    season, team = job["season"], job["subject"]
+    for mode in TEAM_TREND_MODES:
+        name = f"TeamTrend_{EXPORT_NAMES[mode]}_{_safe_name(team)}_{_safe_name(season)}"
+        try:
+            trend = load_team_trend(mode, team, [season], job["window"])
+            draw_team_trend(chart, mode, team, trend, season, False, False)
+            yield mode, name, None
+        except ChartError as e:
+            yield mode, name, str(e)
+
+def _render_odds(job, chart, figure):
+    from charts.common import ChartError
+    from charts.odds import ODDS_CHARTS, SEASON_CHARTS, EXPORT_NAMES, load_odds_chart, draw_odds_chart
+
+    season, bookmaker = job["season"], job["subject"]
+    charts = [c for c in ODDS_CHARTS if (c in SEASON_CHARTS) == (bookmaker is None)]
+    loaded = {}
+    for chart_mode in charts:
+        targets = ("Over", "Under") if chart_mode.startswith("Over / Under") else (None,)
+        for target in targets:
+            who = _safe_name(bookmaker) if bookmaker else "All"
+            title = f"{chart_mode} ({target})" if target else chart_mode
+            name = f"OddsData_{EXPORT_NAMES[chart_mode]}{'_' + target if target else ''}_{who}_{_safe_name(season)}"
+            try:
+                if chart_mode not in loaded:
+                    loaded[chart_mode] = load_odds_chart(chart_mode, season, bookmaker)
+                draw_odds_chart(chart, chart_mode, season, bookmaker, loaded[chart_mode], target or "Over")
+                yield title, name, None
+            except ChartError as e:
+                yield title, name, str(e)
+
+def _render_league(job, chart, figure):
+    from charts.common import ChartError
+    from charts.league import LEAGUE_CHARTS, MATRIX_CHART, draw_league_chart, draw_result_matrices
+    from models.etl_model import get_league_table_data
+    from models.halftime_model import get_result_matrices
+
+    season = job["season"]
+    data = get_league_table_data(season)
+    teams = [row["Team"] for row in data]
+    for chart_type in LEAGUE_CHARTS:
+        name = f"TeamInsights_{_safe_name(chart_type.replace(' / ', '-'))}_{_safe_name(season)}"
+        try:
+            if not data:
+                raise ChartError("No Data", "No league table for this season.")
+            if chart_type == MATRIX_CHART:
+                draw_result_matrices(chart, season, get_result_matrices("team", [season]), teams)
+            else:
+                draw_league_chart(chart, chart_type, data, LEAGUE_SORT, teams)
+            yield chart_type, name, None
+        except ChartError as e:
+            yield chart_type, name, str(e)
+
+RENDERERS = {"team": _render_team, "odds": _render_odds, "league": _render_league}
+
+def render_job(job):
+    """
+    Draw and save every chart of one job (a season and a team, a bookmaker
+    or the whole league). Runs in a worker process. Return the job with,
+    per chart, its title, the saved files and the error if it was skipped.
+    """
+    from charts.common import ChartArtists, new_figure
+
+    figure, canvas = new_figure()
+    chart = ChartArtists(figure, canvas)
+    folder = os.path.join(job["output"], _safe_name(job["season"]), job["kind"])
+    os.makedirs(folder, exist_ok=True)
+
+    results = []
+    for title, name, error in RENDERERS[job["kind"]](job, chart, figure):
+        files = []
+        if error is None:
+            for fmt in job["formats"]:
+                path = os.path.join(folder, f"{name}.{fmt}")
+                figure.savefig(path)
+                files.append(os.path.relpath(path, job["output"]))
+        results.append({"title": title, "files": files, "error": error})
+    return {**job, "charts": results}
+
+def build_jobs(kinds, seasons, teams, bookmakers, formats, output, window):
+    """
+    One job per season and team / bookmaker (plus one per season for the
+    all-bookmaker and league charts). Teams are limited to the ones that
+    played in the season.
+    """
+    from models.etl_model import get_league_table_data
+
+    jobs = []
+    for season in seasons:
+        base = {"season": season, "formats": formats, "output": output, "window": window}
+        if "league" in kinds:
+            jobs.append({**base, "kind": "league", "subject": None})
+        if "team" in kinds:
+            season_teams = {row["Team"] for row in get_league_table_data(season)}
+            for team in teams:
+                if team in season_teams:
+                    jobs.append({**base, "kind": "team", "subject": team})
+        if "odds" in kinds:
+            jobs.append({**base, "kind": "odds", "subject": None})
+            for bookmaker in bookmakers:
+                jobs.append({**base, "kind": "odds", "subject": bookmaker})
+    return jobs
+
+def write_index(output, results, elapsed):
+    """
+    Write output/index.html: the charts by season and kind, with a preview
+    (PNG or SVG) linking each saved format, and the skipped charts.
+    """
+    titles = {"league": "Team Insights", "team": "Team Trend", "odds": "Odds Analysis"}
+    count = sum(len(c["files"]) > 0 for r in results for c in r["charts"])
+    lines = [
+        "<!DOCTYPE html>",
+        "<html><head><meta charset='utf-8'><title>Premier League Report</title>",
+        "<style>body{font-family:sans-serif;margin:20px} figure{display:inline-block;margin:8px;"
+        "vertical-align:top;width:360px} img{width:360px;border:1px solid #ccc} figcaption{font-size:12px}"
+        " .skipped{color:#888;font-size:12px}</style></head><body>",
+        "<h1>Premier League Report</h1>",
+        f"<p>{count} charts, generated {time.strftime('%Y-%m-%d %H:%M')} in {elapsed:.1f} s.</p>",
+    ]
+
+    for season in dict.fromkeys(r["season"] for r in results):
+        lines.append(f"<h2>{html.escape(season)}</h2>")
+        for kind in KINDS:
+            jobs = [r for r in results if r["season"] == season and r["kind"] == kind]
+            if not jobs:
+                continue
+            lines.append(f"<h3>{titles[kind]}</h3>")
+            for job in jobs:
+                if job["subject"]:
+                    lines.append(f"<h4>{html.escape(job['subject'])}</h4>")
+                skipped = []
+                for chart in job["charts"]:
+                    if not chart["files"]:
+                        skipped.append(f"{chart['title']}: {chart['error']}")
+                        continue
+                    preview = next((f for f in chart["files"] if f.endswith((".png", ".svg"))), None)
+                    links = " ".join(f"<a href='{html.escape(f)}'>{f.rsplit('.', 1)[1].upper()}</a>"
+                                     for f in chart["files"])
+                    image = f"<a href='{html.escape(preview)}'><img src='{html.escape(preview)}'></a>" if preview else ""
+                    lines.append(f"<figure>{image}<figcaption>{html.escape(chart['title'])} {links}"
+                                 "</figcaption></figure>")
+                if skipped:
+                    lines.append("<p class='skipped'>Skipped: " + "; ".join(html.escape(s) for s in skipped) + "</p>")
+
+    lines.append("</body></html>")
+    path = os.path.join(output, "index.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+    return path
+
+def _split(value):
+    return [item.strip() for item in value.split(",") if item.strip()] if value else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the Premier League charts to files, without a display.")
+    parser.add_argument("--output", default="report", help="output folder (default: report)")
+    parser.add_argument("--charts", default=",".join(KINDS), help="comma-separated: team, odds, league")
+    parser.add_argument("--seasons", help="comma-separated season names (default: all)")
+    parser.add_argument("--teams", help="comma-separated team names (default: all)")
+    parser.add_argument("--bookmakers", help="comma-separated bookmaker names (default: all)")
+    parser.add_argument("--formats", default="png", help="comma-separated: png, pdf, svg (default: png)")
+    parser.add_argument("--window", type=int, default=3, help="rolling window of the team form (default: 3)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    import matplotlib
+    matplotlib.use("Agg")
+
+    from models.etl_model import get_all_seasons, get_all_teams, get_all_bookmakers
+
+    kinds = _split(args.charts)
+    formats = _split(args.formats)
+    for kind in kinds:
+        if kind not in KINDS:
+            parser.error(f"unknown chart kind '{kind}'")
+    for fmt in formats:
+        if fmt not in FORMATS:
+            parser.error(f"unknown format '{fmt}'")
+
+    seasons = _split(args.seasons) or get_all_seasons()
+    teams = _split(args.teams) or get_all_teams()
+    bookmakers = _split(args.bookmakers) or get_all_bookmakers()
+    output = os.path.abspath(args.output)
+    os.makedirs(output, exist_ok=True)
+
+    start = time.perf_counter()
+    jobs = build_jobs(kinds, seasons, teams, bookmakers, formats, output, args.window)
+    if not jobs:
+        print("Nothing to render.")
+        return 1
+
+    workers = args.workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) == 1:
+        results = [render_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = list(pool.map(render_job, jobs))
+
+    elapsed = time.perf_counter() - start
+    index = write_index(output, results, elapsed)
+    saved = sum(len(c["files"]) for r in results for c in r["charts"])
+    skipped = sum(not c["files"] for r in results for c in r["charts"])
+    print(f"{saved} files ({skipped} charts skipped) in {elapsed:.1f} s with {min(workers, len(jobs))} workers.")
+    print(f"Index: {index}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# startup.py
+
+# Startup timing. With --debug on the command line (or PL_GUI_DEBUG=1 in the
+# environment) the time of each startup step is printed once the main
+# window is shown.
+
+import os
+import sys
+import time
+
+DEBUG = "--debug" in sys.argv or os.environ.get("PL_GUI_DEBUG", "") not in ("", "0")
+
+_start = time.perf_counter()
+_marks = []
+
+def mark(step):
+    """
+    Record that step finished now.
+    """
+    _marks.append((step, time.perf_counter()))
+
+def report():
+    """
+    Print the time of each step recorded so far and the total (debug only).
+    """
+    if not DEBUG:
+        return
+    print("Startup timing:")
+    last = _start
+    for step, at in _marks:
+        print(f"  {step:<24} {(at - last) * 1000:8.1f} ms")
+        last = at
+    print(f"  {'total':<24} {(last - _start) * 1000:8.1f} ms")
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# views/backtest_view.py
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton
+from PyQt5.QtWidgets import QFileDialog, QMessageBox, QCheckBox, QSpinBox, QLineEdit
+from PyQt5.QtWidgets import QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+from models.etl_model import get_all_seasons, get_all_bookmakers
+from models.backtest_model import load_backtest_data, build_parameter_grid, run_backtest, equity_curve
+from models.backtest_model import STRATEGIES, STAKING_RULES
+from views.chart_helpers import SEASON_SCOPES, SCOPE_SINGLE, SCOPE_RANGE, SCOPE_ALL
+from views.chart_helpers import seasons_between, season_scope_label, reload_selector
+from charts.common import mark_season_boundaries
+import os
+import csv
+import time
+
+BEST_PRICE = "Best Price (all bookmakers)"
+
+# Columns of the results table
+REPORT_COLUMNS = ["Strategy", "MinEdge", "MinOdds", "MaxOdds", "Staking", "StakeSize",
+                  "Bets", "HitRate", "ROI", "Profit", "MaxDrawdown"]
+
+class BacktestView(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Betting Strategy Backtest")
+
+        self.layout = QVBoxLayout()
+        self.setLayout(self.layout)
+
+        # Seasons
+        self.seasons = get_all_seasons()
+        self.scope_selector = QComboBox()
+        self.scope_selector.addItems(SEASON_SCOPES)
+        self.scope_selector.setCurrentText(SCOPE_ALL)
+        self.scope_selector.currentIndexChanged.connect(self.update_scope_visibility)
+        self.season_selector = QComboBox()
+        self.season_selector.addItems(self.seasons)
+        self.season_label = QLabel("Select Season:")
+        self.season_selector_2 = QComboBox()
+        self.season_selector_2.addItems(self.seasons)
+        self.season_label_2 = QLabel("To Season:")
+
+        season_row = QHBoxLayout()
+        season_row.addWidget(QLabel("Seasons:"))
+        season_row.addWidget(self.scope_selector)
+        season_row.addWidget(self.season_label)
+        season_row.addWidget(self.season_selector)
+        season_row.addWidget(self.season_label_2)
+        season_row.addWidget(self.season_selector_2)
+        self.layout.addLayout(season_row)
+
+        # Prices used to place the bets
+        self.bookmaker_selector = QComboBox()
+        self.bookmaker_selector.addItem(BEST_PRICE)
+        self.bookmaker_selector.addItems(get_all_bookmakers())
+        self.layout.addWidget(QLabel("Bet At:"))
+        self.layout.addWidget(self.bookmaker_selector)
+
+        # Strategies
+        strategy_row = QHBoxLayout()
+        strategy_row.addWidget(QLabel("Strategies:"))
+        self.strategy_checks = {}
+        for strategy in STRATEGIES:
+            box = QCheckBox(strategy)
+            box.setChecked(strategy in ("Favourite", "Value"))
+            box.stateChanged.connect(self.mark_generate_outdated)
+            self.strategy_checks[strategy] = box
+            strategy_row.addWidget(box)
+        self.layout.addLayout(strategy_row)
+
+        # Parameter lists (every combination is evaluated)
+        self.edges_input = QLineEdit("0, 0.02, 0.05, 0.1")
+        self.odds_input = QLineEdit("1.01-100, 1.5-3, 2-5")
+        self.staking_input = QLineEdit("Flat:0.01, Percent:0.02, Kelly:0.25")
+        self.layout.addWidget(QLabel("Minimum Edges (Value strategy):"))
+        self.layout.addWidget(self.edges_input)
+        self.layout.addWidget(QLabel("Odds Ranges (min-max):"))
+        self.layout.addWidget(self.odds_input)
+        self.layout.addWidget(QLabel(f"Staking Rules ({', '.join(STAKING_RULES)}:size):"))
+        self.layout.addWidget(self.staking_input)
+
+        self.min_bets_spin = QSpinBox()
+        self.min_bets_spin.setRange(0, 10000)
+        self.min_bets_spin.setValue(50)
+        self.layout.addWidget(QLabel("Minimum Bets Shown:"))
+        self.layout.addWidget(self.min_bets_spin)
+
+        # Generate
+        self.generate_button = QPushButton("Run Backtest")
+        self.generate_button.clicked.connect(self.generate_chart)
+        self.layout.addWidget(self.generate_button)
+
+        # Results
+        self.summary_label = QLabel("")
+        self.layout.addWidget(self.summary_label)
+
+        self.table = QTableWidget()
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.itemSelectionChanged.connect(self.plot_selected)
+        self.layout.addWidget(self.table, stretch=1)
+
+        self.figure = Figure()
+        self.canvas = FigureCanvas(self.figure)
+        self.layout.addWidget(self.canvas, stretch=1)
+
+        # Export Chart
+        self.export_button = QPushButton("Export Chart")
+        self.export_button.setEnabled(False)
+        self.export_button.clicked.connect(self.export_chart)
+        self.layout.addWidget(self.export_button)
+
+        # Export Data
+        self.export_data_button = QPushButton("Export Data (CSV)")
+        self.export_data_button.setEnabled(False)
+        self.export_data_button.clicked.connect(self.export_data)
+        self.layout.addWidget(self.export_data_button)
+
+        self.scope_selector.currentIndexChanged.connect(self.mark_generate_outdated)
+        self.season_selector.currentIndexChanged.connect(self.mark_generate_outdated)
+        self.season_selector_2.currentIndexChanged.connect(self.mark_generate_outdated)
+        self.bookmaker_selector.currentIndexChanged.connect(self.mark_generate_outdated)
+        self.edges_input.textChanged.connect(self.mark_generate_outdated)
+        self.odds_input.textChanged.connect(self.mark_generate_outdated)
+        self.staking_input.textChanged.connect(self.mark_generate_outdated)
+        self.min_bets_spin.valueChanged.connect(self.mark_generate_outdated)
+
+        self.update_scope_visibility()
+
+        self.data = None
+        self.bookmaker = None
+        self.latest_data = None
+        self.shown_rows = []
+        self.last_export_dir = None
+
+    def selected_seasons(self):
+        scope = self.scope_selector.currentText()
+        if scope == SCOPE_SINGLE:
+            return [self.season_selector.currentText()]
+        if scope == SCOPE_RANGE:
+            return seasons_between(self.seasons, self.season_selector.currentText(),
+                                   self.season_selector_2.currentText())
+        return None
+
+    def update_scope_visibility(self):
+        scope = self.scope_selector.currentText()
+        is_range = (scope == SCOPE_RANGE)
+        self.season_label.setText("From Season:" if is_range else "Select Season:")
+        self.season_label.setVisible(scope != SCOPE_ALL)
+        self.season_selector.setVisible(scope != SCOPE_ALL)
+        self.season_label_2.setVisible(is_range)
+        self.season_selector_2.setVisible(is_range)
+
+    def parse_parameters(self):
+        """
+        Turn the parameter fields into lists; raise ValueError on bad input.
+        """
+        edges = [float(value) for value in self.edges_input.text().split(",") if value.strip()]
+
+        odds_ranges = []
+        for item in self.odds_input.text().split(","):
+            if item.strip():
+                low, high = item.split("-")
+                odds_ranges.append((float(low), float(high)))
+
+        stakings = []
+        for item in self.staking_input.text().split(","):
+            if item.strip():
+                rule, size = item.split(":")
+                stakings.append((rule.strip().capitalize(), float(size)))
+
+        strategies = [name for name, box in self.strategy_checks.items() if box.isChecked()]
+        if not strategies or not odds_ranges or not stakings:
+            raise ValueError("Select at least one strategy, odds range and staking rule.")
+        return strategies, edges or [0.0], odds_ranges, stakings
+
+    def generate_chart(self):
+        try:
+            strategies, edges, odds_ranges, stakings = self.parse_parameters()
+            grid = build_parameter_grid(strategies, edges, odds_ranges, stakings)
+        except (ValueError, RuntimeError) as e:
+            QMessageBox.warning(self, "Invalid Parameters", str(e))
+            return
+
+        bookmaker = self.bookmaker_selector.currentText()
+        self.bookmaker = None if bookmaker == BEST_PRICE else bookmaker
+
+        try:
+            start = time.perf_counter()
+            # Prices of every bookmaker are needed for the consensus probabilities
+            self.data = load_backtest_data(self.selected_seasons())
+            if not len(self.data["result"]):
+                QMessageBox.information(self, "No Data", "No odds data found for the selected seasons.")
+                return
+            report = run_backtest(self.data, grid, self.bookmaker)
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            QMessageBox.critical(self, "Backtest Error", str(e))
+            return
+
+        self.latest_data = report
+        self.shown_rows = [row for row in report if row["Bets"] >= self.min_bets_spin.value()]
+        self.summary_label.setText(
+            f"{len(grid)} combinations over {len(self.data['result'])} matches in {elapsed:.2f} s — "
+            f"{len(self.shown_rows)} with at least {self.min_bets_spin.value()} bets"
+        )
+
+        self.table.blockSignals(True)
+        self.table.clearContents()
+        self.table.setColumnCount(len(REPORT_COLUMNS))
+        self.table.setHorizontalHeaderLabels(REPORT_COLUMNS)
+        self.table.setRowCount(len(self.shown_rows))
+        for i, row in enumerate(self.shown_rows):
+            for j, key in enumerate(REPORT_COLUMNS):
+                value = row[key]
+                if key in ("HitRate", "ROI", "MaxDrawdown", "Profit"):
+                    value = f"{value:.2f}"
+                elif value is None:
+                    value = "-"
+                self.table.setItem(i, j, QTableWidgetItem(str(value)))
+        self.table.blockSignals(False)
+
+        if self.shown_rows:
+            self.table.selectRow(0)
+        else:
+            self.figure.clear()
+            self.canvas.draw()
+
+        self.export_button.setEnabled(bool(self.shown_rows))
+        self.export_data_button.setEnabled(bool(report))
+        self.clear_generate_flag()
+
+    def plot_selected(self):
+        selected = self.table.selectionModel().selectedRows()
+        if not selected or self.data is None:
+            return
+        params = self.shown_rows[selected[0].row()]
+
+        self.figure.clear()
+        ax = self.figure.add_subplot(121)
+        curve = equity_curve(self.data, params, self.bookmaker)
+        matches = list(range(1, len(curve) + 1))
+        ax.plot(matches, curve * 100, color="navy")
+        ax.axhline(100, color="gray", linestyle="--", linewidth=0.8)
+        if self.scope_selector.currentText() != SCOPE_SINGLE:
+            mark_season_boundaries(ax, matches, list(self.data["Season"]))
+        ax.set_title(f"{params['Strategy']} / {params['Staking']} {params['StakeSize']} — Bankroll")
+        ax.set_xlabel("Match")
+        ax.set_ylabel("Bankroll (% of start)")
+
+        # Risk vs return of every combination shown in the table
+        ax2 = self.figure.add_subplot(122)
+        ax2.scatter([r["MaxDrawdown"] for r in self.shown_rows], [r["ROI"] for r in self.shown_rows],
+                    s=12, alpha=0.5, color="gray")
+        ax2.scatter([params["MaxDrawdown"]], [params["ROI"]], s=40, color="red", zorder=3)
+        ax2.axhline(0, color="gray", linestyle="--", linewidth=0.8)
+        ax2.set_title("ROI vs Max Drawdown")
+        ax2.set_xlabel("Max Drawdown (%)")
+        ax2.set_ylabel("ROI (%)")
+
+        self.figure.tight_layout()
+        self.canvas.draw()
+
+    def export_chart(self):
+        scope = self.scope_selector.currentText()
+        season = season_scope_label(scope, self.selected_seasons() or [])
+        season = season.replace(" – ", "_").replace("/", "-").replace(" ", "_")
+        filename = f"Backtest_{season}.png"
+        folder = self.last_export_dir or os.getcwd()
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Chart", os.path.join(folder, filename),
+            "PNG Image (*.png);;JPEG Image (*.jpg);;PDF File (*.pdf)"
+        )
+        if file_path:
+            self.figure.savefig(file_path)
+            self.last_export_dir = os.path.dirname(file_path)
+            QMessageBox.information(self, "Export Successful", f"Chart saved:\n{file_path}")
+
+    def export_data(self):
+        if not self.latest_data:
+            QMessageBox.information(self, "No Data", "No data to export.")
+            return
+
+        scope = self.scope_selector.currentText()
+        season = season_scope_label(scope, self.selected_seasons() or [])
+        season = season.replace(" – ", "_").replace("/", "-").replace(" ", "_")
+        filename = f"BacktestData_{season}.csv"
+        folder = self.last_export_dir or os.getcwd()
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Data", os.path.join(folder, filename),
+            "CSV File (*.csv)"
+        )
+        if not file_path:
+            return
+
+        try:
+            columns = list(self.latest_data[0].keys())
+            with open(file_path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=columns)
+                writer.writeheader()
+                writer.writerows(self.latest_data)
+            QMessageBox.information(self, "Export Successful", f"Data saved:\n{file_path}")
+            self.last_export_dir = os.path.dirname(file_path)
+        except Exception as e:
+            QMessageBox.critical(self, "Export Failed", str(e))
+
+    def reload_data(self):
+        """
+        Reload the seasons and bookmakers after the data changed, keeping
+        the selections. A chart on screen is kept and marked outdated.
+        """
+        self.seasons = get_all_seasons()
+        reload_selector(self.season_selector, self.seasons)
+        reload_selector(self.season_selector_2, self.seasons)
+        reload_selector(self.bookmaker_selector, [BEST_PRICE] + get_all_bookmakers())
+
+        if self.export_button.isEnabled():
+            self.mark_generate_outdated()
+
+    def mark_generate_outdated(self):
+        self.generate_button.setText("Run Backtest (Outdated)")
+        self.generate_button.setStyleSheet("font-weight: bold; color: darkred;")
+
+    def clear_generate_flag(self):
+        self.generate_button.setText("Run Backtest")
+        self.generate_button.setStyleSheet("")
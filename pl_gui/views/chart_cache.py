@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# views/chart_cache.py
+
+# Computed chart data (query results and the values derived from them, not
+# the figures), kept so that going back to a selection already shown draws
+# it without querying again. Entries are keyed by the view and its selector
+# state and belong to one data version: an ETL run, clean or restore drops
+# them all. The version is checked when a view is shown (set_data_version),
+# not on every lookup, which would cost a query each time. Past
+# CACHE_LIMIT_MB the least recently used entries are evicted.
+
+from collections import OrderedDict
+import sys
+import numpy as np
+
+CACHE_LIMIT_MB = 64
+
+_entries = OrderedDict()   # key -> (value, estimated size in bytes)
+_state = {"version": None, "bytes": 0}
+
+def cached(key, compute):
+    """
+    Return compute() for key, from the cache if it was already computed
+    with the current data. Lists in key are treated as tuples.
+    """
+    key = _freeze(key)
+    if key in _entries:
+        _entries.move_to_end(key)
+        return _entries[key][0]
+
+    value = compute()
+    size = _estimate_size(value)
+    limit = CACHE_LIMIT_MB * 1024 * 1024
+    if size <= limit:
+        _entries[key] = (value, size)
+        _state["bytes"] += size
+        while _state["bytes"] > limit:
+            _, (_, evicted) = _entries.popitem(last=False)
+            _state["bytes"] -= evicted
+    return value
+
+def set_data_version(version):
+    """
+    Drop the cached entries if the data version changed since they were
+    computed.
+    """
+    if version != _state["version"]:
+        clear_chart_cache()
+        _state["version"] = version
+
+def clear_chart_cache():
+    _entries.clear()
+    _state["bytes"] = 0
+
+def chart_cache_size():
+    """
+    Number of entries and their estimated size in bytes.
+    """
+    return len(_entries), _state["bytes"]
+
+def _freeze(key):
+    if isinstance(key, (list, tuple)):
+        return tuple(_freeze(part) for part in key)
+    return key
+
+def _estimate_size(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes + sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_size(v) for v in value)
+    return sys.getsizeof(value)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# views/chart_helpers.py
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QCheckBox
+
+# Season scope choices shared by the trend views
+SCOPE_SINGLE = "Single Season"
+SCOPE_RANGE = "Season Range"
+SCOPE_ALL = "All Seasons"
+SEASON_SCOPES = [SCOPE_SINGLE, SCOPE_RANGE, SCOPE_ALL]
+
+# Quiet time after the last selector change before an automatic refresh
+AUTO_REFRESH_DELAY_MS = 400
+
+def seasons_between(all_seasons, first, last):
+    """
+    Return the seasons from first to last (inclusive, in either order) as
+    they appear in all_seasons, oldest first. all_seasons is the list shown
+    in the season selectors (newest first).
+    """
+    i, j = all_seasons.index(first), all_seasons.index(last)
+    if i > j:
+        i, j = j, i
+    return list(reversed(all_seasons[i:j + 1]))
+
+def season_scope_label(scope, seasons):
+    """
+    Short text describing the selected seasons, for titles and file names.
+    """
+    if scope == SCOPE_ALL:
+        return "All Seasons"
+    if len(seasons) == 1:
+        return seasons[0]
+    return f"{seasons[0]} – {seasons[-1]}"
+
+def reload_selector(selector, items):
+    """
+    Replace the items of a combo box after the data changed, keeping the
+    current one if it is still there. Return True if the current item
+    changed; its change signal is then sent, as if the user had picked it.
+    """
+    current = selector.currentText()
+    selector.blockSignals(True)
+    selector.clear()
+    selector.addItems(items)
+    if current in items:
+        selector.setCurrentText(current)
+    selector.blockSignals(False)
+
+    changed = selector.currentText() != current
+    if changed:
+        selector.currentIndexChanged.emit(selector.currentIndex())
+    return changed
+
+class AutoRefresh:
+    """
+    "Auto Refresh" checkbox of a chart view. While it is checked, schedule()
+    (called on every selector change) regenerates the chart once the
+    selectors have been left alone for AUTO_REFRESH_DELAY_MS. running is
+    True during such a refresh, when the user may be halfway through a
+    selection and the view should not complain about it.
+    """
+    def __init__(self, callback, delay_ms=AUTO_REFRESH_DELAY_MS):
+        self.callback = callback
+        self.running = False
+        self.checkbox = QCheckBox("Auto Refresh")
+        self.timer = QTimer(self.checkbox)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.run)
+        self.checkbox.stateChanged.connect(self.schedule)
+
+    def run(self):
+        self.running = True
+        try:
+            self.callback()
+        finally:
+            self.running = False
+
+    def schedule(self):
+        if self.checkbox.isChecked():
+            self.timer.start()   # restarts the wait if already pending
+        else:
+            self.timer.stop()
@@ -7,15 +7,36 @@
 
 # views/etl_control_view.py
 
-from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLabel, QFileDialog
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLabel, QFileDialog, QApplication
 from PyQt5.QtWidgets import QTableWidget, QTableWidgetItem, QHBoxLayout, QMessageBox, QMainWindow
-from models.etl_model import load_csv_to_staging, trigger_etl_job, fetch_etl_log
-from models.etl_model import get_staging_columns, fetch_dead_letter
-from models.etl_model import get_staging_columns, has_season_data
-import pandas as pd
+from models.etl_model import fetch_etl_log, fetch_etl_steps, fetch_dead_letter, has_season_data
+from models.etl_queue_model import enqueue_etl_job, run_etl_queue, fetch_etl_queue, fetch_etl_job
+from models.etl_queue_model import client_name, ACTIVE_STATUSES
+from models.ingest_model import stage_csv_file
 import os
-import hashlib
+
+# How often the queue shared with the other clients is reloaded
+QUEUE_REFRESH_MS = 3000
+
+class QueueRunner(QThread):
+    """
+    Runs the ETL queue off the GUI thread, reporting when it takes the ETL
+    lock and each step.
+    """
+    locked = pyqtSignal()
+    progress = pyqtSignal(int, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.error = None
+
+    def run(self):
+        try:
+            run_etl_queue("GUI ETL Job", lambda job, message: self.progress.emit(job["QueueID"], message),
+                          locked=self.locked.emit)
+        except Exception as e:
+            self.error = str(e)
 
 class ETLControlView(QWidget):
     def __init__(self):
@@ -40,6 +61,15 @@ class ETLControlView(QWidget):
         self.etl_button.clicked.connect(self.run_etl)
         self.layout.addWidget(self.etl_button)
 
+        # ETL Queue: the jobs of every client, run one at a time
+        self.queue_label = QLabel("ETL Queue")
+        self.queue_table = QTableWidget()
+        self.progress_label = QLabel("")
+
+        self.layout.addWidget(self.queue_label)
+        self.layout.addWidget(self.queue_table)
+        self.layout.addWidget(self.progress_label)
+
         # ETL Log
         self.log_label = QLabel("ETL Job Log")
         self.log_table = QTableWidget()
@@ -50,6 +80,14 @@ class ETLControlView(QWidget):
         self.layout.addWidget(self.log_table)
         self.layout.addWidget(self.refresh_log_button)
 
+        # Tables loaded by the job selected in the log, with row counts and times
+        self.steps_label = QLabel("ETL Job Steps (select a job in the log)")
+        self.steps_table = QTableWidget()
+        self.log_table.itemSelectionChanged.connect(self.load_etl_steps)
+
+        self.layout.addWidget(self.steps_label)
+        self.layout.addWidget(self.steps_table)
+
         # Dead Letter Table
         self.dlq_label = QLabel("ETL Dead Letter Records")
         self.dlq_table = QTableWidget()
@@ -62,8 +100,20 @@ class ETLControlView(QWidget):
 
         self.csv_path = None
         self.file_hash = None
+
+        # Job queued from this panel, until its result is shown
+        self.queue_id = None
+        self.runner = None
+        self.announce = False
+        QApplication.instance().aboutToQuit.connect(self.wait_for_queue)
+
+        self.queue_timer = QTimer(self)
+        self.queue_timer.setInterval(QUEUE_REFRESH_MS)
+        self.queue_timer.timeout.connect(self.refresh_queue)
+        self.queue_timer.start()
+        self.refresh_queue()
         
-        self.resize(1000, 600)
+        self.resize(1000, 700)
 
     def select_file(self):
         path, _ = QFileDialog.getOpenFileName(self, "Select CSV", "", "CSV Files (*.csv)")
@@ -78,32 +128,8 @@ class ETLControlView(QWidget):
             QMessageBox.warning(self, "No File", "Please select a CSV file first.")
             return
         try:
-            df = pd.read_csv(self.csv_path, encoding='latin1')  # match notebook behavior
-
-            # Apply exact column renaming as in notebook
-            df.columns = (
-                df.columns
-                .str.replace('>2.5', '_2_5O', regex=False)
-                .str.replace('<2.5', '_2_5U', regex=False)
-                .str.replace('.', '_', regex=False)
-                .str.strip()
-            )
-
-            # Drop columns not in DB table, just like notebooks did manually
-            valid_cols = get_staging_columns()
-            df = df[[col for col in df.columns if col in valid_cols]]
-
-            # Fix European-style date format to standard ISO
-            df['Date'] = pd.to_datetime(df['Date'], dayfirst=True)
-            df['Time'] = pd.to_datetime(df['Time'], format='%H:%M', errors='coerce').dt.time
-
-            # Use file hash to mark and avoid to stage and ETL the same file again
-            self.file_hash = compute_file_hash(self.csv_path)
-            df["FileHash"] = self.file_hash
-
-            # Load cleaned DataFrame into staging
-            load_csv_to_staging(df)
-            
+            self.file_hash, _ = stage_csv_file(self.csv_path)
+
             QMessageBox.information(self, "Success", "CSV loaded to staging table.")
             
         except Exception as e:
@@ -111,15 +137,120 @@ class ETLControlView(QWidget):
 
     def run_etl(self):
         try:
-            result = trigger_etl_job(self.file_hash)
-            QMessageBox.information(self, "ETL Status", result)
+            user = getattr(self.window(), "username", None)
+            self.queue_id = enqueue_etl_job(self.file_hash, f"GUI {client_name(user)}")
+            self.announce = True
+            self.run_queue()
+
+        except Exception as e:
+            QMessageBox.critical(self, "ETL Error", str(e))
+
+    def run_queue(self):
+        """
+        Run the queued jobs in a worker thread if no other client is running
+        them. Once it holds the ETL lock and until it ends, the menus and the
+        buttons are disabled: the load is one open transaction, and the
+        other database actions would wait on its locks. While another client
+        holds the lock the thread ends at once and nothing is disabled.
+        """
+        if self.runner:
+            return   # the running thread also runs the jobs queued meanwhile
+        self.runner = QueueRunner(self)
+        self.runner.locked.connect(lambda: self.set_running(True))
+        self.runner.progress.connect(self.show_progress)
+        self.runner.finished.connect(self.queue_finished)
+        self.runner.start()
+
+    def wait_for_queue(self):
+        # A job being loaded is finished before the program exits
+        if self.runner:
+            self.runner.wait()
+
+    def set_running(self, running):
+        mw = self.window()
+        if isinstance(mw, QMainWindow):
+            mw.menuBar().setEnabled(not running)
+        for button in (self.select_button, self.upload_button, self.etl_button,
+                       self.refresh_log_button, self.refresh_dlq_button):
+            button.setEnabled(not running)
+
+    def show_progress(self, queue_id, message):
+        self.progress_label.setText(f"Running ETL job #{queue_id}: {message}")
+
+    def queue_finished(self):
+        error, self.runner = self.runner.error, None
+        self.set_running(False)
+        self.progress_label.setText("")
+        if error:
+            self.queue_id = None
+            QMessageBox.critical(self, "ETL Error", error)
+            return
+
+        self.load_queue()
+        job = fetch_etl_job(self.queue_id) if self.queue_id else None
+        announce, self.announce = self.announce, False
+        if job and job["Status"] in ACTIVE_STATUSES:
+            if not announce:
+                return
+            if job["Status"] == "Queued":
+                QMessageBox.information(self, "ETL Queued",
+                                        f"Another client is running the ETL. This job is number "
+                                        f"{job['Position']} in the queue and will run after it.")
+            else:
+                QMessageBox.information(self, "ETL Queued",
+                                        f"The ETL of this file is already running ({job['RequestedBy']}).")
+        else:
+            self.show_job_result()
+
+    def show_job_result(self):
+        job = fetch_etl_job(self.queue_id) if self.queue_id else None
+        self.queue_id = None
+        if not job:
+            return
+
+        if job["Status"] == "Completed":
+            QMessageBox.information(self, "ETL Status", job["Message"] or "")
 
             mw = self.window()
             if isinstance(mw, QMainWindow) and hasattr(mw, 'league_action'):
                 mw.league_action.setEnabled(has_season_data())
-               
+        else:
+            QMessageBox.critical(self, "ETL Error", job["Message"] or job["Status"])
+
+    def refresh_queue(self):
+        """
+        Reload the queue; when this panel's job is still waiting, run the
+        queue if its runner is gone, and show the job's result once it ends.
+        """
+        if self.runner:
+            return
+        try:
+            if self.queue_id:
+                job = fetch_etl_job(self.queue_id)
+                if job and job["Status"] == "Queued":
+                    self.run_queue()
+                    return
+                if not job or job["Status"] not in ACTIVE_STATUSES:
+                    self.show_job_result()
+            self.load_queue()
+
         except Exception as e:
-            QMessageBox.critical(self, "ETL Error", str(e))
+            self.progress_label.setText(f"ETL queue not available: {e}")
+
+    def load_queue(self):
+        data = fetch_etl_queue()
+        headers = ["Job", "Status", "Position", "Progress", "Current Step", "Requested By",
+                   "File", "Queued", "Started", "Ended", "LogID", "Message"]
+        self.queue_table.setColumnCount(len(headers))
+        self.queue_table.setHorizontalHeaderLabels(headers)
+        self.queue_table.setRowCount(len(data))
+        for i, job in enumerate(data):
+            values = [job["QueueID"], job["Status"], job["Position"] or "", job["Progress"],
+                      job["CurrentStep"] or "", job["RequestedBy"], job["FileHash"][:12],
+                      job["QueuedTime"], job["StartTime"] or "", job["EndTime"] or "",
+                      job["LogID"] or "", (job["Message"] or "").split("\n")[0]]
+            for j, value in enumerate(values):
+                self.queue_table.setItem(i, j, QTableWidgetItem(str(value)))
 
     def load_etl_log(self):
         data = fetch_etl_log()        
@@ -136,6 +267,22 @@ class ETLControlView(QWidget):
             for j, key in enumerate(row):
                 self.log_table.setItem(i, j, QTableWidgetItem(str(row[key])))
 
+    def load_etl_steps(self):
+        row = self.log_table.currentRow()
+        item = self.log_table.item(row, 0) if row >= 0 else None
+        data = fetch_etl_steps(int(item.text())) if item else []
+        if not data:
+            self.steps_table.setRowCount(0)
+            self.steps_table.setColumnCount(0)
+            return
+
+        self.steps_table.setColumnCount(len(data[0]))
+        self.steps_table.setRowCount(len(data))
+        self.steps_table.setHorizontalHeaderLabels(data[0].keys())
+        for i, step in enumerate(data):
+            for j, key in enumerate(step):
+                self.steps_table.setItem(i, j, QTableWidgetItem(str(step[key])))
+
     def load_dead_letters(self):
         data = fetch_dead_letter()
         if not data:
@@ -151,8 +298,3 @@ class ETLControlView(QWidget):
         for i, row in enumerate(data):
             for j, key in enumerate(row):
                 self.dlq_table.setItem(i, j, QTableWidgetItem(str(row[key])))
-
-def compute_file_hash(file_path):
-    with open(file_path, 'rb') as f:
-        return hashlib.sha256(f.read()).hexdigest()
-    
\ No newline at end of file
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# views/head_to_head_view.py
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QComboBox, QPushButton
+from PyQt5.QtWidgets import QFileDialog, QMessageBox
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+from models.etl_model import get_all_teams
+from models.h2h_model import get_head_to_head, summarize_head_to_head
+from charts.common import mark_season_boundaries
+from views.chart_helpers import reload_selector
+import os
+import csv
+import numpy as np
+import mplcursors
+
+class HeadToHeadView(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Head to Head")
+
+        self.layout = QVBoxLayout()
+        self.setLayout(self.layout)
+
+        teams = get_all_teams()
+
+        # Teams
+        self.team_selector = QComboBox()
+        self.team_selector.addItems(teams)
+        self.layout.addWidget(QLabel("Select Team:"))
+        self.layout.addWidget(self.team_selector)
+
+        self.team_selector_2 = QComboBox()
+        self.team_selector_2.addItems(teams)
+        if len(teams) > 1:
+            self.team_selector_2.setCurrentIndex(1)
+        self.layout.addWidget(QLabel("Against Team:"))
+        self.layout.addWidget(self.team_selector_2)
+
+        # Generate
+        self.generate_button = QPushButton("Generate Chart")
+        self.generate_button.clicked.connect(self.generate_chart)
+        self.layout.addWidget(self.generate_button)
+
+        # Record summary
+        self.summary_label = QLabel("")
+        self.layout.addWidget(self.summary_label)
+
+        # Chart canvas
+        self.figure = Figure()
+        self.canvas = FigureCanvas(self.figure)
+        self.layout.addWidget(self.canvas, stretch=1)
+
+        # Export Chart
+        self.export_button = QPushButton("Export Chart")
+        self.export_button.setEnabled(False)
+        self.export_button.clicked.connect(self.export_chart)
+        self.layout.addWidget(self.export_button)
+
+        # Export Data
+        self.export_data_button = QPushButton("Export Data (CSV)")
+        self.export_data_button.setEnabled(False)
+        self.export_data_button.clicked.connect(self.export_data)
+        self.layout.addWidget(self.export_data_button)
+
+        self.team_selector.currentIndexChanged.connect(self.mark_generate_outdated)
+        self.team_selector_2.currentIndexChanged.connect(self.mark_generate_outdated)
+
+        self.latest_data = None
+        self.last_export_dir = None
+
+    def generate_chart(self):
+        team = self.team_selector.currentText()
+        team2 = self.team_selector_2.currentText()
+        if team == team2:
+            QMessageBox.warning(self, "Invalid Selection", "Please select two different teams.")
+            return
+
+        try:
+            meetings = get_head_to_head(team, team2)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+
+        if not meetings:
+            QMessageBox.information(self, "No Data", f"{team} and {team2} have never met.")
+            return
+
+        summary = summarize_head_to_head(meetings)
+        self.summary_label.setText(
+            f"Played {summary['Played']} — {team} {summary['WinsA']} wins, "
+            f"{summary['Draws']} draws, {team2} {summary['WinsB']} wins — "
+            f"Goals {summary['GoalsA']}–{summary['GoalsB']}"
+        )
+
+        index = np.arange(1, len(meetings) + 1)
+        results = [m["Result"] for m in meetings]
+        wins_a = np.cumsum([r == "W" for r in results])
+        draws = np.cumsum([r == "D" for r in results])
+        wins_b = np.cumsum([r == "L" for r in results])
+        goal_diff = [m["GoalsA"] - m["GoalsB"] for m in meetings]
+        seasons = [m["SeasonName"] for m in meetings]
+
+        self.figure.clear()
+
+        # Running record
+        ax = self.figure.add_subplot(211)
+        ax.plot(index, wins_a, marker='o', label=f"{team} wins", color='blue')
+        ax.plot(index, draws, marker='o', label="Draws", color='gray')
+        ax.plot(index, wins_b, marker='o', label=f"{team2} wins", color='red')
+        mark_season_boundaries(ax, list(index), seasons)
+        ax.set_ylabel("Cumulative Count")
+        ax.set_title(f"{team} vs {team2} — Head to Head", pad=20)
+        ax.legend(loc="upper left")
+
+        # Goal difference of each meeting, from the first team's side
+        ax2 = self.figure.add_subplot(212, sharex=ax)
+        colors = ['blue' if gd > 0 else 'red' if gd < 0 else 'gray' for gd in goal_diff]
+        ax2.bar(index, goal_diff, color=colors)
+        ax2.axhline(0, color='black', linewidth=0.8)
+        ax2.set_ylabel(f"Goal Diff ({team})")
+        ax2.set_xlabel("Meeting")
+
+        self.figure.tight_layout()
+        self.canvas.draw()
+
+        cursor = mplcursors.cursor(ax.lines, hover=True)
+
+        def format_hover(sel):
+            i = int(round(sel.target[0])) - 1
+            if 0 <= i < len(meetings):
+                m = meetings[i]
+                home = m["HomeTeam"]
+                away = team2 if home == team else team
+                home_goals, away_goals = (m["GoalsA"], m["GoalsB"]) if home == team else (m["GoalsB"], m["GoalsA"])
+                sel.annotation.set_text(f"{m['MatchDate']} ({m['SeasonName']})\n{home} {home_goals}–{away_goals} {away}")
+
+        cursor.connect("add", format_hover)
+
+        self.latest_data = meetings
+        self.export_button.setEnabled(True)
+        self.export_data_button.setEnabled(True)
+        self.clear_generate_flag()
+
+    def export_chart(self):
+        team = self.team_selector.currentText().replace(" ", "_")
+        team2 = self.team_selector_2.currentText().replace(" ", "_")
+        filename = f"HeadToHead_{team}_vs_{team2}.png"
+        folder = self.last_export_dir or os.getcwd()
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Chart", os.path.join(folder, filename),
+            "PNG Image (*.png);;JPEG Image (*.jpg);;PDF File (*.pdf)"
+        )
+        if file_path:
+            self.figure.savefig(file_path)
+            self.last_export_dir = os.path.dirname(file_path)
+            QMessageBox.information(self, "Export Successful", f"Chart saved:\n{file_path}")
+
+    def export_data(self):
+        if not self.latest_data:
+            QMessageBox.information(self, "No Data", "No data to export.")
+            return
+
+        team = self.team_selector.currentText()
+        team2 = self.team_selector_2.currentText()
+        filename = f"HeadToHeadData_{team.replace(' ', '_')}_vs_{team2.replace(' ', '_')}.csv"
+        folder = self.last_export_dir or os.getcwd()
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Data", os.path.join(folder, filename),
+            "CSV File (*.csv)"
+        )
+        if not file_path:
+            return
+
+        try:
+            with open(file_path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["Date", "Season", "HomeTeam", f"{team} Goals", f"{team2} Goals", f"{team} Result"])
+                for m in self.latest_data:
+                    writer.writerow([m["MatchDate"], m["SeasonName"], m["HomeTeam"], m["GoalsA"], m["GoalsB"], m["Result"]])
+            QMessageBox.information(self, "Export Successful", f"Data saved:\n{file_path}")
+            self.last_export_dir = os.path.dirname(file_path)
+        except Exception as e:
+            QMessageBox.critical(self, "Export Failed", str(e))
+
+    def reload_data(self):
+        """
+        Reload the teams after the data changed, keeping the selections. A
+        chart on screen is kept and marked outdated.
+        """
+        teams = get_all_teams()
+        reload_selector(self.team_selector, teams)
+        reload_selector(self.team_selector_2, teams)
+
+        if self.export_button.isEnabled():
+            self.mark_generate_outdated()
+
+    def mark_generate_outdated(self):
+        self.generate_button.setText("Generate Chart (Outdated)")
+        self.generate_button.setStyleSheet("font-weight: bold; color: darkred;")
+
+    def clear_generate_flag(self):
+        self.generate_button.setText("Generate Chart")
+        self.generate_button.setStyleSheet("")
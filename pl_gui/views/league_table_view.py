@@ -11,6 +11,8 @@ from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QTableWidget
 from PyQt5.QtWidgets import QTableWidgetItem, QLabel, QComboBox, QMessageBox
 from PyQt5.QtWidgets import QSizePolicy, QHeaderView
 from models.etl_model import get_all_seasons, fetch_league_table
+from models.standings_model import get_standings_matchdays, get_league_table_as_of
+from views.chart_helpers import reload_selector
 
 class LeagueTableView(QWidget):
     def __init__(self):
@@ -22,7 +24,12 @@ class LeagueTableView(QWidget):
         self.season_selector = QComboBox()
         self.season_selector.addItem("All Seasons")
         self.season_selector.addItems(get_all_seasons())  # dynamically populated
-        self.season_selector.currentIndexChanged.connect(self.load_data)
+        self.season_selector.currentIndexChanged.connect(self.update_matchday_selector)
+
+        # Standings after a given matchday (served from LeagueStandings)
+        self.matchday_label = QLabel("Standings After:")
+        self.matchday_selector = QComboBox()
+        self.matchday_selector.currentIndexChanged.connect(self.load_data)
 
         self.table = QTableWidget()
         self.table.setMinimumSize(0, 0)
@@ -30,15 +37,49 @@ class LeagueTableView(QWidget):
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.layout.addWidget(QLabel("Select Season:"))
         self.layout.addWidget(self.season_selector)
+        self.layout.addWidget(self.matchday_label)
+        self.layout.addWidget(self.matchday_selector)
         self.layout.addWidget(self.table, stretch = 1)
 
-        self.load_data()
+        self.update_matchday_selector()
         self.resize(1000, 600)
 
+    def update_matchday_selector(self):
+        season = self.season_selector.currentText()
+        is_single = season != "All Seasons"
+        as_of_date = self.matchday_selector.currentData()
+
+        self.matchday_selector.blockSignals(True)
+        self.matchday_selector.clear()
+        self.matchday_selector.addItem("Final Table", None)
+        if is_single:
+            for row in get_standings_matchdays(season):
+                self.matchday_selector.addItem(f"Matchday {row['Matchday']} ({row['AsOfDate']})", row["AsOfDate"])
+        # Same matchday kept when the season is reloaded
+        if as_of_date is not None:
+            dates = [self.matchday_selector.itemData(i) for i in range(self.matchday_selector.count())]
+            self.matchday_selector.setCurrentIndex(dates.index(as_of_date) if as_of_date in dates else 0)
+        self.matchday_selector.blockSignals(False)
+
+        self.matchday_label.setVisible(is_single)
+        self.matchday_selector.setVisible(is_single)
+        self.load_data()
+
+    def reload_data(self):
+        """
+        Reload the seasons and the table after the data changed, keeping
+        the season and matchday shown if they still exist.
+        """
+        if not reload_selector(self.season_selector, ["All Seasons"] + get_all_seasons()):
+            self.update_matchday_selector()
+
     def load_data(self):
         season = self.season_selector.currentText()
+        as_of_date = self.matchday_selector.currentData()
         if season == "All Seasons":
             data = fetch_league_table()
+        elif as_of_date is not None:
+            data = get_league_table_as_of(season, as_of_date)
         else:
             data = fetch_league_table(season)
 
@@ -12,23 +12,21 @@ from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QPushButton
 from PyQt5.QtWidgets import QTableWidget, QTableWidgetItem, QLineEdit, QLabel
 from PyQt5.QtWidgets import QComboBox, QMessageBox
 from PyQt5.QtWidgets import QWidget, QInputDialog, QFileDialog
-from views.league_table_view import LeagueTableView
-from views.etl_control_view import ETLControlView
-from models.etl_model import clean_all_tables, has_season_data, clear_etl_logs
-from models.etl_model import deduplicate_bookmakers
-from views.visualization_view import VisualizationView
-from views.referee_stats_view import RefereeStatsView
-from views.team_trend_view import TeamTrendView
-from views.odds_analysis_view import OddsAnalysisView
-from dialogs.user_management_dialog import UserManagementDialog
 from dialogs.login_dialog import LoginDialog
+from views.view_stack import ViewStack
 from db.connection import get_connection, get_db_config
+from db.sqlite_backend import dump_database, restore_database
+from db.replica import mark_replica_stale
 from db.git import get_git_version
+import startup
 import hashlib
 import sys
 import subprocess
 from datetime import datetime
 
+# The views, the models and with them numpy, pandas, matplotlib and
+# mplcursors are imported when they are first needed, not at startup.
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -38,18 +36,28 @@ class MainWindow(QMainWindow):
 
         self.menu = self.menuBar()
 
-        # Just to check if the DB connection works
-        get_connection()
+        # One connection checks that the DB works, logs the user in and
+        # chooses the initial view
+        conn = get_connection()
+        startup.mark("DB connection")
         
         self.current_widget = None
+        self.league_view = None
+        self.etl_control = None
         
         # Login
-        login_dialog = LoginDialog()
+        login_dialog = LoginDialog(conn)
         if login_dialog.exec_() != QDialog.Accepted:
+            conn.close()
             sys.exit(1)
+        startup.mark("login")
 
         self.username = login_dialog.username
         self.role = login_dialog.role
+
+        # Views are kept alive in a stack and reload their data when it changed
+        self.views = ViewStack()
+        self.setCentralWidget(self.views)
         
         # Info menu
         self.info_menu = self.menu.addMenu("Info")
@@ -85,6 +93,18 @@ class MainWindow(QMainWindow):
         self.odds_analysis_action.triggered.connect(self.show_odds_analysis)
         self.view_menu.addAction(self.odds_analysis_action)
 
+        self.backtest_action = QAction("Strategy Backtest", self)
+        self.backtest_action.triggered.connect(self.show_backtest)
+        self.view_menu.addAction(self.backtest_action)
+
+        self.simulation_action = QAction("Season Simulation", self)
+        self.simulation_action.triggered.connect(self.show_simulation)
+        self.view_menu.addAction(self.simulation_action)
+
+        self.head_to_head_action = QAction("Head to Head", self)
+        self.head_to_head_action.triggered.connect(self.show_head_to_head)
+        self.view_menu.addAction(self.head_to_head_action)
+
         # Utilities menu
         self.util_menu = self.menu.addMenu("Utilities")
         self.clean_action = QAction("Clean All Tables", self)
@@ -115,20 +135,40 @@ class MainWindow(QMainWindow):
             self.user_mgmt_action.triggered.connect(self.open_user_management)
             self.admin_menu.addAction(self.user_mgmt_action)
                        
-        if has_season_data():
+        from models.etl_model import has_season_data
+        try:
+            season_data = has_season_data(conn)
+        finally:
+            conn.close()
+
+        if season_data:
             self.show_league_table()
         else:
             self.show_etl_control()
+        startup.mark("initial view")
             
         self.resize(1400, 800)
         self.center_on_screen()
 
-    def set_central_widget(self, widget, view_name=None):
-        if self.current_widget:
-            self.current_widget.setParent(None)
+    def show_view(self, view_name, factory, refresh=True):
+        """
+        Show the view called view_name, building it with factory() the first
+        time. With refresh=True it reloads its data if the data version
+        changed since it was last shown (an ETL run, clean or restore).
+        """
+        version = None
+        if refresh:
+            from models.etl_model import get_data_version
+            from views.chart_cache import set_data_version
+            version = get_data_version()
+            set_data_version(version)
+
+        widget = self.views.show_view(view_name, factory, version)
         self.current_widget = widget
-        self.setCentralWidget(widget)
+        self.set_title(view_name)
+        return widget
 
+    def set_title(self, view_name=None):
         version = get_git_version()
         title = f"Premier League DB Manager (v. 0.{version})"
         if view_name:
@@ -150,12 +190,14 @@ class MainWindow(QMainWindow):
         )
         if reply == QMessageBox.Yes:
             try:
+                from models.etl_model import clean_all_tables
                 clean_all_tables()
                 QMessageBox.information(self, "Success", "All relevant tables have been cleaned.")
                 # Close League Table view if currently visible
-                if isinstance(self.current_widget, LeagueTableView):
-                    self.setCentralWidget(QWidget())  # replace with empty widget
+                if self.current_widget is not None and self.current_widget is self.league_view:
+                    self.views.show_blank()
                     self.current_widget = None
+                    self.set_title()
                 
             except Exception as e:
                 QMessageBox.critical(self, "Error", str(e))
@@ -169,8 +211,9 @@ class MainWindow(QMainWindow):
         )
         if reply == QMessageBox.Yes:
             try:
+                from models.etl_model import clear_etl_logs
                 clear_etl_logs()
-                if hasattr(self, "etl_control"):
+                if self.etl_control is not None:
                     self.etl_control.load_etl_log()
                 QMessageBox.information(self, "Logs Cleared", "All ETL logs have been deleted.")
   
@@ -178,28 +221,41 @@ class MainWindow(QMainWindow):
                 QMessageBox.critical(self, "Error", str(e))
 
     def show_league_table(self):
-        self.league_view = LeagueTableView()
-        self.set_central_widget(self.league_view, "League Table")
+        from views.league_table_view import LeagueTableView
+        self.league_view = self.show_view("League Table", LeagueTableView)
 
     def show_etl_control(self):
-        if not hasattr(self, "etl_control") or self.etl_control is None:
-            self.etl_control = ETLControlView()
-        self.set_central_widget(self.etl_control, "ETL Control")
+        # The ETL panel makes the changes and refreshes itself
+        from views.etl_control_view import ETLControlView
+        self.etl_control = self.show_view("ETL Control", ETLControlView, refresh=False)
 
     def show_visualizations(self):
-        self.viz_view = VisualizationView()
-        self.set_central_widget(self.viz_view, "Team Insights")
+        from views.visualization_view import VisualizationView
+        self.viz_view = self.show_view("Team Insights", VisualizationView)
 
     def show_referee_stats(self):
-        self.ref_stats_view = RefereeStatsView()
-        self.set_central_widget(self.ref_stats_view, "Referee Stats")
+        from views.referee_stats_view import RefereeStatsView
+        self.ref_stats_view = self.show_view("Referee Stats", RefereeStatsView)
 
     def show_team_trend(self):
-        self.team_trend_view = TeamTrendView()
-        self.set_central_widget(self.team_trend_view, "Team Trend")
+        from views.team_trend_view import TeamTrendView
+        self.team_trend_view = self.show_view("Team Trend", TeamTrendView)
 
     def show_odds_analysis(self):
-        self.set_central_widget(OddsAnalysisView(), "Odds Analysis")
+        from views.odds_analysis_view import OddsAnalysisView
+        self.show_view("Odds Analysis", OddsAnalysisView)
+
+    def show_backtest(self):
+        from views.backtest_view import BacktestView
+        self.show_view("Strategy Backtest", BacktestView)
+
+    def show_simulation(self):
+        from views.simulation_view import SimulationView
+        self.show_view("Season Simulation", SimulationView)
+
+    def show_head_to_head(self):
+        from views.head_to_head_view import HeadToHeadView
+        self.show_view("Head to Head", HeadToHeadView)
 
     def show_about_dialog(self):
         from PyQt5.QtWidgets import QMessageBox
@@ -228,6 +284,7 @@ class MainWindow(QMainWindow):
             return
 
         try:
+            from models.etl_model import deduplicate_bookmakers
             msg = deduplicate_bookmakers()
             QMessageBox.information(self, "Cleanup Result", msg)
 
@@ -261,6 +318,7 @@ class MainWindow(QMainWindow):
         return None, None      
          
     def open_user_management(self):
+        from dialogs.user_management_dialog import UserManagementDialog
         dlg = UserManagementDialog(self)
         dlg.exec_()
 
@@ -283,6 +341,11 @@ class MainWindow(QMainWindow):
 
         try:
             config = get_db_config()
+            if config["backend"] == "sqlite":
+                dump_database(config["database"], file_path)
+                QMessageBox.information(self, "Success", f"Snapshot saved to:\n{file_path}")
+                return
+
             cmd = [
                 "mysqldump",
                 f"-h{config['host']}",
@@ -320,18 +383,26 @@ class MainWindow(QMainWindow):
 
         try:
             config = get_db_config()
-            cmd = [
-                "mysql",
-                f"-h{config['host']}",
-                f"-P{config['port']}",
-                f"-u{config['user']}",
-                f"-p{config['password']}",
-                config['database'],
-            ]
-            with open(file_path, "r") as f:
-                subprocess.run(cmd, stdin=f, check=True)
+            if config["backend"] == "sqlite":
+                restore_database(config["database"], file_path)
+            else:
+                cmd = [
+                    "mysql",
+                    f"-h{config['host']}",
+                    f"-P{config['port']}",
+                    f"-u{config['user']}",
+                    f"-p{config['password']}",
+                    config['database'],
+                ]
+                with open(file_path, "r") as f:
+                    subprocess.run(cmd, stdin=f, check=True)
+                mark_replica_stale(full=True)
+            # The restored matches are indexed again on the next search
+            from models.similarity_model import delete_similarity_index
+            delete_similarity_index()
             QMessageBox.information(self, "Restored", f"Snapshot loaded from:\n{file_path}")
         
+            from models.etl_model import has_season_data
             if has_season_data():
                 self.show_league_table()
             else:
@@ -12,9 +12,12 @@ from PyQt5.QtWidgets import QFileDialog, QMessageBox
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from models.etl_model import get_all_seasons, get_all_bookmakers
-from models.etl_model import get_avg_margins_per_bookmaker, get_implied_probability_data
+from models.odds_model import implied_probabilities
+from charts.common import ChartArtists, ChartError
+from charts.odds import ODDS_CHARTS, EXPORT_NAMES, load_odds_chart, draw_odds_chart
+from views.chart_helpers import AutoRefresh, reload_selector
+from views.chart_cache import cached
 import os
-import numpy as np
 
 class OddsAnalysisView(QWidget):
     def __init__(self):
@@ -37,13 +40,7 @@ class OddsAnalysisView(QWidget):
 
         # Chart type
         self.chart_type_selector = QComboBox()
-        self.chart_type_selector.addItems([
-            "Implied Probability vs Result",
-            "Bookmaker Margin",
-            "Margin Distribution",
-            "Compare Bookmaker Margins",
-            "Over / Under 2.5 - Implied vs Actual"
-        ])
+        self.chart_type_selector.addItems(ODDS_CHARTS)
         self.chart_type_selector.currentIndexChanged.connect(self.update_ou_visibility)
         self.layout.addWidget(QLabel("Chart Type:"))
         self.layout.addWidget(self.chart_type_selector)
@@ -60,10 +57,14 @@ class OddsAnalysisView(QWidget):
         self.generate_button.clicked.connect(self.generate_chart)
         self.layout.addWidget(self.generate_button)
 
+        self.auto_refresh = AutoRefresh(self.generate_chart)
+        self.layout.addWidget(self.auto_refresh.checkbox)
+
         # Chart
         self.figure = Figure()
         self.canvas = FigureCanvas(self.figure)
         self.layout.addWidget(self.canvas, stretch=1)
+        self.chart = ChartArtists(self.figure, self.canvas)
 
         # Export Chart
         self.export_chart_button = QPushButton("Export Chart")
@@ -91,201 +92,18 @@ class OddsAnalysisView(QWidget):
     def generate_chart(self):
         season = self.season_selector.currentText()
         bookmaker = self.bookmaker_selector.currentText()
-
         chart_mode = self.chart_type_selector.currentText()
-        data = get_implied_probability_data(season, bookmaker)    
-        if not data:
-            QMessageBox.information(self, "No Data", "No odds data found for this bookmaker and season.")
-            return
 
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-
-        if chart_mode == "Implied Probability vs Result":
-            outcomes = ['H', 'D', 'A']
-            implied_totals = {'H': [], 'D': [], 'A': []}
-            actual_counts = {'H': 0, 'D': 0, 'A': 0}
-            total_matches = 0
-
-            for row in data:
-                odds = [row['HomeOdds'], row['DrawOdds'], row['AwayOdds']]
-                if any(o <= 1.01 for o in odds):  # skip invalid odds
-                    continue
-
-                inv_sum = sum(1/o for o in odds)
-                probs = [(1/o)/inv_sum for o in odds]  # normalized
-
-                implied_totals['H'].append(probs[0])
-                implied_totals['D'].append(probs[1])
-                implied_totals['A'].append(probs[2])
-                actual_counts[row['FTR']] += 1
-                total_matches += 1
-
-            avg_implied = {k: np.mean(implied_totals[k]) * 100 for k in outcomes}
-            actual_freq = {k: (actual_counts[k] / total_matches) * 100 for k in outcomes}
-
-            self.figure.clear()
-            ax = self.figure.add_subplot(111)
-
-            x = np.arange(len(outcomes))
-            width = 0.35
-
-            ax.bar(x - width/2, [avg_implied[o] for o in outcomes], width, label='Implied %', color='gray')
-            ax.bar(x + width/2, [actual_freq[o] for o in outcomes], width, label='Actual %', color='blue')
-
-            ax.set_xticks(x)
-            ax.set_xticklabels(['Home Win', 'Draw', 'Away Win'])
-            ax.set_ylabel("Percentage")
-            ax.set_title(f"{bookmaker} — Implied vs Actual Outcome Rates ({season})")
-            ax.legend()
-            self.export_mode = "Probability_vs_result"
-
-        elif chart_mode == "Bookmaker Margin":
-            margins = []
-            for row in data:
-                odds = [row['HomeOdds'], row['DrawOdds'], row['AwayOdds']]
-                if any(o <= 1.01 for o in odds):
-                    continue
-                margin = sum(1 / o for o in odds)
-                margins.append((margin - 1.0) * 100)
-
-            if not margins:
-                QMessageBox.information(self, "No Valid Odds", "No valid margin data available.")
-                return
-
-            x = list(range(1, len(margins) + 1))
-            ax.plot(x, margins, label="Bookmaker Margin", color="purple", marker='o')
-            ax.axhline(np.mean(margins), color="gray", linestyle="--", label="Average Margin")
-
-            ax.set_title(f"{bookmaker} — Bookmaker Margin per Match ({season})")
-            ax.set_ylabel("Bookmaker Margin (%)")
-            ax.set_xlabel("Match Index")
-            ax.legend()
-            self.export_mode = "Bookmaker_margin"
- 
-        elif chart_mode == "Margin Distribution":
-            margins = []
-            for row in data:
-                odds = [row['HomeOdds'], row['DrawOdds'], row['AwayOdds']]
-                if any(o <= 1.01 for o in odds):
-                    continue
-                margin = sum(1 / o for o in odds)
-                margins.append((margin - 1.0) * 100)  # percent overround
-
-            if not margins:
-                QMessageBox.information(self, "No Valid Odds", "No valid margin data available.")
-                return
-
-            ax.hist(margins, bins=15, color="purple", edgecolor="black", alpha=0.7)
-            ax.axvline(np.mean(margins), color="red", linestyle="--", label="Mean Margin")
-
-            ax.set_title(f"{bookmaker} — Margin Distribution ({season})")
-            ax.set_xlabel("Margin (%)")
-            ax.set_ylabel("Match Count")
-            ax.legend()
-            self.export_mode = "Margin_distrib"
- 
-        elif chart_mode == "Compare Bookmaker Margins":
-            margins = get_avg_margins_per_bookmaker(season)
-            if not margins:
-                QMessageBox.information(self, "No Data", "No margin data found for this season.")
-                return
-
-            names = [row['BookmakerName'] for row in margins]
-            values = [row['AvgMargin'] for row in margins]
-            errors = [row['StdMargin'] for row in margins]
-
-            x = np.arange(len(names))
-
-            self.figure.clear()
-            ax = self.figure.add_subplot(111)
-
-            ax.bar(x, values, yerr=errors, capsize=5, color='skyblue', alpha=0.9)
-            ax.set_xticks(x)
-            ax.set_xticklabels(names, rotation=45, ha='right')
-
-            ax.set_title(f"Average Bookmaker Margin by Bookmaker ({season})")
-            ax.set_ylabel("Average Margin (%)")
-            ax.set_xlabel("Bookmaker")
-            ax.grid(axis='y', linestyle='--', linewidth=0.5)
-            self.export_mode = "Compare_margins"
-
-        elif chart_mode == "Over / Under 2.5 - Implied vs Actual":
-            from models.etl_model import get_over_under_probability_data
-            rows = get_over_under_probability_data(season, bookmaker)
-            if not rows:
-                QMessageBox.information(self, "No Data", "No Over / Under data found for this bookmaker and season.")
-                return
-
-            implied_over = []
-            actual_over = []
-
-            for row in rows:
-                over_odds = row["OverOdds"]
-                under_odds = row["UnderOdds"]
-                if not over_odds or not under_odds or over_odds <= 1.01 or under_odds <= 1.01:
-                    continue
-
-                # Normalized implied probs
-                inv_sum = (1 / over_odds + 1 / under_odds)
- 
-                target = self.ou_target_selector.currentText()
-                prob_over = (1 / over_odds) / inv_sum
-                prob_under = (1 / under_odds) / inv_sum
-
-                if target == "Over":
-                    implied = prob_over
-                    actual = 1 if row["TotalGoals"] >= 3 else 0
-                else:
-                    implied = prob_under
-                    actual = 1 if row["TotalGoals"] <= 2 else 0
-
-                implied_over.append(implied)
-                actual_over.append(actual)
-
-            if not implied_over:
-                QMessageBox.information(self, "No Valid Data", "No valid odds rows available.")
-                return
-
-            # Bin implied probabilities (e.g., 0.40-0.45, 0.45-0.50, etc.)
-            bins = np.arange(0.35, 0.81, 0.05)
-            bin_centers = bins[:-1] + 0.025
-            binned_implied = []
-            binned_actual = []
-
-            for i in range(len(bins) - 1):
-                bin_probs = [
-                    (implied_over[j], actual_over[j])
-                    for j in range(len(implied_over))
-                    if bins[i] <= implied_over[j] < bins[i + 1]
-                ]
-                if bin_probs:
-                    avg_p = np.mean([p for p, _ in bin_probs])
-                    actual_rate = np.mean([a for _, a in bin_probs])
-                    binned_implied.append(avg_p * 100)
-                    binned_actual.append(actual_rate * 100)
-                else:
-                    binned_implied.append(0)
-                    binned_actual.append(0)
-
-            self.figure.clear()
-            ax = self.figure.add_subplot(111)
-            width = 0.035
-
-            ax.bar(bin_centers - width, binned_implied, width=0.035, label="Implied Over %", color='gray')
-            ax.bar(bin_centers + width, binned_actual, width=0.035, label="Actual Over %", color='blue')
-
-            ax.set_xticks(bin_centers)
-            ax.set_xticklabels([f"{int(p*100)}%" for p in bin_centers])
-            ax.set_title(f"{bookmaker} — {target} 2.5: Implied vs Actual ({season})")
-            ax.set_ylabel("Percentage")
-            ax.set_xlabel(f"Implied {target} Probability Bin")
-            ax.legend()
-            self.export_mode = "Over_Under_2.5_Implied_vs_Actual"
-               
-        self.figure.tight_layout()
-        self.canvas.draw()
+        try:
+            loaded = cached(("Odds Analysis", chart_mode, season, bookmaker),
+                            lambda: load_odds_chart(chart_mode, season, bookmaker))
+            data = draw_odds_chart(self.chart, chart_mode, season, bookmaker, loaded,
+                                   self.ou_target_selector.currentText())
+        except ChartError as e:
+            QMessageBox.information(self, e.title, str(e))
+            return
 
+        self.export_mode = EXPORT_NAMES[chart_mode]
         self.latest_data = data
         self.export_data_button.setEnabled(True)
         self.export_chart_button.setEnabled(True)
@@ -344,7 +162,7 @@ class OddsAnalysisView(QWidget):
             QMessageBox.critical(self, "Export Failed", f"Could not save chart:\n{str(e)}")
    
     def export_data(self):
-        if not self.latest_data:
+        if self.latest_data is None or not len(self.latest_data["MatchID"]):
             QMessageBox.information(self, "No Data", "No data available to export.")
             return
 
@@ -362,23 +180,26 @@ class OddsAnalysisView(QWidget):
             return
 
         try:
+            data = self.latest_data
+            probs, _ = implied_probabilities(data["odds"])
             with open(file_path, "w", newline="") as f:
                 import csv
                 writer = csv.writer(f)
-                writer.writerow(["MatchDate", "HomeOdds", "DrawOdds", "AwayOdds", "FTR",
-                                 "ImpliedH", "ImpliedD", "ImpliedA"])
-                for row in self.latest_data:
-                    odds = [row['HomeOdds'], row['DrawOdds'], row['AwayOdds']]
-                    if any(o <= 1.01 for o in odds):
-                        continue
-                    inv_sum = sum(1 / o for o in odds)
-                    probs = [(1 / o) / inv_sum for o in odds]
-                    writer.writerow([
-                        row.get("MatchDate", ""),
-                        *odds,
-                        row.get("FTR", ""),
-                        f"{probs[0]:.4f}", f"{probs[1]:.4f}", f"{probs[2]:.4f}"
-                    ])
+                header = ["MatchDate", "HomeOdds", "DrawOdds", "AwayOdds", "FTR",
+                          "ImpliedH", "ImpliedD", "ImpliedA"]
+                if "model_probs" in data:
+                    header += ["ModelH", "ModelD", "ModelA"]
+                writer.writerow(header)
+                for i in range(len(data["MatchID"])):
+                    row = [
+                        data["MatchDate"][i],
+                        *data["odds"][i],
+                        data["FTR"][i],
+                        f"{probs[i, 0]:.4f}", f"{probs[i, 1]:.4f}", f"{probs[i, 2]:.4f}"
+                    ]
+                    if "model_probs" in data:
+                        row += [f"{p:.4f}" for p in data["model_probs"][i]]
+                    writer.writerow(row)
             QMessageBox.information(self, "Export Complete", f"File saved:\n{file_path}")
             self.last_export_dir = os.path.dirname(file_path)
 
@@ -391,9 +212,21 @@ class OddsAnalysisView(QWidget):
         self.ou_target_selector.setVisible(show)
  
  
+    def reload_data(self):
+        """
+        Reload the seasons and bookmakers after the data changed, keeping
+        the selections. A chart on screen is kept and marked outdated.
+        """
+        reload_selector(self.season_selector, get_all_seasons())
+        reload_selector(self.bookmaker_selector, get_all_bookmakers())
+
+        if self.export_chart_button.isEnabled():
+            self.mark_generate_outdated()
+
     def mark_generate_outdated(self):
         self.generate_button.setText("Generate Chart (Outdated)")
         self.generate_button.setStyleSheet("font-weight: bold; color: darkred;")
+        self.auto_refresh.schedule()
 
     def clear_generate_flag(self):
         self.generate_button.setText("Generate Chart")
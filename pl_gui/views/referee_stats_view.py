@@ -9,13 +9,17 @@
 
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QComboBox, QCheckBox
-from PyQt5.QtWidgets import  QPushButton, QFileDialog, QMessageBox, QSpinBox
+from PyQt5.QtWidgets import  QPushButton, QFileDialog, QMessageBox, QSpinBox, QApplication
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-from models.etl_model import get_referee_stats, get_all_referees, get_all_seasons, get_referee_trend_stats
+from models.etl_model import get_referee_stats, get_all_referees, get_all_seasons
+from models.form_model import get_referee_rolling_stats
+from models.referee_bias_model import get_referee_bias, BIAS_METRICS, ALL_SEASONS, CONFIDENCE, MIN_MATCHES
+from views.chart_helpers import SEASON_SCOPES, SCOPE_SINGLE, SCOPE_RANGE, SCOPE_ALL
+from views.chart_helpers import seasons_between, season_scope_label, AutoRefresh, reload_selector
+from charts.common import ChartArtists, mark_season_boundaries
+from views.chart_cache import cached
 import os
-import mplcursors
-import numpy as np
 
 class RefereeStatsView(QWidget):
     def __init__(self):
@@ -26,9 +30,11 @@ class RefereeStatsView(QWidget):
         self.setLayout(self.layout)
         
         # Season selector
+        self.seasons = get_all_seasons()
         self.season_selector = QComboBox()
-        self.season_selector.addItems(get_all_seasons())
-        self.layout.addWidget(QLabel("Select Season:"))
+        self.season_selector.addItems(self.seasons)
+        self.season_label = QLabel("Select Season:")
+        self.layout.addWidget(self.season_label)
         self.layout.addWidget(self.season_selector)
 
         # Chart Mode selector
@@ -37,7 +43,8 @@ class RefereeStatsView(QWidget):
             "Single Referee View",
             "Compare Two Referees",
             "All Referees Overview",
-            "Referee Trend Over Time"
+            "Referee Trend Over Time",
+            "Home/Away Bias"
         ])
         self.chart_mode_selector.currentIndexChanged.connect(self.update_mode_visibility)
         self.layout.addWidget(QLabel("Chart Mode:"))
@@ -62,7 +69,32 @@ class RefereeStatsView(QWidget):
             box.hide()
             self.layout.addWidget(box)
  
-         # Smooth Trend
+         # Seasons covered by the trend
+        self.scope_label = QLabel("Trend Seasons:")
+        self.scope_selector = QComboBox()
+        self.scope_selector.addItems(SEASON_SCOPES)
+        self.scope_selector.currentIndexChanged.connect(self.update_mode_visibility)
+        self.season_label_2 = QLabel("To Season:")
+        self.season_selector_2 = QComboBox()
+        self.season_selector_2.addItems(self.seasons)
+
+        for widget in [self.scope_label, self.scope_selector, self.season_label_2, self.season_selector_2]:
+            widget.hide()
+            self.layout.addWidget(widget)
+
+        # Home/away bias metric and season scope
+        self.bias_metric_label = QLabel("Bias Metric:")
+        self.bias_metric_selector = QComboBox()
+        for name, (label, _) in BIAS_METRICS.items():
+            self.bias_metric_selector.addItem(label, name)
+        self.bias_all_check = QCheckBox("All Seasons Combined")
+        self.bias_all_check.stateChanged.connect(self.update_mode_visibility)
+
+        for widget in [self.bias_metric_label, self.bias_metric_selector, self.bias_all_check]:
+            widget.hide()
+            self.layout.addWidget(widget)
+
+        # Smooth Trend
         self.smooth_checkbox = QCheckBox("Smooth Trend (Moving Average)")
         self.smooth_checkbox.setChecked(False)
         self.smooth_checkbox.hide()
@@ -70,7 +102,7 @@ class RefereeStatsView(QWidget):
  
         self.window_label = QLabel("Smoothing Window:")
         self.window_spin = QSpinBox()
-        self.window_spin.setRange(1, 10)
+        self.window_spin.setRange(1, 38)
         self.window_spin.setValue(3)
 
         self.window_label.hide()
@@ -102,11 +134,15 @@ class RefereeStatsView(QWidget):
         self.generate_button.clicked.connect(self.generate_chart)
         self.layout.addWidget(self.generate_button)
 
+        self.auto_refresh = AutoRefresh(self.generate_chart)
+        self.layout.addWidget(self.auto_refresh.checkbox)
+
         # Chart canvas
         self.figure = Figure()
         self.canvas = FigureCanvas(self.figure)
         self.canvas.setSizePolicy(self.canvas.sizePolicy().Expanding, self.canvas.sizePolicy().Expanding)
         self.layout.addWidget(self.canvas, stretch=1)
+        self.chart = ChartArtists(self.figure, self.canvas)
 
         # Export Chart button
         self.export_button = QPushButton("Export Chart")
@@ -121,6 +157,8 @@ class RefereeStatsView(QWidget):
         self.layout.addWidget(self.export_data_button)
 
         self.season_selector.currentIndexChanged.connect(self.mark_generate_outdated)
+        self.scope_selector.currentIndexChanged.connect(self.mark_generate_outdated)
+        self.season_selector_2.currentIndexChanged.connect(self.mark_generate_outdated)
         self.ref_selector.currentIndexChanged.connect(self.mark_generate_outdated)
         self.ref_selector_2.currentIndexChanged.connect(self.mark_generate_outdated)
         self.chart_mode_selector.currentIndexChanged.connect(self.mark_generate_outdated)
@@ -130,19 +168,26 @@ class RefereeStatsView(QWidget):
         self.yellow_check.stateChanged.connect(self.mark_generate_outdated)
         self.red_check.stateChanged.connect(self.mark_generate_outdated)
         self.foul_check.stateChanged.connect(self.mark_generate_outdated)
+        self.bias_metric_selector.currentIndexChanged.connect(self.mark_generate_outdated)
+        self.bias_all_check.stateChanged.connect(self.mark_generate_outdated)
 
         self.last_export_dir = None
         self.latest_trend_data = None
+        self.latest_bias_data = None
 
     def export_trend_data(self):
         import csv
 
+        if self.chart_mode_selector.currentText() == "Home/Away Bias":
+            self.export_bias_data()
+            return
+
         if not self.latest_trend_data:
             QMessageBox.information(self, "No Data", "No trend data available to export.")
             return
 
         referee = self.ref_selector.currentText().replace(" ", "_")
-        season = self.season_selector.currentText().replace("/", "-")
+        season = self.trend_seasons_label().replace(" – ", "_").replace("/", "-").replace(" ", "_")
         default_name = f"TrendData_{referee}_{season}.csv"
 
         folder = self.last_export_dir or os.getcwd()
@@ -161,19 +206,67 @@ class RefereeStatsView(QWidget):
         try:
             with open(file_path, mode='w', newline='') as f:
                 writer = csv.writer(f)
-                writer.writerow(["Date", "YellowCards", "RedCards", "Fouls"])
+                writer.writerow(["Season", "Date", "YellowCards", "RedCards", "Fouls"])
                 for row in self.latest_trend_data:
                     date = row["MatchDate"]
                     yellow = row["HomeYellowCards"] + row["AwayYellowCards"]
                     red = row["HomeRedCards"] + row["AwayRedCards"]
                     fouls = row["HomeFouls"] + row["AwayFouls"]
-                    writer.writerow([date, yellow, red, fouls])
+                    writer.writerow([row["SeasonName"], date, yellow, red, fouls])
             
             QMessageBox.information(self, "Export Successful", f"Data saved to:\n{file_path}")
 
         except Exception as e:
             QMessageBox.critical(self, "Export Failed", str(e))
         
+    def export_bias_data(self):
+        import csv
+
+        if not self.latest_bias_data:
+            QMessageBox.information(self, "No Data", "No bias data available to export.")
+            return
+
+        # The full table, every referee in every season (and all seasons
+        # combined), not only the referees of the season on the chart
+        try:
+            rows = get_referee_bias()["rows"]
+        except Exception as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+
+        default_name = "RefereeBias.csv"
+
+        folder = self.last_export_dir or os.getcwd()
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Bias Data As...",
+            os.path.join(folder, default_name),
+            "CSV File (*.csv)"
+        )
+
+        if not file_path:
+            return
+
+        self.last_export_dir = os.path.dirname(file_path)
+
+        columns = ["RefereeName", "SeasonName", "Matches",
+                   "HomeYellow", "AwayYellow", "HomeRed", "AwayRed", "HomeFouls", "AwayFouls",
+                   "HomeWin", "Draw", "AwayWin"]
+        for name in BIAS_METRICS:
+            columns += [f"{name}Bias", f"{name}Low", f"{name}High", f"{name}Significant"]
+
+        try:
+            with open(file_path, mode='w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                for row in rows:
+                    writer.writerow([row[c] for c in columns])
+
+            QMessageBox.information(self, "Export Successful", f"Data saved to:\n{file_path}")
+
+        except Exception as e:
+            QMessageBox.critical(self, "Export Failed", str(e))
+
     def export_chart(self):
         chart_type = "Referee_Stats"
         season = self.season_selector.currentText().replace("/", "-")
@@ -223,12 +316,31 @@ class RefereeStatsView(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Export Failed", f"Could not save chart:\n{str(e)}")
  
+    def trend_seasons(self):
+        """
+        Return the seasons of the trend chart, oldest first (None means all seasons).
+        """
+        scope = self.scope_selector.currentText()
+        if scope == SCOPE_SINGLE:
+            return [self.season_selector.currentText()]
+        if scope == SCOPE_RANGE:
+            return seasons_between(self.seasons, self.season_selector.currentText(),
+                                   self.season_selector_2.currentText())
+        return None
+
+    def trend_seasons_label(self):
+        return season_scope_label(self.scope_selector.currentText(), self.trend_seasons() or [])
+
+    def bias_season(self):
+        return ALL_SEASONS if self.bias_all_check.isChecked() else self.season_selector.currentText()
+
     def update_mode_visibility(self):
         mode = self.chart_mode_selector.currentText()
         is_compare = (mode == "Compare Two Referees")
         is_single = (mode == "Single Referee View")
         is_all = (mode == "All Referees Overview")
         is_trend = (mode == "Referee Trend Over Time")
+        is_bias = (mode == "Home/Away Bias")
 
         self.ref_selector.setVisible(is_single or is_compare)
         self.ref_selector_2.setVisible(is_compare)
@@ -246,26 +358,43 @@ class RefereeStatsView(QWidget):
         self.smooth_checkbox.setVisible(is_trend)
         self.window_label.setVisible(is_trend and self.smooth_checkbox.isChecked())
         self.window_spin.setVisible(is_trend and self.smooth_checkbox.isChecked())
-        self.export_data_button.setEnabled(is_trend)
+        self.bias_metric_label.setVisible(is_bias)
+        self.bias_metric_selector.setVisible(is_bias)
+        self.bias_all_check.setVisible(is_bias)
+        self.export_data_button.setEnabled(is_trend or (is_bias and self.latest_bias_data is not None))
+
+        scope = self.scope_selector.currentText()
+        is_range = is_trend and (scope == SCOPE_RANGE)
+        self.scope_label.setVisible(is_trend)
+        self.scope_selector.setVisible(is_trend)
+        self.season_label.setText("From Season:" if is_range else "Select Season:")
+        hide_season = (is_trend and scope == SCOPE_ALL) or (is_bias and self.bias_all_check.isChecked())
+        self.season_label.setVisible(not hide_season)
+        self.season_selector.setVisible(not hide_season)
+        self.season_label_2.setVisible(is_range)
+        self.season_selector_2.setVisible(is_range)
 
     def generate_chart(self):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
         season = self.season_selector.currentText()
         mode = self.chart_mode_selector.currentText()
 
+        # The fixed bar charts and the trend lines are updated in place when
+        # only the referee or the seasons change; the others are redrawn
+        layout = mode if mode in ("Single Referee View", "Compare Two Referees", "Referee Trend Over Time") else None
+        ax = self.chart.axes(layout)
+
         if mode == "Single Referee View":
             referee = self.ref_selector.currentText()
-            stats = get_referee_stats(season, referee)
+            stats = cached(("Referee Stats", "stats", season, referee),
+                           lambda: get_referee_stats(season, referee))
             if not stats:
                 QMessageBox.information(self, "No Data", "No match statistics found.")
                 return
             values = [stats["AvgYellow"], stats["AvgRed"], stats["AvgFouls"]]
-            ax.bar(["Yellow", "Red", "Fouls"], values, color=["gold", "red", "gray"])
+            self.chart.bars("stats", ["Yellow", "Red", "Fouls"], values, color=["gold", "red", "gray"])
             ax.set_title(f"{referee} ({season})")
 
-            self.figure.tight_layout()
-            self.canvas.draw()      
+            self.chart.draw(legend=False)
             self.export_button.setEnabled(True)
             self.clear_generate_flag()
 
@@ -273,11 +402,12 @@ class RefereeStatsView(QWidget):
             ref1 = self.ref_selector.currentText()
             ref2 = self.ref_selector_2.currentText()
             if ref1 == ref2:
-                QMessageBox.warning(self, "Invalid Selection", "Please select two different referees.")
+                if not self.auto_refresh.running:
+                    QMessageBox.warning(self, "Invalid Selection", "Please select two different referees.")
                 return
     
-            s1 = get_referee_stats(season, ref1)
-            s2 = get_referee_stats(season, ref2)
+            s1 = cached(("Referee Stats", "stats", season, ref1), lambda: get_referee_stats(season, ref1))
+            s2 = cached(("Referee Stats", "stats", season, ref2), lambda: get_referee_stats(season, ref2))
             if not s1 or not s2:
                 QMessageBox.information(self, "No Data", "No match stats for one or both referees.")
                 return
@@ -287,15 +417,13 @@ class RefereeStatsView(QWidget):
             values2 = [s2["AvgYellow"], s2["AvgRed"], s2["AvgFouls"]]
             x = range(len(categories))
             width = 0.35
-            ax.bar([i - width/2 for i in x], values1, width, label=ref1)
-            ax.bar([i + width/2 for i in x], values2, width, label=ref2)
+            self.chart.bars("ref1", [i - width/2 for i in x], values1, width=width, label=ref1)
+            self.chart.bars("ref2", [i + width/2 for i in x], values2, width=width, label=ref2)
             ax.set_xticks(list(x))
             ax.set_xticklabels(categories)
             ax.set_title(f"{ref1} vs {ref2} ({season})")
-            ax.legend()
 
-            self.figure.tight_layout()
-            self.canvas.draw()      
+            self.chart.draw()
             self.export_button.setEnabled(True)
             self.clear_generate_flag()
 
@@ -308,14 +436,17 @@ class RefereeStatsView(QWidget):
             selected_metric = self.metric_selector.currentText()
             metric = metric_map[selected_metric]
             stat_label = selected_metric
-            refs = get_all_referees()
-            data = []
-            for ref in refs:
-                stats = get_referee_stats(season, ref)
-                if stats and stats["AvgYellow"] is not None:
-                    data.append((ref, stats[metric]))
-
-            data.sort(key=lambda x: x[1], reverse=True)
+
+            def referee_values():
+                data = []
+                for ref in get_all_referees():
+                    stats = get_referee_stats(season, ref)
+                    if stats and stats["AvgYellow"] is not None:
+                        data.append((ref, stats[metric]))
+                data.sort(key=lambda x: x[1], reverse=True)
+                return data
+
+            data = cached(("Referee Stats", "overview", season, metric), referee_values)
             labels = [x[0] for x in data]
             values = [x[1] for x in data]
             
@@ -330,14 +461,20 @@ class RefereeStatsView(QWidget):
             ax.set_title(f"{stat_label} per Match by Referee ({season})")
             ax.tick_params(axis='x', rotation=45)
 
-            self.figure.tight_layout()
-            self.canvas.draw()      
+            self.chart.draw(legend=False)
             self.export_button.setEnabled(True)
             self.clear_generate_flag()
 
         elif mode == "Referee Trend Over Time":
             referee = self.ref_selector.currentText()
-            trend_data = get_referee_trend_stats(season, referee)
+            season = self.trend_seasons_label()
+            multi_season = (self.scope_selector.currentText() != SCOPE_SINGLE)
+
+            # All selected seasons come back ordered by date from a single query
+            window = self.window_spin.value()
+            seasons = self.trend_seasons()
+            trend_data = cached(("Referee Stats", "trend", referee, window, seasons),
+                                lambda: get_referee_rolling_stats(referee, window, seasons))
             self.latest_trend_data = trend_data
 
             if not trend_data:
@@ -345,38 +482,36 @@ class RefereeStatsView(QWidget):
                 return
 
             dates = [row["MatchDate"] for row in trend_data]
-            yellow = [row["HomeYellowCards"] + row["AwayYellowCards"] for row in trend_data]
-            red = [row["HomeRedCards"] + row["AwayRedCards"] for row in trend_data]
-            fouls = [row["HomeFouls"] + row["AwayFouls"] for row in trend_data]
-
             if self.smooth_checkbox.isChecked():
-                window = self.window_spin.value()
-                yellow = self.smooth_series(yellow, window)
-                red = self.smooth_series(red, window)
-                fouls = self.smooth_series(fouls, window)
+                yellow = [float(row["AvgYellow"]) for row in trend_data]
+                red = [float(row["AvgRed"]) for row in trend_data]
+                fouls = [float(row["AvgFouls"]) for row in trend_data]
+            else:
+                yellow = [row["Yellow"] for row in trend_data]
+                red = [row["Red"] for row in trend_data]
+                fouls = [row["Fouls"] for row in trend_data]
     
             if self.yellow_check.isChecked():
-                ax.plot(dates, yellow, label="Yellow Cards", color="gold", marker='o')
+                self.chart.line("yellow", dates, yellow, label="Yellow Cards", color="gold", marker='o')
             if self.red_check.isChecked():
-                ax.plot(dates, red, label="Red Cards", color="red", marker='o')
+                self.chart.line("red", dates, red, label="Red Cards", color="red", marker='o')
             if self.foul_check.isChecked():
-                ax.plot(dates, fouls, label="Fouls", color="gray", marker='o')
+                self.chart.line("fouls", dates, fouls, label="Fouls", color="gray", marker='o')
+
+            if multi_season:
+                self.chart.extra(*mark_season_boundaries(ax, dates, [row["SeasonName"] for row in trend_data]))
     
             ax.set_title(f"{referee} — Match Trend ({season})")
             
             match_count = len(trend_data)
             subtitle = f"Total Matches: {match_count}"
-            ax.text(0.00, 1.02, subtitle, transform=ax.transAxes, ha='left', fontsize=10, color='gray')
+            self.chart.extra(ax.text(0.00, 1.02, subtitle, transform=ax.transAxes, ha='left', fontsize=10, color='gray'))
         
             ax.set_ylabel("Count per Match")
             ax.set_xlabel("Match Date")
             ax.tick_params(axis='x', rotation=45)
-            ax.legend()
   
-            self.figure.tight_layout()
-            self.canvas.draw()
-
-            cursor = mplcursors.cursor(ax.lines, hover=True)
+            self.chart.draw()
             
             def format_hover(sel):
                 label = sel.artist.get_label()
@@ -384,24 +519,95 @@ class RefereeStatsView(QWidget):
                 y_val = sel.target[1]
                 sel.annotation.set_text(f"{label}\n{x_val:.0f}: {y_val:.1f}")
   
-            cursor.connect("add", format_hover)
+            self.chart.hover(self.chart.artists.values(), format_hover)
                   
             self.export_button.setEnabled(True)
             self.clear_generate_flag()
- 
-    def smooth_series(self, data, window):
-        if len(data) < window:
-            return data  # not enough points to smooth
-        return np.convolve(data, np.ones(window) / window, mode='same')  
+
+        elif mode == "Home/Away Bias":
+            season = self.bias_season()
+            metric = self.bias_metric_selector.currentData()
+            metric_label, positive_meaning = BIAS_METRICS[metric]
+
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                bias = get_referee_bias()
+            except Exception as e:
+                QApplication.restoreOverrideCursor()
+                QMessageBox.critical(self, "Error", str(e))
+                return
+            QApplication.restoreOverrideCursor()
+
+            data = [row for row in bias["rows"] if row["SeasonName"] == season and row["Matches"] >= MIN_MATCHES]
+            if not data:
+                QMessageBox.information(self, "No Data", f"No referee has {MIN_MATCHES} or more matches in {season}.")
+                return
+
+            data.sort(key=lambda row: row[f"{metric}Bias"])
+            self.latest_bias_data = data
+
+            labels = [row["RefereeName"] for row in data]
+            values = [row[f"{metric}Bias"] for row in data]
+            errors = [
+                [row[f"{metric}Bias"] - row[f"{metric}Low"] for row in data],
+                [row[f"{metric}High"] - row[f"{metric}Bias"] for row in data],
+            ]
+            colors = [
+                ("seagreen" if v > 0 else "firebrick") if row[f"{metric}Significant"] else "lightgray"
+                for v, row in zip(values, data)
+            ]
+
+            bars = ax.barh(labels, values, xerr=errors, color=colors, ecolor="dimgray", capsize=3)
+            ax.axvline(0, color="black", linewidth=0.8)
+            ax.tick_params(axis='y', labelsize=8)
+            ax.set_xlabel(f"vs League Average (+ = {positive_meaning})")
+            ax.set_title(f"Home/Away Bias — {metric_label} ({season})", pad=20)
+
+            baseline = bias["baseline"][season]
+            subtitle = (f"League home win {baseline['HomeWin'] * 100:.0f}%   "
+                        f"{CONFIDENCE * 100:.0f}% bootstrap CIs, coloured = significant")
+            ax.text(0.00, 1.02, subtitle, transform=ax.transAxes, ha='left', fontsize=9, color='gray')
+
+            self.chart.draw(legend=False)
+
+            def format_bias_hover(sel):
+                row = data[sel.index]
+                sel.annotation.set_text(
+                    f"{row['RefereeName']} ({row['Matches']} matches)\n"
+                    f"{metric_label}: {row[f'{metric}Bias']:+.3f} "
+                    f"[{row[f'{metric}Low']:+.3f}, {row[f'{metric}High']:+.3f}]"
+                )
+
+            self.chart.hover([bars], format_bias_hover)
+
+            self.export_button.setEnabled(True)
+            self.export_data_button.setEnabled(True)
+            self.clear_generate_flag()
  
     def toggle_smoothing_controls(self):
         enabled = self.smooth_checkbox.isChecked()
         self.window_label.setVisible(enabled)
         self.window_spin.setVisible(enabled)         
  
+    def reload_data(self):
+        """
+        Reload the seasons and referees after the data changed, keeping the
+        selections. A chart on screen is kept and marked outdated.
+        """
+        self.seasons = get_all_seasons()
+        reload_selector(self.season_selector, self.seasons)
+        reload_selector(self.season_selector_2, self.seasons)
+        referees = get_all_referees()
+        reload_selector(self.ref_selector, referees)
+        reload_selector(self.ref_selector_2, referees)
+
+        if self.export_button.isEnabled():
+            self.mark_generate_outdated()
+
     def mark_generate_outdated(self):
         self.generate_button.setText("Generate Chart (Outdated)")
         self.generate_button.setStyleSheet("font-weight: bold; color: darkred;")
+        self.auto_refresh.schedule()
 
     def clear_generate_flag(self):
         self.generate_button.setText("Generate Chart")
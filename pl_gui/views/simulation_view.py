@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# views/simulation_view.py
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton
+from PyQt5.QtWidgets import QFileDialog, QMessageBox, QSpinBox, QApplication
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+from models.etl_model import get_all_seasons
+from models.standings_model import get_standings_matchdays
+from models.simulation_model import prepare_simulation, simulate_season, DEFAULT_RUNS
+from views.chart_helpers import reload_selector
+import os
+import csv
+import time
+
+class SimulationView(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Season Simulation")
+
+        self.layout = QVBoxLayout()
+        self.setLayout(self.layout)
+
+        # Season
+        self.season_selector = QComboBox()
+        self.season_selector.addItems(get_all_seasons())
+        self.season_selector.currentIndexChanged.connect(self.update_cutoff_selector)
+        self.layout.addWidget(QLabel("Select Season:"))
+        self.layout.addWidget(self.season_selector)
+
+        # Cut-off: matches after this matchday are simulated
+        self.cutoff_selector = QComboBox()
+        self.layout.addWidget(QLabel("Simulate From:"))
+        self.layout.addWidget(self.cutoff_selector)
+
+        # Runs, seed and workers
+        self.runs_spin = QSpinBox()
+        self.runs_spin.setRange(1000, 1000000)
+        self.runs_spin.setSingleStep(10000)
+        self.runs_spin.setValue(DEFAULT_RUNS)
+
+        self.seed_spin = QSpinBox()
+        self.seed_spin.setRange(0, 999999)
+        self.seed_spin.setSpecialValueText("Random")
+        self.seed_spin.setValue(0)
+
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(0, os.cpu_count() or 1)
+        self.workers_spin.setSpecialValueText("All Cores")
+        self.workers_spin.setValue(0)
+
+        options_row = QHBoxLayout()
+        options_row.addWidget(QLabel("Simulations:"))
+        options_row.addWidget(self.runs_spin)
+        options_row.addWidget(QLabel("Seed:"))
+        options_row.addWidget(self.seed_spin)
+        options_row.addWidget(QLabel("Workers:"))
+        options_row.addWidget(self.workers_spin)
+        self.layout.addLayout(options_row)
+
+        # Generate
+        self.generate_button = QPushButton("Run Simulation")
+        self.generate_button.clicked.connect(self.generate_chart)
+        self.layout.addWidget(self.generate_button)
+
+        # Chart canvas
+        self.figure = Figure()
+        self.canvas = FigureCanvas(self.figure)
+        self.layout.addWidget(self.canvas, stretch=1)
+
+        # Export Chart
+        self.export_button = QPushButton("Export Chart")
+        self.export_button.setEnabled(False)
+        self.export_button.clicked.connect(self.export_chart)
+        self.layout.addWidget(self.export_button)
+
+        # Export Data
+        self.export_data_button = QPushButton("Export Data (CSV)")
+        self.export_data_button.setEnabled(False)
+        self.export_data_button.clicked.connect(self.export_data)
+        self.layout.addWidget(self.export_data_button)
+
+        self.season_selector.currentIndexChanged.connect(self.mark_generate_outdated)
+        self.cutoff_selector.currentIndexChanged.connect(self.mark_generate_outdated)
+        self.runs_spin.valueChanged.connect(self.mark_generate_outdated)
+        self.seed_spin.valueChanged.connect(self.mark_generate_outdated)
+        self.workers_spin.valueChanged.connect(self.mark_generate_outdated)
+
+        self.latest_data = None
+        self.last_export_dir = None
+
+        self.update_cutoff_selector()
+
+    def update_cutoff_selector(self):
+        season = self.season_selector.currentText()
+        cutoff = self.cutoff_selector.currentData()
+
+        self.cutoff_selector.blockSignals(True)
+        self.cutoff_selector.clear()
+        self.cutoff_selector.addItem("Season Start", None)
+        for row in get_standings_matchdays(season):
+            self.cutoff_selector.addItem(f"After Matchday {row['Matchday']} ({row['AsOfDate']})", row["AsOfDate"])
+        # Same cut-off kept when the season is reloaded
+        if cutoff is not None:
+            dates = [self.cutoff_selector.itemData(i) for i in range(self.cutoff_selector.count())]
+            self.cutoff_selector.setCurrentIndex(dates.index(cutoff) if cutoff in dates else 0)
+        self.cutoff_selector.blockSignals(False)
+
+    def generate_chart(self):
+        season = self.season_selector.currentText()
+        cutoff = self.cutoff_selector.currentData()
+        seed = self.seed_spin.value() or None
+        workers = self.workers_spin.value() or None
+
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            start = time.perf_counter()
+            setup = prepare_simulation(season, cutoff)
+            result = simulate_season(setup, self.runs_spin.value(), seed=seed, workers=workers)
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.critical(self, "Simulation Error", str(e))
+            return
+        QApplication.restoreOverrideCursor()
+
+        self.latest_data = result
+        teams = result["teams"]
+        probs = result["position_probs"] * 100
+        n_teams = len(teams)
+
+        self.figure.clear()
+        ax = self.figure.add_subplot(111)
+        image = ax.imshow(probs, cmap="Blues", aspect="auto", vmin=0, vmax=max(probs.max(), 1))
+
+        for i in range(n_teams):
+            for j in range(n_teams):
+                if probs[i, j] >= 1:
+                    color = "white" if probs[i, j] > probs.max() * 0.6 else "black"
+                    ax.text(j, i, f"{probs[i, j]:.0f}", ha="center", va="center", fontsize=7, color=color)
+
+        labels = [
+            f"{team} ({result['expected_points'][i]:.0f} pts)"
+            for i, team in enumerate(teams)
+        ]
+        ax.set_xticks(range(n_teams))
+        ax.set_xticklabels(range(1, n_teams + 1))
+        ax.set_yticks(range(n_teams))
+        ax.set_yticklabels(labels, fontsize=8)
+        ax.set_xlabel("Final Position")
+
+        cutoff_text = self.cutoff_selector.currentText()
+        ax.set_title(f"Final Position Probabilities (%) — {season}, {cutoff_text}", pad=20)
+        subtitle = (f"{result['runs']:,} simulations of {result['remaining_fixtures']} fixtures "
+                    f"in {elapsed:.1f} s   Title favourite: {teams[0]} ({result['title'][0] * 100:.1f}%)")
+        ax.text(0.00, 1.02, subtitle, transform=ax.transAxes, ha='left', fontsize=9, color='gray')
+
+        self.figure.colorbar(image, ax=ax, label="Probability (%)")
+        self.figure.tight_layout()
+        self.canvas.draw()
+
+        self.export_button.setEnabled(True)
+        self.export_data_button.setEnabled(True)
+        self.clear_generate_flag()
+
+    def export_chart(self):
+        season = self.season_selector.currentText().replace("/", "-")
+        filename = f"SeasonSimulation_{season}.png"
+        folder = self.last_export_dir or os.getcwd()
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Chart", os.path.join(folder, filename),
+            "PNG Image (*.png);;JPEG Image (*.jpg);;PDF File (*.pdf)"
+        )
+        if file_path:
+            self.figure.savefig(file_path)
+            self.last_export_dir = os.path.dirname(file_path)
+            QMessageBox.information(self, "Export Successful", f"Chart saved:\n{file_path}")
+
+    def export_data(self):
+        if not self.latest_data:
+            QMessageBox.information(self, "No Data", "No data to export.")
+            return
+
+        season = self.season_selector.currentText().replace("/", "-")
+        filename = f"SeasonSimulationData_{season}.csv"
+        folder = self.last_export_dir or os.getcwd()
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Data", os.path.join(folder, filename),
+            "CSV File (*.csv)"
+        )
+        if not file_path:
+            return
+
+        try:
+            result = self.latest_data
+            n_teams = len(result["teams"])
+            with open(file_path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["Team", "CurrentPoints", "ExpectedPoints", "ExpectedPosition",
+                                 "Title", "Top4", "Relegation"] + [f"P{k}" for k in range(1, n_teams + 1)])
+                for i, team in enumerate(result["teams"]):
+                    writer.writerow(
+                        [team, int(result["current_points"][i]),
+                         f"{result['expected_points'][i]:.2f}", f"{result['expected_position'][i]:.2f}",
+                         f"{result['title'][i]:.4f}", f"{result['top'][i]:.4f}", f"{result['relegation'][i]:.4f}"]
+                        + [f"{p:.4f}" for p in result["position_probs"][i]]
+                    )
+            QMessageBox.information(self, "Export Successful", f"Data saved:\n{file_path}")
+            self.last_export_dir = os.path.dirname(file_path)
+        except Exception as e:
+            QMessageBox.critical(self, "Export Failed", str(e))
+
+    def reload_data(self):
+        """
+        Reload the seasons and matchdays after the data changed, keeping the
+        selections. A chart on screen is kept and marked outdated.
+        """
+        if not reload_selector(self.season_selector, get_all_seasons()):
+            self.update_cutoff_selector()
+
+        if self.export_button.isEnabled():
+            self.mark_generate_outdated()
+
+    def mark_generate_outdated(self):
+        self.generate_button.setText("Run Simulation (Outdated)")
+        self.generate_button.setStyleSheet("font-weight: bold; color: darkred;")
+
+    def clear_generate_flag(self):
+        self.generate_button.setText("Run Simulation")
+        self.generate_button.setStyleSheet("")
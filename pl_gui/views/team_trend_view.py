@@ -11,11 +11,14 @@ from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QComboBox, QPushButton
 from PyQt5.QtWidgets import QFileDialog, QMessageBox, QCheckBox, QSpinBox
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-from models.etl_model import get_all_seasons, get_all_teams, get_team_match_trend_data
+from models.etl_model import get_all_seasons, get_all_teams
+from charts.common import ChartArtists, ChartError
+from charts.team_trend import TEAM_TREND_MODES, EXPORT_NAMES, load_team_trend, draw_team_trend
+from views.chart_helpers import SEASON_SCOPES, SCOPE_SINGLE, SCOPE_RANGE, SCOPE_ALL
+from views.chart_helpers import seasons_between, season_scope_label, AutoRefresh, reload_selector
+from views.chart_cache import cached
 import os
-import numpy as np
 import csv
-import mplcursors
 
 class TeamTrendView(QWidget):
     def __init__(self):
@@ -25,20 +28,33 @@ class TeamTrendView(QWidget):
         self.layout = QVBoxLayout()
         self.setLayout(self.layout)
 
+        # Season scope
+        self.scope_selector = QComboBox()
+        self.scope_selector.addItems(SEASON_SCOPES)
+        self.scope_selector.currentIndexChanged.connect(self.update_mode_visibility)
+        self.layout.addWidget(QLabel("Seasons:"))
+        self.layout.addWidget(self.scope_selector)
+
         # Season
+        self.seasons = get_all_seasons()
         self.season_selector = QComboBox()
-        self.season_selector.addItems(get_all_seasons())
-        self.layout.addWidget(QLabel("Select Season:"))
+        self.season_selector.addItems(self.seasons)
+        self.season_label = QLabel("Select Season:")
+        self.layout.addWidget(self.season_label)
         self.layout.addWidget(self.season_selector)
 
+        # Last season of a range
+        self.season_selector_2 = QComboBox()
+        self.season_selector_2.addItems(self.seasons)
+        self.season_label_2 = QLabel("To Season:")
+        self.season_label_2.hide()
+        self.season_selector_2.hide()
+        self.layout.addWidget(self.season_label_2)
+        self.layout.addWidget(self.season_selector_2)
+
         # Chart mode
         self.chart_mode = QComboBox()
-        self.chart_mode.addItems([
-            "Cumulative Points",
-            "Goal Difference",
-            "Goals For / Against",
-            "Match Results (W / D / L)"
-        ])
+        self.chart_mode.addItems(TEAM_TREND_MODES)
         self.chart_mode.currentIndexChanged.connect(self.update_mode_visibility)
         self.layout.addWidget(QLabel("Chart Type:"))
         self.layout.addWidget(self.chart_mode)
@@ -74,7 +90,7 @@ class TeamTrendView(QWidget):
 
         self.window_label = QLabel("Smoothing Window:")
         self.window_spin = QSpinBox()
-        self.window_spin.setRange(1, 10)
+        self.window_spin.setRange(1, 38)
         self.window_spin.setValue(3)
         self.layout.addWidget(self.window_label)
         self.layout.addWidget(self.window_spin)
@@ -84,10 +100,14 @@ class TeamTrendView(QWidget):
         self.generate_button.clicked.connect(self.generate_chart)
         self.layout.addWidget(self.generate_button)
 
+        self.auto_refresh = AutoRefresh(self.generate_chart)
+        self.layout.addWidget(self.auto_refresh.checkbox)
+
         # Chart canvas
         self.figure = Figure()
         self.canvas = FigureCanvas(self.figure)
         self.layout.addWidget(self.canvas, stretch=1)
+        self.chart = ChartArtists(self.figure, self.canvas)
 
         # Export Chart
         self.export_button = QPushButton("Export Chart")
@@ -104,7 +124,9 @@ class TeamTrendView(QWidget):
         self.toggle_smoothing_controls()
         self.update_mode_visibility()
 
+        self.scope_selector.currentIndexChanged.connect(self.mark_generate_outdated)
         self.season_selector.currentIndexChanged.connect(self.mark_generate_outdated)
+        self.season_selector_2.currentIndexChanged.connect(self.mark_generate_outdated)
         self.team_selector.currentIndexChanged.connect(self.mark_generate_outdated)
         self.chart_mode.currentIndexChanged.connect(self.mark_generate_outdated)
         self.chart_mode_selector.currentIndexChanged.connect(self.mark_generate_outdated)
@@ -116,15 +138,35 @@ class TeamTrendView(QWidget):
         self.latest_data = None
         self.export_mode = None
 
-    def smooth_series(self, data, window):
-        if len(data) < window:
-            return data
-        return np.convolve(data, np.ones(window)/window, mode='same')
+    def selected_seasons(self):
+        """
+        Return the selected season names, oldest first (None means all seasons).
+        """
+        scope = self.scope_selector.currentText()
+        if scope == SCOPE_SINGLE:
+            return [self.season_selector.currentText()]
+        if scope == SCOPE_RANGE:
+            return seasons_between(self.seasons, self.season_selector.currentText(),
+                                   self.season_selector_2.currentText())
+        return None
+
+    def selected_seasons_label(self):
+        seasons = self.selected_seasons() or []
+        return season_scope_label(self.scope_selector.currentText(), seasons)
 
     def update_mode_visibility(self):
+        scope = self.scope_selector.currentText()
+        is_range = (scope == SCOPE_RANGE)
+        self.season_label.setText("From Season:" if is_range else "Select Season:")
+        self.season_label.setVisible(scope != SCOPE_ALL)
+        self.season_selector.setVisible(scope != SCOPE_ALL)
+        self.season_label_2.setVisible(is_range)
+        self.season_selector_2.setVisible(is_range)
+
+        # Comparing two teams lines up matchdays, so it needs a single season
         chart_type = self.chart_mode.currentText()
-        compare_supported = (chart_type == "Cumulative Points")
-    
+        compare_supported = (chart_type == "Cumulative Points") and (scope == SCOPE_SINGLE)
+
         view_mode = self.chart_mode_selector.currentText()
         is_compare = compare_supported and (view_mode == "Compare Two Teams")
     
@@ -134,137 +176,48 @@ class TeamTrendView(QWidget):
         self.team_selector_2.setVisible(is_compare)
         
     def generate_chart(self):
-        season = self.season_selector.currentText()
+        seasons = self.selected_seasons()
+        season = self.selected_seasons_label()
+        multi_season = (self.scope_selector.currentText() != SCOPE_SINGLE)
         team = self.team_selector.currentText()
         mode = self.chart_mode.currentText()
-        view_mode = self.chart_mode_selector.currentText()
-
-        data = get_team_match_trend_data(season, team)
-        if not data:
-            QMessageBox.information(self, "No Data", "No data available for this team and season.")
-            return
-
-        matchdays = list(range(1, len(data) + 1))
-
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-
-        if mode == "Cumulative Points":
-            if view_mode == "Compare Two Teams":
-                team2 = self.team_selector_2.currentText()
-                
-                if team == team2:
+        view_mode = self.chart_mode_selector.currentText() if not multi_season else "Single Team View"
+
+        # Compare mode lines up the matchdays of two teams
+        team2 = None
+        if mode == "Cumulative Points" and view_mode == "Compare Two Teams":
+            team2 = self.team_selector_2.currentText()
+            if team == team2:
+                if not self.auto_refresh.running:
                     QMessageBox.warning(self, "Invalid Selection", "Please select two different teams for comparison.")
-                    return
-        
-                data2 = get_team_match_trend_data(season, team2)
-                if not data2:
-                    QMessageBox.information(self, "No Data", f"No data for {team2}")
-                    return
-
-                points1 = [row["Points"] for row in data]
-                points2 = [row["Points"] for row in data2]
-                series1 = np.cumsum(points1)
-                series2 = np.cumsum(points2)
-
-                if self.smooth_checkbox.isChecked():
-                    w = self.window_spin.value()
-                    series1 = self.smooth_series(series1, w)
-                    series2 = self.smooth_series(series2, w)
-
-                md1 = list(range(1, len(series1) + 1))
-                md2 = list(range(1, len(series2) + 1))
-
-                ax.plot(md1, series1, marker='o', label=team, color='blue')
-                ax.plot(md2, series2, marker='o', label=team2, color='green')
-                ax.set_ylabel("Points")
-                self.export_mode = "Compare-Points"
-                self.latest_data = data  # Only exporting team 1 for now
-
-            else:  # Single team view
-                points = [row["Points"] for row in data]
-                series = np.cumsum(points)
-
-                if self.smooth_checkbox.isChecked():
-                    series = self.smooth_series(series, self.window_spin.value())
-
-                ax.plot(matchdays, series, marker='o', label="Cumulative Points")
-                for i, row in enumerate(data):
-                    row["Matchday"] = i + 1
-                self.latest_data = data
-                ax.set_ylabel("Points")
-                self.export_mode = "Points"
-                
-            ax.set_title(f"{team} — {mode} ({season})")
-                
-        elif mode == "Goal Difference":
-            gd = [row["GF"] - row["GA"] for row in data]
-
-            if self.smooth_checkbox.isChecked():
-                gd = self.smooth_series(gd, self.window_spin.value())
-
-            ax.plot(matchdays, gd, marker='o', label="Goal Difference")
-            self.latest_data = list(zip(matchdays, gd))
-            ax.set_ylabel("Goal Diff")
-            self.export_mode = "Goal-Diff"
-            ax.set_title(f"{team} — {mode} ({season})")
-
-        elif mode == "Goals For / Against":
-            gf = [row["GF"] for row in data]
-            ga = [row["GA"] for row in data]
-
-            if self.smooth_checkbox.isChecked():
-                gf = self.smooth_series(gf, self.window_spin.value())
-                ga = self.smooth_series(ga, self.window_spin.value())
-
-            ax.plot(matchdays, gf, marker='o', label="Goals For", color='green')
-            ax.plot(matchdays, ga, marker='o', label="Goals Against", color='red')
-            self.latest_data = list(zip(matchdays, gf, ga))
-            ax.set_ylabel("Goals")
-            self.export_mode = "Goals-For-Against"
-            ax.set_title(f"{team} — {mode} ({season})")
-
-        elif mode == "Match Results (W / D / L)":
-            points = [row["Points"] for row in data]
-            colors = []
-            result_labels = []
-
-            for p in points:
-                if p == 3:
-                    colors.append("green")
-                    result_labels.append("W")
-                elif p == 1:
-                    colors.append("orange")
-                    result_labels.append("D")
-                else:
-                    colors.append("red")
-                    result_labels.append("L")
-
-            ax.scatter(matchdays, points, color=colors, label="Match Result", zorder=3)
+                return
 
-            # Optional: annotate W/D/L above each point
-            for i, (x, y, label) in enumerate(zip(matchdays, points, result_labels)):
-                ax.text(x, y + 0.2, label, ha="center", va="bottom", fontsize=8)
+        # Raw values and rolling averages for every selected season come back from a single query
+        smooth = self.smooth_checkbox.isChecked()
+        window = self.window_spin.value()
+        try:
+            trend = cached(("Team Trend", mode, team, team2, window, seasons),
+                           lambda: load_team_trend(mode, team, seasons, window, team2))
+        except ChartError as e:
+            QMessageBox.information(self, e.title, str(e))
+            return
 
-            self.latest_data = data  # Store full data rows
-            ax.set_ylabel("Result (W=3, D=1, L=0)")            
-            self.export_mode = "Match-Results"
-            ax.set_title(f"{team} — {mode} ({season})", pad=20)
-        
-        ax.set_xlabel("Matchday")
-        ax.legend()
-        self.figure.tight_layout()
-        self.canvas.draw()
-        
-        cursor = mplcursors.cursor(ax.lines, hover=True)
+        self.latest_data = draw_team_trend(self.chart, mode, team, trend, season, multi_season, smooth, team2)
+        self.export_mode = "Compare-Points" if team2 else EXPORT_NAMES[mode]
 
         def format_hover(sel):
-            matchday = int(sel.target[0])
+            index = int(round(sel.target[0]))
+            matchday = index
             y_val = sel.target[1]
             label = sel.artist.get_label()
 
-            if self.latest_data and len(self.latest_data) >= matchday:
-                row = self.latest_data[matchday - 1]
+            if self.latest_data and 1 <= index <= len(self.latest_data):
+                matchday = self.latest_data[index - 1].get("Matchday", index)
+                if multi_season:
+                    label = f"{label} ({self.latest_data[index - 1]['SeasonName']})"
+
+            if self.latest_data and 1 <= index <= len(self.latest_data) and "Opponent" in self.latest_data[index - 1]:
+                row = self.latest_data[index - 1]
                 opponent = row.get("Opponent", "?")
                 ha = row.get("HomeOrAway", "?")
                 date = row.get("MatchDate", "?")
@@ -295,7 +248,7 @@ class TeamTrendView(QWidget):
 
             sel.annotation.set_text(tooltip)
     
-        cursor.connect("add", format_hover)
+        self.chart.hover(self.chart.artists.values(), format_hover)
 
         self.export_button.setEnabled(True)
         self.export_data_button.setEnabled(True)
@@ -303,7 +256,7 @@ class TeamTrendView(QWidget):
 
     def export_chart(self):
         team = self.team_selector.currentText().replace(" ", "_")
-        season = self.season_selector.currentText().replace("/", "-")
+        season = self.selected_seasons_label().replace(" – ", "_").replace("/", "-").replace(" ", "_")
         filename = f"TeamTrend_{self.export_mode}_{team}_{season}.png"
         folder = self.last_export_dir or os.getcwd()
 
@@ -322,7 +275,7 @@ class TeamTrendView(QWidget):
             return
 
         team = self.team_selector.currentText().replace(" ", "_")
-        season = self.season_selector.currentText().replace("/", "-")
+        season = self.selected_seasons_label().replace(" – ", "_").replace("/", "-").replace(" ", "_")
         filename = f"TeamTrendData_{team}_{season}.csv"
         folder = self.last_export_dir or os.getcwd()
 
@@ -338,26 +291,31 @@ class TeamTrendView(QWidget):
                 writer = csv.writer(f)
                 
                 mode = self.chart_mode.currentText()
-                writer.writerow(["Matchday", "Date", "Opponent", "Home/Away", "Value"])
+                writer.writerow(["Season", "Matchday", "Date", "Opponent", "Home/Away", "Value"])
 
                 for row in self.latest_data:
+                    season_name = row.get("SeasonName")
                     matchday = row.get("Matchday")
-                    date = row.get("MatchDate")
+                    date = row.get("MatchDate", row.get("AsOfDate"))
                     opponent = row.get("Opponent")
                     ha = row.get("HomeOrAway")
     
                     if mode == "Cumulative Points":
-                        val = np.cumsum([r["Points"] for r in self.latest_data])[matchday - 1]
+                        val = row["CumPoints"]
                     elif mode == "Goal Difference":
                         val = row["GF"] - row["GA"]
                     elif mode == "Goals For / Against":
                         val = f'{row["GF"]} / {row["GA"]}'
                     elif mode == "Match Results (W/D/L)":
                         val = row["Points"]
+                    elif mode == "League Position":
+                        val = row["Position"]
+                    elif mode == "Elo Rating":
+                        val = row["PostRating"]
                     else:
                         val = ""
 
-                    writer.writerow([matchday, date, opponent, ha, val])
+                    writer.writerow([season_name, matchday, date, opponent, ha, val])
                                          
             QMessageBox.information(self, "Export Successful", f"Data saved:\n{file_path}")
             self.last_export_dir = os.path.dirname(file_path)
@@ -380,9 +338,25 @@ class TeamTrendView(QWidget):
         self.window_label.setVisible(enabled)
         self.window_spin.setVisible(enabled)
 
+    def reload_data(self):
+        """
+        Reload the seasons and teams after the data changed, keeping the
+        selections. A chart on screen is kept and marked outdated.
+        """
+        self.seasons = get_all_seasons()
+        reload_selector(self.season_selector, self.seasons)
+        reload_selector(self.season_selector_2, self.seasons)
+        teams = get_all_teams()
+        reload_selector(self.team_selector, teams)
+        reload_selector(self.team_selector_2, teams)
+
+        if self.export_button.isEnabled():
+            self.mark_generate_outdated()
+
     def mark_generate_outdated(self):
         self.generate_button.setText("Generate Chart (Outdated)")
         self.generate_button.setStyleSheet("font-weight: bold; color: darkred;")
+        self.auto_refresh.schedule()
 
     def clear_generate_flag(self):
         self.generate_button.setText("Generate Chart")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+# Final project (May-23-2025)
+# Class: DATA 201-21
+# Instructor: Ronald Mak ron.mak@sjsu.edu
+# Student: Luca Severini 008879273 luca.severini@sjsu.edu
+
+# views/view_stack.py
+
+# Keeps the views alive between menu clicks.
+# Each view is built the first time it is shown and then kept in a stacked
+# widget with its selections and charts. When the data version (see
+# get_data_version) changed since it was last shown, i.e. an ETL run, clean
+# or restore changed the tables it shows, its reload_data() is called to
+# reload the selector choices in place.
+
+from PyQt5.QtWidgets import QStackedWidget, QWidget
+
+class ViewStack(QStackedWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.views = {}   # name -> (widget, data version it was last shown with)
+
+        self.blank = QWidget()
+        self.addWidget(self.blank)
+
+    def show_view(self, name, factory, version=None):
+        """
+        Show the view called name, built with factory(). A view last shown
+        with another data version reloads its data; a version of None means
+        the view is never reloaded (it refreshes itself).
+        """
+        widget, shown_version = self.views.get(name, (None, None))
+        if widget is None:
+            widget = factory()
+            self.addWidget(widget)
+        elif version is not None and shown_version != version:
+            widget.reload_data()
+        self.views[name] = (widget, version)
+
+        self.setCurrentWidget(widget)
+        return widget
+
+    def current_name(self):
+        """
+        Name of the view on screen (None for the blank page).
+        """
+        current = self.currentWidget()
+        for name, (widget, _) in self.views.items():
+            if widget is current:
+                return name
+        return None
+
+    def view(self, name):
+        """
+        The live view called name, or None.
+        """
+        return self.views.get(name, (None, None))[0]
+
+    def discard(self, name):
+        """
+        Drop the view called name; it is built again when next shown.
+        """
+        widget, _ = self.views.pop(name, (None, None))
+        if widget is not None:
+            self.removeWidget(widget)
+            widget.deleteLater()
+
+    def show_blank(self):
+        self.setCurrentWidget(self.blank)
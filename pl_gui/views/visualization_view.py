@@ -15,6 +15,11 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from models.etl_model import get_league_table_data
 from models.etl_model import get_all_seasons
+from models.halftime_model import get_result_matrices
+from charts.common import ChartArtists, ChartError
+from charts.league import LEAGUE_CHARTS, MATRIX_CHART, SORT_KEYS, draw_league_chart, draw_result_matrices
+from views.chart_helpers import AutoRefresh, reload_selector
+from views.chart_cache import cached
 import os
 
 class VisualizationView(QWidget):
@@ -30,27 +35,10 @@ class VisualizationView(QWidget):
         self.season_selector.currentIndexChanged.connect(self.update_team_filter)
 
         self.chart_selector = QComboBox()
-        self.chart_selector.addItems([
-            "Points per Team",
-            "Goal Difference per Team",
-            "Goals Conceded per Team",
-            "Goals Scored per Team",
-            "Points vs Goal Difference",
-            "Points Efficiency (Points per Match)",
-            "Top 5 Attack vs Defense",
-            "Win Ratio per Team",
-            "Wins / Draws / Losses per Team"
-        ])
+        self.chart_selector.addItems(LEAGUE_CHARTS)
 
         self.sort_selector = QComboBox()
-        self.sort_selector.addItems([
-            "Team Name",
-            "Points",
-            "Goals For",
-            "Goals Against",
-            "Goal Difference",
-            "Wins"
-        ])
+        self.sort_selector.addItems(list(SORT_KEYS))
         
         self.team_filter = QListWidget()       
         # font_height = self.team_filter.fontMetrics().height()
@@ -62,6 +50,7 @@ class VisualizationView(QWidget):
  
         self.generate_button = QPushButton("Generate Chart")
         self.generate_button.clicked.connect(self.generate_chart)
+        self.auto_refresh = AutoRefresh(self.generate_chart)
  
         self.export_button = QPushButton("Export Chart")
         self.export_button.setEnabled(False)
@@ -86,11 +75,13 @@ class VisualizationView(QWidget):
         self.layout.addWidget(self.team_filter)
 
         self.layout.addWidget(self.generate_button)
+        self.layout.addWidget(self.auto_refresh.checkbox)
 
         # Chart
         self.canvas = FigureCanvas(self.figure)
         self.canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.layout.addWidget(self.canvas, stretch=1)  # Only this widget gets extra space
+        self.chart = ChartArtists(self.figure, self.canvas)
  
         self.layout.addWidget(self.export_button)
        
@@ -104,128 +95,45 @@ class VisualizationView(QWidget):
 
     def generate_chart(self):
         chart_type = self.chart_selector.currentText()
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
+        if chart_type == MATRIX_CHART:
+            self.generate_result_matrices()
+            return
 
         season = self.season_selector.currentText()
-        data = get_league_table_data(season)
-        
-        # Get selected sort key
-        sort_key = self.sort_selector.currentText()
-        key_map = {
-            "Team Name": lambda x: x["Team"],
-            "Points": lambda x: x["Points"],
-            "Goals For": lambda x: x["GF"],
-            "Goals Against": lambda x: x["GA"],
-            "Goal Difference": lambda x: x["GoalDifference"],
-            "Wins": lambda x: x["Won"],
-        }
-        
-        reverse_sort = sort_key != "Team Name"
-        data.sort(key=key_map[sort_key], reverse=reverse_sort)
+        data = cached(("Team Insights", "table", season), lambda: get_league_table_data(season))
+        draw_league_chart(self.chart, chart_type, data, self.sort_selector.currentText(), self.selected_teams())
+ 
+        self.export_button.setEnabled(True)
+        self.clear_generate_flag()
+       
+    def generate_result_matrices(self):
+        season = self.season_selector.currentText()
+        teams = self.selected_teams()
+        if not teams:
+            if not self.auto_refresh.running:
+                QMessageBox.information(self, "No Teams", "Please select at least one team.")
+            return
+
+        try:
+            matrices = cached(("Team Insights", "matrices", season), lambda: get_result_matrices("team", [season]))
+            draw_result_matrices(self.chart, season, matrices, teams)
+        except ChartError as e:
+            QMessageBox.information(self, e.title, str(e))
+            return
+        except Exception as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
 
-        # Filter selected teams
-        # selected_teams = [item.text() for item in self.team_filter.selectedItems()]       
-        selected_teams = [
+        self.export_button.setEnabled(True)
+        self.clear_generate_flag()
+
+    def selected_teams(self):
+        return [
             self.team_filter.item(idx).text()
             for idx in range(self.team_filter.count())
             if self.team_filter.item(idx).checkState() == Qt.Checked
         ]
-        
-        data = [row for row in data if row["Team"] in selected_teams]
-        teams = [row["Team"] for row in data]
-
-        if chart_type == "Points per Team":
-            points = [row["Points"] for row in data]
-            ax.bar(teams, points)
-            ax.set_ylabel("Points")
-            ax.set_title("Points per Team")
-
-        elif chart_type == "Goal Difference per Team":
-            gd = [row["GoalDifference"] for row in data]
-            ax.bar(teams, gd)
-            ax.set_ylabel("Goal Difference")
-            ax.set_title("Goal Difference per Team")
-
-        elif chart_type == "Goals Scored per Team":
-            goals = [row["GF"] for row in data]
-            ax.bar(teams, goals)
-            ax.set_ylabel("Goals For")
-            ax.set_title("Goals Scored per Team")
-
-        elif chart_type == "Goals Conceded per Team":
-            goals = [row["GA"] for row in data]
-            ax.bar(teams, goals)
-            ax.set_ylabel("Goals Against")
-            ax.set_title("Goals Conceded per Team")
- 
-        elif chart_type == "Wins / Draws / Losses per Team":
-            wins = [row["Won"] for row in data]
-            draws = [row["Drawn"] for row in data]
-            losses = [row["Lost"] for row in data]
-
-            ax.bar(teams, wins, label="Wins")
-            ax.bar(teams, draws, bottom=wins, label="Draws")
-            bottoms = [w + d for w, d in zip(wins, draws)]
-            ax.bar(teams, losses, bottom=bottoms, label="Losses")
-
-            ax.set_ylabel("Match Results")
-            ax.set_title("Wins / Draws / Losses per Team")
-            ax.legend()
-
-        elif chart_type == "Points vs Goal Difference":
-            points = [row["Points"] for row in data]
-            gd = [row["GoalDifference"] for row in data]
-            ax.scatter(gd, points)
-
-            for i, team in enumerate(teams):
-                ax.annotate(team, (gd[i], points[i]), fontsize=8, alpha=0.7)
-
-            ax.set_xlabel("Goal Difference")
-            ax.set_ylabel("Points")
-            ax.set_title("Points vs Goal Difference")
-    
-        elif chart_type == "Win Ratio per Team":
-            played = [row["Played"] for row in data]
-            won = [row["Won"] for row in data]
-            win_ratio = [round(w / p * 100, 1) if p > 0 else 0 for w, p in zip(won, played)]
-            ax.bar(teams, win_ratio)
-            ax.set_ylabel("Win Ratio (%)")
-            ax.set_title("Win Ratio per Team")
-
-        elif chart_type == "Top 5 Attack vs Defense":
-            # Sort data by Points descending
-            top5 = sorted(data, key=lambda x: x["Points"], reverse=True)[:5]
-            top5_teams = [row["Team"] for row in top5]
-            gf = [row["GF"] for row in top5]
-            ga = [row["GA"] for row in top5]
-
-            x = range(len(top5_teams))
-            bar_width = 0.35
-
-            ax.bar([i - bar_width / 2 for i in x], gf, width=bar_width, label="Goals For", color='green')
-            ax.bar([i + bar_width / 2 for i in x], ga, width=bar_width, label="Goals Against", color='red')
-
-            ax.set_xticks(x)
-            ax.set_xticklabels(top5_teams)
-            ax.set_ylabel("Goals")
-            ax.set_title("Top 5 Teams: Attack vs Defense")
-            ax.legend()
-
-        elif chart_type == "Points Efficiency (Points per Match)":
-            efficiency = [round(row["Points"] / row["Played"], 2) if row["Played"] else 0 for row in data]
-            ax.bar(teams, efficiency, color='purple')
-            ax.set_ylabel("Points per Match")
-            ax.set_title("Points Efficiency per Team")
-                           
-        ax.tick_params(axis='x', rotation=45)
-        
-        self.figure.tight_layout()
-        self.canvas.draw()
- 
-        self.export_button.setEnabled(True)
-        self.clear_generate_flag()
-       
+
     def export_chart(self):
         chart_name = self.chart_selector.currentText().replace(" / ", "-").replace(" ", "_")
         season = self.season_selector.currentText().replace("/", "-")
@@ -280,7 +188,7 @@ class VisualizationView(QWidget):
 
     def update_team_filter(self):
         season = self.season_selector.currentText()
-        data = get_league_table_data(season)
+        data = cached(("Team Insights", "table", season), lambda: get_league_table_data(season))
         self.team_filter.clear()       
         teams = sorted(row["Team"] for row in data)
         for team in teams:
@@ -289,9 +197,28 @@ class VisualizationView(QWidget):
             item.setCheckState(Qt.Checked)
             self.team_filter.addItem(item)
 
+    def reload_data(self):
+        """
+        Reload the seasons and teams after the data changed, keeping the
+        selections. A chart on screen is kept and marked outdated.
+        """
+        unchecked = {self.team_filter.item(i).text() for i in range(self.team_filter.count())
+                     if self.team_filter.item(i).checkState() != Qt.Checked}
+        if not reload_selector(self.season_selector, get_all_seasons()):
+            self.update_team_filter()
+            self.team_filter.blockSignals(True)
+            for i in range(self.team_filter.count()):
+                if self.team_filter.item(i).text() in unchecked:
+                    self.team_filter.item(i).setCheckState(Qt.Unchecked)
+            self.team_filter.blockSignals(False)
+
+        if self.export_button.isEnabled():
+            self.mark_generate_outdated()
+
     def mark_generate_outdated(self):
         self.generate_button.setText("Generate Chart (Outdated)")
         self.generate_button.setStyleSheet("font-weight: bold; color: darkred;")
+        self.auto_refresh.schedule()
 
     def clear_generate_flag(self):
         self.generate_button.setText("Generate Chart")